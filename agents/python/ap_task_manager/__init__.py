@@ -9,8 +9,13 @@ __version__ = "0.1.0"
 __author__ = "AP Mapping Team"
 
 from .domain.entities import Task, TaskStatus, Priority, AgentType
-from .core.service import TaskService
-from .api.client import TaskClient
+from .core.service import TaskService, TaskSpec
+
+# The REST client ships with the API layer, which is not released yet
+try:
+    from .api.client import TaskClient
+except ImportError:
+    TaskClient = None
 
 __all__ = [
     "Task",
@@ -18,5 +23,6 @@ __all__ = [
     "Priority",
     "AgentType",
     "TaskService",
+    "TaskSpec",
     "TaskClient",
 ]
\ No newline at end of file
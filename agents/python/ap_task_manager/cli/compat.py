@@ -15,21 +15,23 @@ import click
 
 from ..core.service import TaskService
 from ..domain.entities import TaskStatus, Priority, AgentType
-from ..infrastructure.repository import create_repository
+from ..infrastructure.repository import create_repository, VersionConflictError
 from ..infrastructure.apm import create_apm_provider
 
 
 # Global service instance (initialized on first use)
 _service: Optional[TaskService] = None
 
+# Backend for ~/.ap/tasks.json; "journal" is opt-in (see --storage)
+_storage = "json"
+
 
 def get_service() -> TaskService:
     """Get or create the task service instance."""
     global _service
     if _service is None:
-        # Use JSON repository by default for compatibility
         repo_path = Path.home() / ".ap" / "tasks.json"
-        repository = create_repository("json", file_path=repo_path)
+        repository = create_repository(_storage, file_path=repo_path)
         
         # Use console APM for visibility
         apm = create_apm_provider("console", verbose=False)
@@ -40,9 +42,12 @@ def get_service() -> TaskService:
 
 
 @click.group()
-def cli():
+@click.option('--storage', type=click.Choice(['json', 'journal']), default='json',
+              envvar='AP_STORAGE', help='Task store backend (journal appends instead of rewriting)')
+def cli(storage: str):
     """AP Task Manager - Python implementation compatible with Bash scripts."""
-    pass
+    global _storage
+    _storage = storage
 
 
 @cli.command()
@@ -132,8 +137,14 @@ def query(status: Optional[str], assignee: Optional[str], priority: Optional[str
         
         # Note: story parameter would need UUID parsing in real implementation
         
+        # Load only the fields each format prints
+        fields = {
+            'simple': ('status', 'title', 'assignee'),
+            'detailed': ('title', 'status', 'priority', 'assignee', 'description', 'created_at'),
+        }.get(format)
+        
         try:
-            tasks = await service.query_tasks(**query_params)
+            tasks = await service.query_tasks(**query_params, fields=fields)
             
             if format == 'json':
                 # JSON output
@@ -217,6 +228,9 @@ def update(task_id: str, new_status: str, actor: str):
                 print("  Task may not exist or transition may be invalid", file=sys.stderr)
                 sys.exit(1)
                 
+        except VersionConflictError:
+            print(f"✗ Task {task_id} is being changed by another process, try again", file=sys.stderr)
+            sys.exit(1)
         except ValueError as e:
             print(f"Error: Invalid task ID format", file=sys.stderr)
             sys.exit(1)
@@ -240,8 +254,11 @@ def archive(days: int, dry_run: bool):
         service = get_service()
         
         try:
-            # Query completed tasks
-            tasks = await service.query_tasks(status=TaskStatus.COMPLETED)
+            # Query completed tasks, loading just what is filtered and printed
+            tasks = await service.query_tasks(
+                status=TaskStatus.COMPLETED,
+                fields=('title', 'completed_at')
+            )
             
             # Filter by age
             cutoff_date = datetime.utcnow() - timedelta(days=days)
@@ -255,17 +272,15 @@ def archive(days: int, dry_run: bool):
                 for task in tasks_to_archive:
                     print(f"  - {task.title} (completed {task.completed_at.strftime('%Y-%m-%d')})")
             else:
-                archived_count = 0
-                for task in tasks_to_archive:
-                    result = await service.transition_status(
-                        task.id,
-                        TaskStatus.ARCHIVED,
-                        "archive-cli"
-                    )
-                    if result:
-                        archived_count += 1
+                result = await service.transition_many(
+                    [task.id for task in tasks_to_archive],
+                    TaskStatus.ARCHIVED,
+                    "archive-cli"
+                )
+                for task_id, reason in result.failed.items():
+                    print(f"Warning: could not archive {task_id}: {reason}", file=sys.stderr)
                 
-                print(f"✓ Archived {archived_count} tasks")
+                print(f"✓ Archived {len(result.transitioned)} tasks")
                 
         except Exception as e:
             print(f"Error: {e}", file=sys.stderr)
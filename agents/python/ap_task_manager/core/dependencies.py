@@ -0,0 +1,134 @@
+"""
+Task dependency tracking.
+
+Keeps the ``depends_on`` edges between tasks as a DAG together with a count
+of unmet prerequisites per task, so readiness is maintained incrementally:
+completing a task touches only its direct dependents, and the set of ready
+tasks is always at hand without walking the graph.
+"""
+
+from typing import Dict, Iterable, Set
+from uuid import UUID
+
+from ..domain.entities import Task, TaskStatus, SATISFIED_STATUSES
+
+
+class DependencyCycleError(ValueError):
+    """Raised when adding dependencies would create a cycle."""
+    pass
+
+
+class DependencyGraph:
+    """
+    Incrementally maintained task dependency DAG.
+    
+    A task is ready when it is PENDING and every prerequisite is satisfied.
+    Prerequisites may be added after the tasks that depend on them (they
+    count as unmet until they arrive), so tasks can be loaded in any order.
+    """
+    
+    def __init__(self):
+        self._prerequisites: Dict[UUID, Set[UUID]] = {}
+        self._dependents: Dict[UUID, Set[UUID]] = {}
+        self._status: Dict[UUID, TaskStatus] = {}
+        self._unmet: Dict[UUID, int] = {}
+        self._satisfied: Set[UUID] = set()
+        self._ready: Set[UUID] = set()
+    
+    def __contains__(self, task_id: UUID) -> bool:
+        return task_id in self._status
+    
+    def __len__(self) -> int:
+        return len(self._status)
+    
+    def check(self, task_id: UUID, depends_on: Iterable[UUID]) -> None:
+        """Raise DependencyCycleError if ``task_id`` may not depend on ``depends_on``."""
+        stack = list(depends_on)
+        seen: Set[UUID] = set()
+        while stack:
+            current = stack.pop()
+            if current == task_id:
+                raise DependencyCycleError(f"Dependencies of task {task_id} would form a cycle")
+            if current in seen:
+                continue
+            seen.add(current)
+            stack.extend(self._prerequisites.get(current, ()))
+    
+    def add(self, task: Task, check: bool = True) -> None:
+        """
+        Add a task and its edges, or refresh its status if already present.
+        
+        Pass ``check=False`` to skip cycle detection when loading tasks that
+        were validated when first stored.
+        """
+        if task.id in self._status:
+            self.update(task)
+            return
+        
+        prerequisites = set(task._depends_on or ())
+        if check:
+            self.check(task.id, prerequisites)
+        
+        self._status[task.id] = task.status
+        self._prerequisites[task.id] = prerequisites
+        for prerequisite in prerequisites:
+            self._dependents.setdefault(prerequisite, set()).add(task.id)
+        self._unmet[task.id] = len(prerequisites - self._satisfied)
+        
+        if task.status in SATISFIED_STATUSES:
+            self._mark_satisfied(task.id)
+        self._refresh(task.id)
+    
+    def update(self, task: Task) -> None:
+        """Record a status change; O(out-degree) when the task is satisfied."""
+        if task.id not in self._status:
+            self.add(task)
+            return
+        
+        self._status[task.id] = task.status
+        if task.status in SATISFIED_STATUSES:
+            self._mark_satisfied(task.id)
+        self._refresh(task.id)
+    
+    def remove(self, task_id: UUID) -> None:
+        """Drop a task; dependents stop waiting for it."""
+        if task_id not in self._status:
+            return
+        
+        for dependent in self._dependents.pop(task_id, set()):
+            self._prerequisites[dependent].discard(task_id)
+            if task_id not in self._satisfied:
+                self._unmet[dependent] -= 1
+                self._refresh(dependent)
+        for prerequisite in self._prerequisites.pop(task_id):
+            dependents = self._dependents.get(prerequisite)
+            if dependents is not None:
+                dependents.discard(task_id)
+        
+        del self._status[task_id]
+        del self._unmet[task_id]
+        self._satisfied.discard(task_id)
+        self._ready.discard(task_id)
+    
+    def unmet(self, task_id: UUID) -> int:
+        """Number of prerequisites ``task_id`` is still waiting for."""
+        return self._unmet.get(task_id, 0)
+    
+    def ready(self) -> Set[UUID]:
+        """IDs of PENDING tasks with every prerequisite satisfied."""
+        return set(self._ready)
+    
+    def _mark_satisfied(self, task_id: UUID) -> None:
+        if task_id in self._satisfied:
+            return
+        self._satisfied.add(task_id)
+        for dependent in self._dependents.get(task_id, ()):
+            if dependent in self._unmet:
+                self._unmet[dependent] -= 1
+                self._refresh(dependent)
+    
+    def _refresh(self, task_id: UUID) -> None:
+        if self._status[task_id] == TaskStatus.PENDING and self._unmet[task_id] == 0:
+            self._ready.add(task_id)
+        else:
+            self._ready.discard(task_id)
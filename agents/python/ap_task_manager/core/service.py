@@ -6,16 +6,59 @@ This module provides the main business logic for task operations.
 
 import asyncio
 import json
+import logging
+import random
 import re
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Callable, Set
-from uuid import UUID
+from typing import List, Optional, Dict, Any, Callable, Iterable, Sequence, Set, Union
+from uuid import UUID, uuid4
 
 from ..domain.entities import Task, TaskStatus, Priority, AgentType, TaskEvent
+from .dependencies import DependencyGraph
 from ..infrastructure.apm import APMProvider, MetricType
 from ..infrastructure.events import EventBus, EventType
-from ..infrastructure.repository import TaskRepository
+from ..infrastructure.query import TaskFilter, TaskOrder
+from ..infrastructure.repository import TaskRepository, VersionConflictError
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TaskSpec:
+    """
+    Fields of a task to create with ``TaskService.create_tasks``.
+    
+    ``id`` is assigned up front, so specs in one batch can depend on each other.
+    """
+    title: str
+    description: str = ""
+    priority: Priority = Priority.MEDIUM
+    assignee: Optional[AgentType] = None
+    story_id: Optional[UUID] = None
+    labels: Optional[List[str]] = None
+    metadata: Optional[Dict[str, Any]] = None
+    depends_on: Optional[List[UUID]] = None
+    id: UUID = field(default_factory=uuid4)
+
+
+@dataclass
+class BatchTransitionResult:
+    """Per-task outcome of ``TaskService.transition_many``."""
+    new_status: TaskStatus
+    transitioned: List[Task] = field(default_factory=list)
+    previous: Dict[UUID, TaskStatus] = field(default_factory=dict)  # Status before, per transitioned task
+    failed: Dict[UUID, str] = field(default_factory=dict)  # Task ID -> reason
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "new_status": self.new_status.value,
+            "transitioned": [str(task.id) for task in self.transitioned],
+            "failed": {str(task_id): reason for task_id, reason in self.failed.items()}
+        }
 
 
 class TaskService:
@@ -25,13 +68,25 @@ class TaskService:
         self,
         repository: Optional[TaskRepository] = None,
         apm_provider: Optional[APMProvider] = None,
-        event_bus: Optional[EventBus] = None
+        event_bus: Optional[EventBus] = None,
+        max_retries: int = 10,
+        retry_backoff: float = 0.005,
+        lease_seconds: float = 300.0,
+        max_lease_retries: int = 3
     ):
         self.repository = repository or TaskRepository()
         self.apm = apm_provider
         self.event_bus = event_bus or EventBus()
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.lease_duration = timedelta(seconds=lease_seconds)
+        self.max_lease_retries = max_lease_retries
+        self._reaper: Optional[asyncio.Task] = None
+        self.dependencies = DependencyGraph()
+        self._dependencies_loaded = False
+        self._dependencies_lock = asyncio.Lock()
         self._plugins: List[Any] = []
-        
+    
     async def create_task(
         self,
         title: str,
@@ -40,45 +95,36 @@ class TaskService:
         assignee: Optional[AgentType] = None,
         story_id: Optional[UUID] = None,
         labels: Optional[List[str]] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        depends_on: Optional[List[UUID]] = None
     ) -> Task:
-        """Create a new task with APM tracking."""
+        """
+        Create a new task with APM tracking.
+        
+        Raises DependencyCycleError if ``depends_on`` would create a cycle.
+        """
         # Start APM span
         with self._apm_span("task.create") as span:
-            # Create task
-            task = Task(
+            task = self._build_task(
                 title=title,
                 description=description,
                 priority=priority,
                 assignee=assignee,
                 story_id=story_id,
-                labels=labels or [],
-                metadata=metadata or {}
+                labels=labels,
+                metadata=metadata,
+                depends_on=depends_on
             )
             
-            # Add creation event
-            task.add_event("created", "system", {
-                "priority": priority.value,
-                "assignee": assignee.value if assignee else None
-            })
+            if depends_on:
+                await self._load_dependencies()
+                self.dependencies.check(task.id, task.depends_on)
             
             # Save to repository
             await self.repository.save(task)
+            self._track(task)
             
-            # Emit event
-            await self.event_bus.emit(EventType.TASK_CREATED, task)
-            
-            # Record metrics
-            if self.apm:
-                await self.apm.record_metric(
-                    MetricType.COUNTER,
-                    "task.created",
-                    1,
-                    {
-                        "priority": priority.value,
-                        "assignee": assignee.value if assignee else "unassigned"
-                    }
-                )
+            await self._publish_created(task)
             
             # Set span attributes
             if span:
@@ -87,61 +133,205 @@ class TaskService:
             
             return task
     
+    async def create_tasks(
+        self,
+        specs: Iterable[Union[TaskSpec, Dict[str, Any]]],
+        check_dependencies: bool = True
+    ) -> List[Task]:
+        """
+        Create many tasks with one repository write.
+        
+        ``specs`` are TaskSpecs or dicts of ``create_task`` arguments.
+        Subscribers get a single BATCH_CREATED event with the list of tasks
+        and no TASK_CREATED events (plugins are still called per task, see
+        ``register_plugin``), and the creation counter is recorded once per
+        priority/assignee pair. Raises DependencyCycleError (creating nothing) if the
+        dependencies would form a cycle; pass ``check_dependencies=False``
+        when edges are known to only point backwards.
+        """
+        with self._apm_span("task.create_many") as span:
+            tasks = []
+            for spec in specs:
+                if isinstance(spec, dict):
+                    spec = TaskSpec(**spec)
+                tasks.append(self._build_task(
+                    title=spec.title,
+                    description=spec.description,
+                    priority=spec.priority,
+                    assignee=spec.assignee,
+                    story_id=spec.story_id,
+                    labels=spec.labels,
+                    metadata=spec.metadata,
+                    depends_on=spec.depends_on,
+                    task_id=spec.id
+                ))
+            
+            if check_dependencies and any(task._depends_on for task in tasks):
+                await self._load_dependencies()
+            
+            # Add to the graph in order, so edges between tasks of the batch are
+            # checked too; undo it if the batch is rejected or cannot be saved
+            added = []
+            try:
+                if self._dependencies_loaded:
+                    for task in tasks:
+                        self.dependencies.add(task, check=check_dependencies)
+                        added.append(task.id)
+                await self.repository.save_many(tasks)
+            except Exception:
+                for task_id in added:
+                    self.dependencies.remove(task_id)
+                raise
+            
+            await self.event_bus.emit(EventType.BATCH_CREATED, tasks)
+            
+            if self.apm:
+                created: Dict[tuple, int] = {}
+                for task in tasks:
+                    key = (task.priority, task.assignee)
+                    created[key] = created.get(key, 0) + 1
+                for (priority, assignee), count in created.items():
+                    await self.apm.record_metric(
+                        MetricType.COUNTER,
+                        "task.created",
+                        count,
+                        {
+                            "priority": priority.value,
+                            "assignee": assignee.value if assignee else "unassigned"
+                        }
+                    )
+            
+            if span:
+                span.set_attribute("tasks.count", len(tasks))
+            
+            return tasks
+    
+    def _build_task(
+        self,
+        title: str,
+        description: str = "",
+        priority: Priority = Priority.MEDIUM,
+        assignee: Optional[AgentType] = None,
+        story_id: Optional[UUID] = None,
+        labels: Optional[List[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        depends_on: Optional[List[UUID]] = None,
+        task_id: Optional[UUID] = None
+    ) -> Task:
+        """Build a new, unsaved task with its creation event."""
+        task = Task(
+            id=task_id,
+            title=title,
+            description=description,
+            priority=priority,
+            assignee=assignee,
+            story_id=story_id,
+            labels=labels or None,
+            metadata=metadata or None,
+            depends_on=list(depends_on) if depends_on else None
+        )
+        
+        # Add creation event
+        task.add_event("created", "system", {
+            "priority": priority.value,
+            "assignee": assignee.value if assignee else None
+        })
+        
+        return task
+    
+    async def _publish_created(self, task: Task) -> None:
+        """Emit the creation event and metric for a saved task."""
+        # Emit event
+        await self.event_bus.emit(EventType.TASK_CREATED, task)
+        
+        # Record metrics
+        if self.apm:
+            await self.apm.record_metric(
+                MetricType.COUNTER,
+                "task.created",
+                1,
+                {
+                    "priority": task.priority.value,
+                    "assignee": task.assignee.value if task.assignee else "unassigned"
+                }
+            )
+    
+    async def _read_modify_write(
+        self,
+        task_id: UUID,
+        apply: Callable[[Task], Any]
+    ) -> tuple:
+        """
+        Load a task, apply a change and save it with a version check.
+        
+        ``apply`` mutates the task in place and returns a result; a falsy
+        result means there is nothing to save. Only the fields it marked
+        dirty are written (see TaskRepository.patch). If another writer saved the
+        task in the meantime the save conflicts, and after a jittered backoff
+        the task is re-read and ``apply`` re-run, up to ``max_retries`` times;
+        past that the VersionConflictError propagates. Returns
+        ``(task, result)``, or ``(None, None)`` if the task does not exist.
+        """
+        attempt = 0
+        while True:
+            task = await self.repository.get(task_id)
+            if not task:
+                return None, None
+            
+            result = apply(task)
+            if not result:
+                return task, result
+            
+            try:
+                await self.repository.patch(task, expected_version=task.version)
+                return task, result
+            except VersionConflictError:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                
+                if self.apm:
+                    await self.apm.record_metric(
+                        MetricType.COUNTER,
+                        "task.save.conflict",
+                        1,
+                        {"attempt": attempt}
+                    )
+                await self._backoff(attempt)
+    
+    async def _backoff(self, attempt: int) -> None:
+        """
+        Sleep before retrying a conflicted save.
+        
+        The delay is drawn uniformly up to ``retry_backoff * 2**attempt``
+        (capped at one second), so writers that collided spread out instead
+        of re-reading in lockstep and colliding again.
+        """
+        if self.retry_backoff > 0:
+            await asyncio.sleep(random.uniform(0, min(1.0, self.retry_backoff * 2 ** attempt)))
+    
     async def update_task(
         self,
         task_id: UUID,
         updates: Dict[str, Any],
         actor: str = "system"
     ) -> Optional[Task]:
-        """Update a task with change tracking."""
+        """
+        Update a task with change tracking.
+        
+        Returns None if the task does not exist. Raises VersionConflictError
+        if concurrent writers kept changing the task through all retries.
+        """
         with self._apm_span("task.update") as span:
-            # Get existing task
-            task = await self.repository.get(task_id)
+            task, changes = await self._read_modify_write(
+                task_id,
+                lambda task: self._apply_updates(task, updates, actor)
+            )
             if not task:
                 return None
             
-            # Track what changed
-            changes = {}
-            
-            # Update fields
-            if "title" in updates and updates["title"] != task.title:
-                changes["title"] = {"from": task.title, "to": updates["title"]}
-                task.title = updates["title"]
-            
-            if "description" in updates and updates["description"] != task.description:
-                changes["description"] = {"updated": True}
-                task.description = updates["description"]
-            
-            if "priority" in updates:
-                new_priority = Priority(updates["priority"])
-                if new_priority != task.priority:
-                    changes["priority"] = {"from": task.priority.value, "to": new_priority.value}
-                    task.priority = new_priority
-            
-            if "assignee" in updates:
-                new_assignee = AgentType(updates["assignee"]) if updates["assignee"] else None
-                if new_assignee != task.assignee:
-                    changes["assignee"] = {
-                        "from": task.assignee.value if task.assignee else None,
-                        "to": new_assignee.value if new_assignee else None
-                    }
-                    task.assignee = new_assignee
-            
-            if "labels" in updates:
-                changes["labels"] = {"updated": True}
-                task.labels = updates["labels"]
-            
-            # Update metadata
-            if "metadata" in updates:
-                task.metadata.update(updates["metadata"])
-                changes["metadata"] = {"updated": True}
-            
-            # Only save if there were changes
+            # Only publish if there were changes
             if changes:
-                task.updated_at = datetime.utcnow()
-                task.add_event("updated", actor, changes)
-                
-                await self.repository.save(task)
                 await self.event_bus.emit(EventType.TASK_UPDATED, task, changes)
                 
                 # Record metrics
@@ -155,22 +345,89 @@ class TaskService:
             
             return task
     
+    def _apply_updates(
+        self,
+        task: Task,
+        updates: Dict[str, Any],
+        actor: str
+    ) -> Dict[str, Any]:
+        """Apply field updates to a task and return what changed."""
+        # Track what changed
+        changes = {}
+        
+        # Update fields
+        if "title" in updates and updates["title"] != task.title:
+            changes["title"] = {"from": task.title, "to": updates["title"]}
+            task.title = updates["title"]
+            task.mark_dirty("title")
+        
+        if "description" in updates and updates["description"] != task.description:
+            changes["description"] = {"updated": True}
+            task.description = updates["description"]
+            task.mark_dirty("description")
+        
+        if "priority" in updates:
+            new_priority = Priority(updates["priority"])
+            if new_priority != task.priority:
+                changes["priority"] = {"from": task.priority.value, "to": new_priority.value}
+                task.priority = new_priority
+                task.mark_dirty("priority")
+        
+        if "assignee" in updates:
+            new_assignee = AgentType(updates["assignee"]) if updates["assignee"] else None
+            if new_assignee != task.assignee:
+                changes["assignee"] = {
+                    "from": task.assignee.value if task.assignee else None,
+                    "to": new_assignee.value if new_assignee else None
+                }
+                task.assignee = new_assignee
+                task.mark_dirty("assignee")
+        
+        if "labels" in updates:
+            changes["labels"] = {"updated": True}
+            task.labels = updates["labels"]
+            task.mark_dirty("labels")
+        
+        # Update metadata
+        if "metadata" in updates:
+            task.metadata.update(updates["metadata"])
+            changes["metadata"] = {"updated": True}
+            task.mark_dirty("metadata")
+        
+        if changes:
+            task.updated_at = datetime.utcnow()
+            task.mark_dirty("updated_at")
+            task.add_event("updated", actor, changes)
+        
+        return changes
+    
     async def transition_status(
         self,
         task_id: UUID,
         new_status: TaskStatus,
         actor: str = "system"
     ) -> Optional[Task]:
-        """Transition a task to a new status."""
+        """
+        Transition a task to a new status.
+        
+        Returns None if the task does not exist or the transition is invalid.
+        Raises VersionConflictError if concurrent writers kept changing the
+        task through all retries.
+        """
         with self._apm_span("task.transition_status") as span:
-            task = await self.repository.get(task_id)
-            if not task:
-                return None
+            old_status = None
             
-            old_status = task.status
+            def apply(task: Task) -> bool:
+                nonlocal old_status
+                old_status = task.status
+                return task.transition_to(new_status, actor)
             
             # Attempt transition
-            if not task.transition_to(new_status, actor):
+            task, transitioned = await self._read_modify_write(task_id, apply)
+            if not task:
+                return None
+            
+            if not transitioned:
                 # Invalid transition
                 if self.apm:
                     await self.apm.record_metric(
@@ -184,8 +441,7 @@ class TaskService:
                     )
                 return None
             
-            # Save updated task
-            await self.repository.save(task)
+            self._track(task)
             
             # Emit status change event
             await self.event_bus.emit(
@@ -221,14 +477,322 @@ class TaskService:
             
             return task
     
-    async def extract_tasks_from_story(self, story_file: Path) -> List[Task]:
-        """Extract tasks from a story markdown file."""
+    async def transition_many(
+        self,
+        tasks: Union[Iterable[UUID], TaskFilter],
+        new_status: TaskStatus,
+        actor: str = "system"
+    ) -> BatchTransitionResult:
+        """
+        Transition many tasks, given by ID or by filter, in one repository write.
+        
+        Valid transitions are written together with ``patch_many``; tasks
+        another writer changed in the meantime are re-read and retried,
+        with the same backoff as single updates, up to ``max_retries``
+        times. Subscribers get a single BATCH_UPDATED event carrying the
+        result rather than one TASK_STATUS_CHANGED per task, and transition
+        counters are recorded once per source status.
+        """
+        with self._apm_span("task.transition_many") as span:
+            if isinstance(tasks, TaskFilter):
+                loaded = {task.id: task for task in await self.repository.query(tasks)}
+                pending = list(loaded)
+            else:
+                pending = list(dict.fromkeys(tasks))
+                loaded = await self.repository.get_many(pending)
+            
+            result = BatchTransitionResult(new_status)
+            attempt = 0
+            while True:
+                changed = []
+                for task_id in pending:
+                    task = loaded.get(task_id)
+                    if task is None:
+                        result.failed[task_id] = "not found"
+                        continue
+                    old_status = task.status
+                    if not task.transition_to(new_status, actor):
+                        result.failed[task_id] = f"cannot transition from {old_status.value}"
+                        continue
+                    result.previous[task_id] = old_status
+                    changed.append(task)
+                
+                conflicts = set(await self.repository.patch_many(changed)) if changed else set()
+                result.transitioned.extend(task for task in changed if task.id not in conflicts)
+                for task_id in conflicts:
+                    del result.previous[task_id]
+                if not conflicts:
+                    break
+                
+                attempt += 1
+                if attempt > self.max_retries:
+                    for task_id in conflicts:
+                        result.failed[task_id] = "version conflict"
+                    break
+                
+                await self._backoff(attempt)
+                pending = list(conflicts)
+                loaded = await self.repository.get_many(pending)
+            
+            for task in result.transitioned:
+                self._track(task)
+            
+            await self.event_bus.emit(EventType.BATCH_UPDATED, result)
+            
+            if self.apm:
+                transitions: Dict[TaskStatus, int] = {}
+                for old_status in result.previous.values():
+                    transitions[old_status] = transitions.get(old_status, 0) + 1
+                for old_status, count in transitions.items():
+                    await self.apm.record_metric(
+                        MetricType.COUNTER,
+                        "task.transition",
+                        count,
+                        {
+                            "from": old_status.value,
+                            "to": new_status.value
+                        }
+                    )
+                if result.failed:
+                    await self.apm.record_metric(
+                        MetricType.COUNTER,
+                        "task.transition.invalid",
+                        len(result.failed),
+                        {"to": new_status.value}
+                    )
+            
+            if span:
+                span.set_attribute("tasks.transitioned", len(result.transitioned))
+                span.set_attribute("tasks.failed", len(result.failed))
+            
+            return result
+    
+    async def claim_next(
+        self,
+        assignee: AgentType,
+        labels: Optional[List[str]] = None,
+        actor: Optional[str] = None
+    ) -> Optional[Task]:
+        """
+        Claim the next task for an agent worker.
+        
+        Atomically moves the highest-priority, oldest PENDING task assigned
+        to ``assignee`` (with any of ``labels``, if given) whose prerequisites
+        are all COMPLETED or ARCHIVED to IN_PROGRESS and returns it;
+        concurrent workers never claim the same task. The check runs in the
+        repository, so it holds across processes. Returns None when there
+        is nothing to claim.
+        
+        The claimed task is leased to ``actor`` for ``lease_seconds``; keep
+        it with ``heartbeat`` or the reaper will hand it to another worker.
+        """
+        with self._apm_span("task.claim_next") as span:
+            task = await self.repository.claim_next(
+                assignee, labels, actor or assignee.value, self.lease_duration
+            )
+            if not task:
+                return None
+            
+            self._track(task)
+            await self.event_bus.emit(
+                EventType.TASK_STATUS_CHANGED,
+                task,
+                {"from": TaskStatus.PENDING, "to": TaskStatus.IN_PROGRESS}
+            )
+            
+            if self.apm:
+                await self.apm.record_metric(
+                    MetricType.COUNTER,
+                    "task.transition",
+                    1,
+                    {
+                        "from": TaskStatus.PENDING.value,
+                        "to": TaskStatus.IN_PROGRESS.value
+                    }
+                )
+                if task.metrics.time_to_start is not None:
+                    await self.apm.record_metric(
+                        MetricType.HISTOGRAM,
+                        "task.time_to_start",
+                        task.metrics.time_to_start,
+                        {"assignee": assignee.value}
+                    )
+            
+            if span:
+                span.set_attribute("task.id", str(task.id))
+            
+            return task
+    
+    async def heartbeat(self, task_id: UUID, owner: Optional[str] = None) -> Optional[Task]:
+        """
+        Extend the lease on an IN_PROGRESS task by ``lease_seconds``.
+        
+        Returns the task, or None if it is not in progress or (when ``owner``
+        is given) is leased to someone else - the caller has lost the task.
+        """
+        def apply(task: Task) -> bool:
+            if task.status != TaskStatus.IN_PROGRESS:
+                return False
+            if owner is not None and task.lease_owner not in (None, owner):
+                return False
+            task.acquire_lease(owner or task.lease_owner or "system", self.lease_duration)
+            return True
+        
+        task, renewed = await self._read_modify_write(task_id, apply)
+        return task if renewed else None
+    
+    async def reap_expired_leases(
+        self,
+        now: Optional[datetime] = None,
+        batch_size: int = 100
+    ) -> List[Task]:
+        """
+        Recover tasks whose lease ran out.
+        
+        Each one has ``metrics.retry_count`` bumped and goes back to PENDING,
+        or to FAILED once it has been retried ``max_lease_retries`` times.
+        Candidates come from the repository's expiry index, so a sweep costs
+        the number of expired leases, not the number of open tasks.
+        """
+        now = now or datetime.utcnow()
+        reaped = []
+        
+        def apply(task: Task) -> Optional[TaskStatus]:
+            # Re-checked on every attempt: a heartbeat may have won the race
+            if task.status != TaskStatus.IN_PROGRESS or not task.lease_expired(now):
+                return None
+            
+            task.metrics.retry_count += 1
+            task.mark_dirty("metrics")
+            target = (
+                TaskStatus.PENDING
+                if task.metrics.retry_count <= self.max_lease_retries
+                else TaskStatus.FAILED
+            )
+            task.add_event("lease_expired", "lease-reaper", {
+                "owner": task.lease_owner,
+                "expired_at": task.lease_expires_at.isoformat()
+            })
+            task.transition_to(target, "lease-reaper")
+            return target
+        
+        while True:
+            expired = await self.repository.expired_leases(now, batch_size)
+            progress = len(reaped)
+            for candidate in expired:
+                task, target = await self._read_modify_write(candidate.id, apply)
+                if not target:
+                    continue
+                
+                reaped.append(task)
+                self._track(task)
+                await self.event_bus.emit(
+                    EventType.TASK_STATUS_CHANGED,
+                    task,
+                    {"from": TaskStatus.IN_PROGRESS, "to": target}
+                )
+                if self.apm:
+                    await self.apm.record_metric(
+                        MetricType.COUNTER,
+                        "task.lease.expired",
+                        1,
+                        {"to": target.value}
+                    )
+            
+            # A full batch with nothing reapable would come back unchanged
+            if len(expired) < batch_size or len(reaped) == progress:
+                return reaped
+    
+    def start_reaper(self, interval: float = 30.0) -> asyncio.Task:
+        """Run ``reap_expired_leases`` every ``interval`` seconds in the background."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.ensure_future(self._reap_periodically(interval))
+        return self._reaper
+    
+    async def stop_reaper(self) -> None:
+        """Stop the background reaper, if running."""
+        if self._reaper is None:
+            return
+        
+        self._reaper.cancel()
+        try:
+            await self._reaper
+        except asyncio.CancelledError:
+            pass
+        self._reaper = None
+    
+    async def _reap_periodically(self, interval: float) -> None:
+        while True:
+            try:
+                reaped = await self.reap_expired_leases()
+                if reaped:
+                    logger.info(f"Recovered {len(reaped)} tasks with expired leases")
+            except Exception as e:
+                logger.error(f"Lease reaper sweep failed: {e}")
+            await asyncio.sleep(interval)
+    
+    async def _load_dependencies(self) -> None:
+        """Build the dependency graph from the repository on first use."""
+        if self._dependencies_loaded:
+            return
+        
+        async with self._dependencies_lock:
+            if self._dependencies_loaded:
+                return
+            for task in await self.repository.list():
+                self.dependencies.add(task, check=False)
+            self._dependencies_loaded = True
+    
+    def _track(self, task: Task) -> None:
+        """Feed a saved task into the dependency graph once it is loaded."""
+        if self._dependencies_loaded:
+            self.dependencies.add(task, check=False)
+    
+    async def ready_tasks(
+        self,
+        assignee: Optional[AgentType] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        """
+        PENDING tasks whose prerequisites are all completed, highest priority first.
+        
+        Answered from the incrementally maintained dependency graph, so the
+        cost is the number of ready tasks, not the size of the graph. The
+        graph tracks changes made through this service.
+        """
+        await self._load_dependencies()
+        
+        found = await self.repository.get_many(self.dependencies.ready())
+        tasks = [
+            task for task in found.values()
+            if assignee is None or task.assignee == assignee
+        ]
+        tasks.sort(key=TaskOrder.PRIORITY.sort_key)
+        return tasks[:limit] if limit else tasks
+    
+    async def extract_tasks_from_story(
+        self,
+        story_file: Path,
+        infer_dependencies: bool = False
+    ) -> List[Task]:
+        """
+        Extract tasks from a story markdown file.
+        
+        With ``infer_dependencies``, each task depends on the task before it
+        at the same level of the numbering (1.3 on 1.2, 2 on 1), and a first
+        subtask waits for whatever its parent waits for.
+        
+        The tasks are created with ``create_tasks``, so bus subscribers see
+        one BATCH_CREATED event for the story, not a TASK_CREATED per task.
+        """
         with self._apm_span("task.extract_from_story") as span:
             if not story_file.exists():
                 raise FileNotFoundError(f"Story file not found: {story_file}")
             
             content = story_file.read_text()
-            tasks = []
+            specs = []
+            by_number: Dict[str, TaskSpec] = {}
+            last_at_level: Dict[str, TaskSpec] = {}  # Keyed by parent number
             
             # Parse story metadata
             story_id = self._extract_story_id(content)
@@ -273,8 +837,16 @@ class TaskService:
                 
                 description = '\n'.join(description_lines)
                 
-                # Create task
-                task = await self.create_task(
+                depends_on = []
+                parent_num = task_num.rpartition('.')[0]
+                if infer_dependencies:
+                    if parent_num in last_at_level:
+                        depends_on = [last_at_level[parent_num].id]
+                    elif parent_num in by_number:
+                        depends_on = list(by_number[parent_num].depends_on)
+                
+                # All tasks are created together below
+                spec = TaskSpec(
                     title=f"[{task_num}] {title}",
                     description=description,
                     priority=priority,
@@ -285,10 +857,16 @@ class TaskService:
                         "source": str(story_file),
                         "task_number": task_num,
                         "extracted_at": datetime.utcnow().isoformat()
-                    }
+                    },
+                    depends_on=depends_on
                 )
                 
-                tasks.append(task)
+                specs.append(spec)
+                by_number[task_num] = spec
+                last_at_level[parent_num] = spec
+            
+            # Inferred edges only point backwards, so they cannot form a cycle
+            tasks = await self.create_tasks(specs, check_dependencies=False)
             
             # Record extraction metrics
             if self.apm:
@@ -313,40 +891,32 @@ class TaskService:
         story_id: Optional[UUID] = None,
         labels: Optional[List[str]] = None,
         created_after: Optional[datetime] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None
     ) -> List[Task]:
-        """Query tasks with filters."""
+        """
+        Query tasks with filters.
+        
+        ``fields`` limits the task fields loaded to those the caller reads,
+        where the repository supports projection (see TaskRepository.query).
+        """
         with self._apm_span("task.query") as span:
-            # Get all tasks from repository
-            all_tasks = await self.repository.list()
-            
-            # Apply filters
-            filtered_tasks = []
-            for task in all_tasks:
-                if status and task.status != status:
-                    continue
-                if assignee and task.assignee != assignee:
-                    continue
-                if priority and task.priority != priority:
-                    continue
-                if story_id and task.story_id != story_id:
-                    continue
-                if labels and not any(label in task.labels for label in labels):
-                    continue
-                if created_after and task.created_at < created_after:
-                    continue
-                
-                filtered_tasks.append(task)
-            
-            # Sort by priority and creation date
-            filtered_tasks.sort(
-                key=lambda t: (-t.priority.weight, t.created_at),
-                reverse=False
+            filter_spec = TaskFilter(
+                status=status,
+                assignee=assignee,
+                priority=priority,
+                story_id=story_id,
+                labels=labels,
+                created_after=created_after
             )
             
-            # Apply limit
-            if limit:
-                filtered_tasks = filtered_tasks[:limit]
+            # Filtering, ordering and limit are pushed down to the repository
+            filtered_tasks = await self.repository.query(
+                filter_spec,
+                TaskOrder.PRIORITY,
+                limit=limit or None,
+                fields=fields
+            )
             
             # Record query metrics
             if self.apm:
@@ -356,7 +926,7 @@ class TaskService:
                     1,
                     {
                         "result_count": len(filtered_tasks),
-                        "has_filters": bool(status or assignee or priority or story_id or labels)
+                        "has_filters": not filter_spec.is_empty
                     }
                 )
             
@@ -446,6 +1016,10 @@ class TaskService:
                 EventType.TASK_CREATED,
                 plugin.on_task_created
             )
+            self.event_bus.subscribe(
+                EventType.BATCH_CREATED,
+                _for_each_task(plugin.on_task_created)
+            )
         
         if hasattr(plugin, 'on_task_updated'):
             self.event_bus.subscribe(
@@ -457,4 +1031,45 @@ class TaskService:
             self.event_bus.subscribe(
                 EventType.TASK_STATUS_CHANGED,
                 plugin.on_task_status_changed
-            )
\ No newline at end of file
+            )
+            self.event_bus.subscribe(
+                EventType.BATCH_UPDATED,
+                _for_each_transition(plugin.on_task_status_changed)
+            )
+
+
+def _for_each_task(handler: Callable) -> Callable:
+    """Adapt a per-task handler to batch events, which carry a list of tasks."""
+    if asyncio.iscoroutinefunction(handler):
+        async def handle_batch(tasks: List[Task], *args) -> None:
+            for task in tasks:
+                await handler(task, *args)
+    else:
+        # Sync like the handler, so the bus runs it the same way (inline or pooled)
+        def handle_batch(tasks: List[Task], *args) -> None:
+            for task in tasks:
+                handler(task, *args)
+        handle_batch.inline_safe = getattr(handler, "inline_safe", False)
+    
+    handle_batch.__name__ = getattr(handler, "__name__", "handle_batch")
+    return handle_batch
+
+
+def _for_each_transition(handler: Callable) -> Callable:
+    """Adapt a status-change handler to BATCH_UPDATED, which carries a BatchTransitionResult."""
+    def changes(result: BatchTransitionResult):
+        for task in result.transitioned:
+            yield task, {"from": result.previous[task.id], "to": result.new_status}
+    
+    if asyncio.iscoroutinefunction(handler):
+        async def handle_batch(result: BatchTransitionResult) -> None:
+            for task, change in changes(result):
+                await handler(task, change)
+    else:
+        def handle_batch(result: BatchTransitionResult) -> None:
+            for task, change in changes(result):
+                handler(task, change)
+        handle_batch.inline_safe = getattr(handler, "inline_safe", False)
+    
+    handle_batch.__name__ = getattr(handler, "__name__", "handle_batch")
+    return handle_batch
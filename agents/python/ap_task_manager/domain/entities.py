@@ -4,10 +4,9 @@ Domain entities for task management.
 This module defines the core business entities used throughout the task management system.
 """
 
-from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, FrozenSet
 from uuid import UUID, uuid4
 
 
@@ -22,15 +21,24 @@ class TaskStatus(Enum):
     
     def can_transition_to(self, new_status: 'TaskStatus') -> bool:
         """Check if transition to new status is valid."""
-        valid_transitions = {
-            TaskStatus.PENDING: [TaskStatus.IN_PROGRESS, TaskStatus.BLOCKED, TaskStatus.ARCHIVED],
-            TaskStatus.IN_PROGRESS: [TaskStatus.COMPLETED, TaskStatus.BLOCKED, TaskStatus.FAILED],
-            TaskStatus.BLOCKED: [TaskStatus.IN_PROGRESS, TaskStatus.FAILED, TaskStatus.ARCHIVED],
-            TaskStatus.COMPLETED: [TaskStatus.ARCHIVED],
-            TaskStatus.FAILED: [TaskStatus.IN_PROGRESS, TaskStatus.ARCHIVED],
-            TaskStatus.ARCHIVED: []  # Terminal state
-        }
-        return new_status in valid_transitions.get(self, [])
+        return new_status in _TRANSITIONS[self]
+
+
+# Valid transitions from each status, built once (see TaskStatus.can_transition_to)
+_TRANSITIONS: Dict[TaskStatus, FrozenSet[TaskStatus]] = {
+    TaskStatus.PENDING: frozenset({TaskStatus.IN_PROGRESS, TaskStatus.BLOCKED, TaskStatus.ARCHIVED}),
+    TaskStatus.IN_PROGRESS: frozenset({
+        TaskStatus.COMPLETED, TaskStatus.BLOCKED, TaskStatus.FAILED,
+        TaskStatus.PENDING  # Requeued, e.g. after its lease expired
+    }),
+    TaskStatus.BLOCKED: frozenset({TaskStatus.IN_PROGRESS, TaskStatus.FAILED, TaskStatus.ARCHIVED}),
+    TaskStatus.COMPLETED: frozenset({TaskStatus.ARCHIVED}),
+    TaskStatus.FAILED: frozenset({TaskStatus.IN_PROGRESS, TaskStatus.ARCHIVED}),
+    TaskStatus.ARCHIVED: frozenset()  # Terminal state
+}
+
+# A prerequisite in one of these states no longer holds anything up
+SATISFIED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.ARCHIVED)
 
 
 class Priority(Enum):
@@ -65,76 +73,255 @@ class AgentType(Enum):
     DESIGN_ARCHITECT = "design_architect"
 
 
-@dataclass
-class TaskMetrics:
+class _SlottedValue:
+    """
+    Base for small slotted value classes.
+    
+    ``__slots__`` lists the fields in constructor order and also drives
+    repr and equality, as a dataclass would.
+    """
+    
+    __slots__ = ()
+    
+    def __repr__(self) -> str:
+        fields_repr = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields_repr})"
+    
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    __hash__ = None  # Mutable and compared by value
+
+
+class TaskMetrics(_SlottedValue):
     """Performance and tracking metrics for a task."""
-    time_to_start: Optional[float] = None  # Seconds from creation to start
-    time_in_progress: Optional[float] = None  # Seconds in progress
-    total_duration: Optional[float] = None  # Total seconds to completion
-    state_changes: int = 0
-    blocks_encountered: int = 0
-    retry_count: int = 0
-    
-    # APM-specific metrics
-    cpu_time: Optional[float] = None
-    memory_usage: Optional[float] = None
-    api_calls: int = 0
+    
+    __slots__ = (
+        "time_to_start", "time_in_progress", "total_duration",
+        "state_changes", "blocks_encountered", "retry_count",
+        "cpu_time", "memory_usage", "api_calls"
+    )
+    
+    def __init__(
+        self,
+        time_to_start: Optional[float] = None,  # Seconds from creation to start
+        time_in_progress: Optional[float] = None,  # Seconds in progress
+        total_duration: Optional[float] = None,  # Total seconds to completion
+        state_changes: int = 0,
+        blocks_encountered: int = 0,
+        retry_count: int = 0,
+        cpu_time: Optional[float] = None,  # APM-specific metrics
+        memory_usage: Optional[float] = None,
+        api_calls: int = 0
+    ):
+        self.time_to_start = time_to_start
+        self.time_in_progress = time_in_progress
+        self.total_duration = total_duration
+        self.state_changes = state_changes
+        self.blocks_encountered = blocks_encountered
+        self.retry_count = retry_count
+        self.cpu_time = cpu_time
+        self.memory_usage = memory_usage
+        self.api_calls = api_calls
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for APM export."""
-        return {
-            k: v for k, v in self.__dict__.items() 
-            if v is not None and v != 0
-        }
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None and value != 0:
+                result[name] = value
+        return result
 
 
-@dataclass
-class TaskEvent:
+class TaskEvent(_SlottedValue):
     """Event representing a state change or action on a task."""
-    id: UUID = field(default_factory=uuid4)
-    task_id: UUID = field(default_factory=uuid4)
-    event_type: str = ""
-    timestamp: datetime = field(default_factory=datetime.utcnow)
-    actor: str = ""
-    details: Dict[str, Any] = field(default_factory=dict)
-    correlation_id: Optional[UUID] = None
-    
-    def to_apm_format(self) -> Dict[str, Any]:
-        """Format for APM systems."""
+    
+    __slots__ = (
+        "id", "task_id", "event_type", "timestamp", "actor", "details", "correlation_id"
+    )
+    
+    def __init__(
+        self,
+        id: Optional[UUID] = None,
+        task_id: Optional[UUID] = None,
+        event_type: str = "",
+        timestamp: Optional[datetime] = None,
+        actor: str = "",
+        details: Optional[Dict[str, Any]] = None,
+        correlation_id: Optional[UUID] = None
+    ):
+        self.id = id or uuid4()
+        self.task_id = task_id or uuid4()
+        self.event_type = event_type
+        self.timestamp = timestamp or datetime.utcnow()
+        self.actor = actor
+        self.details = {} if details is None else details
+        self.correlation_id = correlation_id
+    
+    def to_apm_format(self, native: bool = False) -> Dict[str, Any]:
+        """Format for APM systems; ``native`` as for ``Task.to_dict``."""
+        text = _keep if native else str
         return {
-            "event_id": str(self.id),
-            "task_id": str(self.task_id),
+            "event_id": text(self.id),
+            "task_id": text(self.task_id),
             "type": self.event_type,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self.timestamp if native else self.timestamp.isoformat(),
             "actor": self.actor,
             "details": self.details,
-            "correlation_id": str(self.correlation_id) if self.correlation_id else None
+            "correlation_id": text(self.correlation_id) if self.correlation_id else None
         }
 
 
-@dataclass
+class _LazyAttribute:
+    """
+    Attribute backed by a slot that holds None until the attribute is first read.
+    
+    Reading allocates an empty container from ``factory`` and stores it, so
+    callers can mutate the result in place as with an ordinary attribute.
+    The underscored slot itself can be read without allocating.
+    """
+    
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+    
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.slot = owner.__dict__[f"_{name}"]
+    
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+        value = self.slot.__get__(instance, owner)
+        if value is None:
+            value = self.factory()
+            self.slot.__set__(instance, value)
+        return value
+    
+    def __set__(self, instance: Any, value: Any) -> None:
+        self.slot.__set__(instance, value)
+
+
 class Task:
-    """Core task entity."""
-    id: UUID = field(default_factory=uuid4)
-    title: str = ""
-    description: str = ""
-    status: TaskStatus = TaskStatus.PENDING
-    priority: Priority = Priority.MEDIUM
-    story_id: Optional[UUID] = None
-    epic_id: Optional[UUID] = None
-    assignee: Optional[AgentType] = None
-    labels: List[str] = field(default_factory=list)
-    metadata: Dict[str, Any] = field(default_factory=dict)
-    
-    # Timestamps
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
-    started_at: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
-    
-    # APM tracking
-    metrics: TaskMetrics = field(default_factory=TaskMetrics)
-    events: List[TaskEvent] = field(default_factory=list)
+    """
+    Core task entity.
+    
+    Slotted, since large stores keep many tasks resident. ``labels``,
+    ``metadata``, ``depends_on``, ``metrics`` and ``events`` are allocated
+    on first access; package code that only reads them uses the underscored slots
+    (None when never allocated) so reading does not allocate.
+    
+    Fields changed since the task was loaded or saved are tracked in
+    ``dirty_fields`` so repositories can write just those (see
+    ``TaskRepository.patch``). Task methods mark what they change; code
+    assigning fields directly must call ``mark_dirty`` itself.
+    """
+    
+    __slots__ = (
+        "id", "title", "description", "status", "priority", "story_id", "epic_id",
+        "assignee", "_labels", "_metadata",
+        "created_at", "updated_at", "started_at", "completed_at",
+        "_metrics", "_events", "lease_owner", "lease_expires_at", "version", "_depends_on",
+        "_saved_event_count", "_dirty"
+    )
+    
+    # Constructor arguments, in order; also used for repr and equality
+    _FIELDS = (
+        "id", "title", "description", "status", "priority", "story_id", "epic_id",
+        "assignee", "labels", "metadata",
+        "created_at", "updated_at", "started_at", "completed_at",
+        "metrics", "events", "lease_owner", "lease_expires_at", "version", "depends_on"
+    )
+    
+    labels = _LazyAttribute(list)
+    metadata = _LazyAttribute(dict)
+    depends_on = _LazyAttribute(list)  # Prerequisite task IDs
+    metrics = _LazyAttribute(TaskMetrics)
+    events = _LazyAttribute(list)
+    
+    def __init__(
+        self,
+        id: Optional[UUID] = None,
+        title: str = "",
+        description: str = "",
+        status: TaskStatus = TaskStatus.PENDING,
+        priority: Priority = Priority.MEDIUM,
+        story_id: Optional[UUID] = None,
+        epic_id: Optional[UUID] = None,
+        assignee: Optional[AgentType] = None,
+        labels: Optional[List[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
+        started_at: Optional[datetime] = None,
+        completed_at: Optional[datetime] = None,
+        metrics: Optional[TaskMetrics] = None,
+        events: Optional[List[TaskEvent]] = None,
+        lease_owner: Optional[str] = None,
+        lease_expires_at: Optional[datetime] = None,
+        version: int = 0,
+        depends_on: Optional[List[UUID]] = None
+    ):
+        self.id = id or uuid4()
+        self.title = title
+        self.description = description
+        self.status = status
+        self.priority = priority
+        self.story_id = story_id
+        self.epic_id = epic_id
+        self.assignee = assignee
+        self._labels = labels
+        self._metadata = metadata
+        
+        # Timestamps (datetimes are immutable, so a new task shares one)
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or self.created_at
+        self.started_at = started_at
+        self.completed_at = completed_at
+        
+        # APM tracking
+        self._metrics = metrics
+        self._events = events
+        
+        # Ownership lease held by the agent working on an IN_PROGRESS task
+        self.lease_owner = lease_owner
+        self.lease_expires_at = lease_expires_at
+        
+        # Optimistic concurrency: version of the stored state this copy was read at
+        self.version = version
+        
+        # Prerequisite task IDs (see core.dependencies)
+        self._depends_on = depends_on
+        
+        # Persistence bookkeeping: number of leading events already stored,
+        # and names of fields changed since (None while there are none)
+        self._saved_event_count = 0
+        self._dirty = None
+    
+    def _values(self) -> tuple:
+        """Field values in constructor order, without allocating lazy fields."""
+        values = []
+        for name in self._FIELDS:
+            attribute = getattr(type(self), name, None)
+            if isinstance(attribute, _LazyAttribute):
+                values.append(getattr(self, f"_{name}") or attribute.factory())
+            else:
+                values.append(getattr(self, name))
+        return tuple(values)
+    
+    def __repr__(self) -> str:
+        fields_repr = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self._FIELDS, self._values())
+        )
+        return f"Task({fields_repr})"
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Task):
+            return NotImplemented
+        return self._values() == other._values()
+    
+    __hash__ = None  # Mutable and compared by value
     
     def add_event(self, event_type: str, actor: str, details: Optional[Dict] = None) -> TaskEvent:
         """Add an event to the task's history."""
@@ -145,8 +332,33 @@ class Task:
             details=details or {}
         )
         self.events.append(event)
+        self.mark_dirty("events")
         return event
     
+    def unsaved_events(self) -> List[TaskEvent]:
+        """Events added since the task was last loaded or saved."""
+        return (self._events or [])[self._saved_event_count:]
+    
+    def mark_events_saved(self) -> None:
+        """Record that every current event has been persisted."""
+        self._saved_event_count = len(self._events or ())
+    
+    @property
+    def dirty_fields(self) -> FrozenSet[str]:
+        """Names of the fields changed since the task was loaded or saved."""
+        return frozenset(self._dirty or ())
+    
+    def mark_dirty(self, *fields: str) -> None:
+        """Record that ``fields`` changed and need persisting."""
+        if self._dirty is None:
+            self._dirty = set(fields)
+        else:
+            self._dirty.update(fields)
+    
+    def mark_clean(self) -> None:
+        """Record that every field change has been persisted."""
+        self._dirty = None
+    
     def transition_to(self, new_status: TaskStatus, actor: str) -> bool:
         """Transition task to a new status with validation."""
         if not self.status.can_transition_to(new_status):
@@ -155,20 +367,29 @@ class Task:
         old_status = self.status
         self.status = new_status
         self.updated_at = datetime.utcnow()
+        self.mark_dirty("status", "updated_at", "metrics")
         
         # Update timestamps based on transition
         if new_status == TaskStatus.IN_PROGRESS and not self.started_at:
             self.started_at = datetime.utcnow()
+            self.mark_dirty("started_at")
             if self.created_at:
                 self.metrics.time_to_start = (self.started_at - self.created_at).total_seconds()
         
         elif new_status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
             self.completed_at = datetime.utcnow()
+            self.mark_dirty("completed_at")
             if self.started_at:
                 self.metrics.time_in_progress = (self.completed_at - self.started_at).total_seconds()
             if self.created_at:
                 self.metrics.total_duration = (self.completed_at - self.created_at).total_seconds()
         
+        # A lease only covers active work
+        if new_status != TaskStatus.IN_PROGRESS and (self.lease_owner or self.lease_expires_at):
+            self.lease_owner = None
+            self.lease_expires_at = None
+            self.mark_dirty("lease_owner", "lease_expires_at")
+        
         # Track state changes
         self.metrics.state_changes += 1
         if new_status == TaskStatus.BLOCKED:
@@ -186,58 +407,103 @@ class Task:
         
         return True
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
+    def acquire_lease(self, owner: str, duration: timedelta) -> None:
+        """Take (or renew) ownership of the task for ``duration``."""
+        self.lease_owner = owner
+        self.lease_expires_at = datetime.utcnow() + duration
+        self.mark_dirty("lease_owner", "lease_expires_at")
+    
+    def lease_expired(self, now: Optional[datetime] = None) -> bool:
+        """Check if the task holds a lease that has run out."""
+        if self.lease_expires_at is None:
+            return False
+        return self.lease_expires_at <= (now or datetime.utcnow())
+    
+    def to_dict(self, native: bool = False) -> Dict[str, Any]:
+        """
+        Convert to dictionary for serialization.
+        
+        ``native`` leaves UUIDs, datetimes and enums as objects, for codecs
+        that encode them directly (see ``Codec.native_types``).
+        """
+        text = _keep if native else str
+        iso = _keep if native else datetime.isoformat
+        value = _keep if native else _enum_value
         return {
-            "id": str(self.id),
+            "id": text(self.id),
             "title": self.title,
             "description": self.description,
-            "status": self.status.value,
-            "priority": self.priority.value,
-            "story_id": str(self.story_id) if self.story_id else None,
-            "epic_id": str(self.epic_id) if self.epic_id else None,
-            "assignee": self.assignee.value if self.assignee else None,
-            "labels": self.labels,
-            "metadata": self.metadata,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
-            "metrics": self.metrics.to_dict(),
-            "events": [e.to_apm_format() for e in self.events[-10:]]  # Last 10 events
+            "status": value(self.status),
+            "priority": value(self.priority),
+            "story_id": text(self.story_id) if self.story_id else None,
+            "epic_id": text(self.epic_id) if self.epic_id else None,
+            "assignee": value(self.assignee) if self.assignee else None,
+            "labels": self._labels or [],
+            "metadata": self._metadata or {},
+            "created_at": iso(self.created_at) if self.created_at else None,
+            "updated_at": iso(self.updated_at) if self.updated_at else None,
+            "started_at": iso(self.started_at) if self.started_at else None,
+            "completed_at": iso(self.completed_at) if self.completed_at else None,
+            "metrics": self._metrics.to_dict() if self._metrics else {},
+            "events": [e.to_apm_format(native) for e in (self._events or [])[-10:]],  # Last 10 events
+            "depends_on": [text(task_id) for task_id in self._depends_on or ()],
+            "lease_owner": self.lease_owner,
+            "lease_expires_at": iso(self.lease_expires_at) if self.lease_expires_at else None,
+            "version": self.version
         }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Task':
-        """Create task from dictionary."""
-        task = cls()
-        
-        # Basic fields
-        if 'id' in data:
-            task.id = UUID(data['id'])
-        task.title = data.get('title', '')
-        task.description = data.get('description', '')
-        
-        # Enums
-        if 'status' in data:
-            task.status = TaskStatus(data['status'])
-        if 'priority' in data:
-            task.priority = Priority(data['priority'])
-        if 'assignee' in data and data['assignee']:
-            task.assignee = AgentType(data['assignee'])
-        
-        # Optional fields
-        if 'story_id' in data and data['story_id']:
-            task.story_id = UUID(data['story_id'])
-        if 'epic_id' in data and data['epic_id']:
-            task.epic_id = UUID(data['epic_id'])
-        
-        task.labels = data.get('labels', [])
-        task.metadata = data.get('metadata', {})
+        """Create task from dictionary, in one pass through the constructor."""
+        get = data.get
+        story_id, epic_id, assignee = get('story_id'), get('epic_id'), get('assignee')
+        depends_on, metrics = get('depends_on'), get('metrics')
         
-        # Timestamps
-        for field_name in ['created_at', 'updated_at', 'started_at', 'completed_at']:
-            if field_name in data and data[field_name]:
-                setattr(task, field_name, datetime.fromisoformat(data[field_name]))
-        
-        return task
\ No newline at end of file
+        return cls(
+            id=UUID(data['id']) if 'id' in data else None,
+            title=get('title', ''),
+            description=get('description', ''),
+            status=enum_from_value(TaskStatus, data['status']) if 'status' in data else TaskStatus.PENDING,
+            priority=enum_from_value(Priority, data['priority']) if 'priority' in data else Priority.MEDIUM,
+            story_id=UUID(story_id) if story_id else None,
+            epic_id=UUID(epic_id) if epic_id else None,
+            assignee=enum_from_value(AgentType, assignee) if assignee else None,
+            labels=get('labels') or None,
+            metadata=get('metadata') or None,
+            depends_on=[UUID(task_id) for task_id in depends_on] if depends_on else None,
+            created_at=_parse_datetime(get('created_at')),
+            updated_at=_parse_datetime(get('updated_at')),
+            started_at=_parse_datetime(get('started_at')),
+            completed_at=_parse_datetime(get('completed_at')),
+            # retry_count must survive reloads for lease expiry
+            metrics=TaskMetrics(**metrics) if metrics else None,
+            lease_owner=get('lease_owner'),
+            lease_expires_at=_parse_datetime(get('lease_expires_at')),
+            version=get('version', 0)
+        )
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp, passing None (or empty) through."""
+    return datetime.fromisoformat(value) if value else None
+
+
+def _keep(value: Any) -> Any:
+    return value
+
+
+def _enum_value(member: Enum) -> Any:
+    return member.value
+
+
+# value -> member for each entity enum; a dict hit is far cheaper than Enum(value)
+_ENUM_MEMBERS: Dict[type, Dict[Any, Enum]] = {
+    enum_cls: {member.value: member for member in enum_cls}
+    for enum_cls in (TaskStatus, Priority, AgentType)
+}
+
+
+def enum_from_value(enum_cls: type, value: Any) -> Enum:
+    """Same as ``enum_cls(value)`` (including the ValueError), but cheaper for known values."""
+    member = _ENUM_MEMBERS[enum_cls].get(value)
+    return member if member is not None else enum_cls(value)
@@ -0,0 +1,136 @@
+"""
+Serialization codecs for task storage.
+
+A codec encodes the plain values tasks serialize to (``Task.to_dict`` form,
+labels, metadata, ...) as bytes and back. File repositories use one for
+their snapshot and journal, SQLite for its JSON columns. ``json`` (the
+standard library) is always available; ``orjson`` and ``msgpack`` are used
+when installed.
+
+Codecs stop at plain values: tasks are still built from them by
+``Task.from_dict`` and serialized by ``Task.to_dict``. Parsing in C and then
+building tasks from the parsed dicts beats any single-pass decoder written
+in Python, so the codec only sets the cost of the parsing half.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Union
+
+# Optional imports for faster codecs
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+
+class Codec(ABC):
+    """Encodes JSON-compatible values; ``loads`` raises ValueError on malformed input."""
+    
+    name = ""
+    text = True  # Output is JSON text, usable in SQLite JSON columns and line journals
+    native_types = False  # Encodes UUID, datetime and Enum values itself (as JSON strings)
+    
+    @abstractmethod
+    def dumps(self, value: Any, indent: bool = False) -> bytes:
+        """Encode a value; ``indent`` asks text codecs for human-readable output."""
+        pass
+    
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode a value."""
+        pass
+    
+    def dumps_text(self, value: Any) -> str:
+        """Encode a value as a compact str (text codecs only)."""
+        return self.dumps(value).decode("utf-8")
+
+
+class JSONCodec(Codec):
+    """Standard library json."""
+    
+    name = "json"
+    
+    # Reused rather than passing separators to json.dumps, which builds a new encoder per call
+    _compact = json.JSONEncoder(separators=(",", ":"))
+    
+    def dumps(self, value: Any, indent: bool = False) -> bytes:
+        if indent:
+            return json.dumps(value, indent=2).encode("utf-8")
+        return self._compact.encode(value).encode("utf-8")
+    
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+    
+    def dumps_text(self, value: Any) -> str:
+        return self._compact.encode(value)
+
+
+class OrjsonCodec(Codec):
+    """orjson: JSON-compatible output, encoded and decoded in C."""
+    
+    name = "orjson"
+    native_types = True
+    
+    def __init__(self):
+        if not HAS_ORJSON:
+            raise ImportError("orjson required")
+    
+    def dumps(self, value: Any, indent: bool = False) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0)
+    
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack: compact binary, for file snapshots only."""
+    
+    name = "msgpack"
+    text = False
+    
+    def __init__(self):
+        if not HAS_MSGPACK:
+            raise ImportError("msgpack required")
+    
+    def dumps(self, value: Any, indent: bool = False) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+    
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except Exception as e:  # msgpack raises several unrelated types
+            raise ValueError(f"Invalid msgpack data: {e}") from e
+    
+    def dumps_text(self, value: Any) -> str:
+        raise TypeError("msgpack is a binary codec")
+
+
+_CODECS: Dict[str, Callable[[], Codec]] = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+    "msgpack": MsgpackCodec,
+}
+
+
+def register_codec(name: str, factory: Callable[[], Codec]) -> None:
+    """Make a codec available to ``create_codec`` and repository configs by name."""
+    _CODECS[name] = factory
+
+
+def create_codec(codec: Union[str, Codec] = "json") -> Codec:
+    """Factory function to resolve a codec name; codec instances pass through."""
+    if isinstance(codec, Codec):
+        return codec
+    
+    if codec not in _CODECS:
+        raise ValueError(f"Unknown codec: {codec}")
+    
+    return _CODECS[codec]()
@@ -5,15 +5,26 @@ Provides pub/sub functionality for decoupled event handling.
 """
 
 import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Dict, List, Callable, Any, Optional
+from itertools import count, groupby
+from operator import itemgetter
+from typing import Deque, Dict, List, Callable, Any, Optional, Union
 from dataclasses import dataclass
 from datetime import datetime
 import logging
 
+from .topics import TopicTrie
+
 
 logger = logging.getLogger(__name__)
 
+# How a subscribed handler is called (decided once, at subscribe time)
+_AWAIT = "await"        # Coroutine function, awaited on the loop
+_INLINE = "inline"      # Sync and inline-safe, called directly on the loop
+_BLOCKING = "blocking"  # Sync, run on the bus's thread pool
+
 
 class EventType(Enum):
     """Task lifecycle event types."""
@@ -37,6 +48,32 @@ class EventType(Enum):
     METRICS_COLLECTED = "metrics.collected"
 
 
+class BackpressurePolicy(Enum):
+    """What a queued EventBus does when a dispatch queue is full."""
+    BLOCK = "block"              # The publisher waits for room
+    DROP_OLDEST = "drop_oldest"  # The oldest queued event is discarded
+    DROP_NEWEST = "drop_newest"  # The event being published is discarded
+
+
+def inline_handler(handler: Callable) -> Callable:
+    """
+    Mark a sync handler as safe to call directly on the event loop.
+    
+    Only for handlers that return quickly and never block (counters,
+    in-memory bookkeeping); unmarked sync handlers run on a thread pool.
+    """
+    handler.inline_safe = True
+    return handler
+
+
+def _call_mode(handler: Callable, inline: Optional[bool] = None) -> str:
+    if asyncio.iscoroutinefunction(handler):
+        return _AWAIT
+    if inline is None:
+        inline = getattr(handler, "inline_safe", False)
+    return _INLINE if inline else _BLOCKING
+
+
 @dataclass
 class Event:
     """Event data structure."""
@@ -62,28 +99,92 @@ class EventBus:
     Asynchronous event bus for task events.
     
     Supports both sync and async handlers with error isolation.
+    
+    By default ``emit`` runs the handlers before returning. With
+    ``dispatchers`` > 0 it only enqueues the event, and that many background
+    tasks run the handlers, so publishing costs the same however slow the
+    handlers are. Each event type is always dispatched by the same task, so
+    handlers see events of one type in the order they were emitted. Each
+    dispatcher's queue holds up to ``queue_size`` events; ``backpressure``
+    decides what happens when it is full. Call ``drain`` before shutdown.
+    
+    Handlers of an event run one after another in priority order. With
+    ``fan_out``, handlers of equal priority run concurrently instead, and
+    each priority tier still finishes before the next starts. A handler
+    still running after ``handler_timeout`` seconds is cancelled and
+    reported to the error handlers with a TimeoutError. (A sync handler's
+    thread cannot be cancelled; the bus just stops waiting for it.)
+    
+    Sync handlers run on a thread pool owned by the bus, with at most
+    ``blocking_workers`` threads, unless they are inline-safe (marked with
+    ``inline_handler`` or subscribed with ``inline=True``): those are called
+    directly on the event loop, with no thread hop and no timeout.
+    
+    Besides exact event types, handlers can subscribe to topic patterns
+    over the dotted type names (``task.*``, ``*.completed``, ``#``; see
+    ``topics``). The handlers for each event type are resolved once and
+    cached until the next subscribe or unsubscribe, so patterns add nothing
+    to the cost of an emit.
+    
+    The last ``history_limit`` events are kept in a ring buffer, indexed by
+    type and by correlation ID, so recording an event is O(1) and filtered
+    history reads cost the number of events returned.
     """
     
-    def __init__(self):
-        self._subscribers: Dict[EventType, List[Callable]] = {}
-        self._event_history: List[Event] = []
-        self._history_limit = 1000
+    def __init__(
+        self,
+        dispatchers: int = 0,
+        queue_size: int = 1024,
+        backpressure: Union[str, BackpressurePolicy] = BackpressurePolicy.BLOCK,
+        fan_out: bool = False,
+        handler_timeout: Optional[float] = None,
+        blocking_workers: int = 4,
+        history_limit: int = 1000
+    ):
+        # Keyed by event type or pattern; entries are (handler, priority, mode, order)
+        self._subscribers: Dict[Union[EventType, str], List[tuple]] = {}
+        self._patterns = TopicTrie()
+        self._resolved: Dict[EventType, List[tuple]] = {}
+        self._order = count()
+        self._history_limit = history_limit
+        self._event_history: Deque[Event] = deque(maxlen=history_limit)
+        # Secondary rings hold the same events, so they are evicted together
+        self._history_by_type: Dict[EventType, Deque[Event]] = {}
+        self._history_by_correlation: Dict[str, Deque[Event]] = {}
         self._error_handlers: List[Callable] = []
         
+        self.fan_out = fan_out
+        self.handler_timeout = handler_timeout
+        self.blocking_workers = blocking_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.dispatchers = dispatchers
+        self.queue_size = queue_size
+        self.backpressure = BackpressurePolicy(backpressure)
+        self.dropped = 0  # Events discarded by the backpressure policy
+        self._queues: List[asyncio.Queue] = []
+        self._dispatcher_tasks: List[asyncio.Task] = []
+        self._shard_of: Dict[EventType, int] = {}
+    
     def subscribe(
         self,
-        event_type: EventType,
+        event_type: Union[EventType, str],
         handler: Callable,
-        priority: int = 0
+        priority: int = 0,
+        inline: Optional[bool] = None
     ) -> None:
         """
-        Subscribe to an event type.
+        Subscribe to an event type or a topic pattern.
         
         Args:
-            event_type: The type of event to subscribe to
+            event_type: The type of event to subscribe to, or a pattern
+                such as ``"task.*"`` (raises ValueError if malformed)
             handler: Callable that will receive (event, *args)
             priority: Higher priority handlers are called first
+            inline: For sync handlers, whether to call them on the event
+                loop; defaults to whether they are marked ``inline_handler``
         """
+        if isinstance(event_type, str):
+            self._patterns.add(event_type)
         if event_type not in self._subscribers:
             self._subscribers[event_type] = []
         
@@ -92,21 +193,45 @@ class EventBus:
         insert_pos = 0
         
         # Find insertion position based on priority
-        for i, (_, existing_priority) in enumerate(handlers):
+        for i, (_, existing_priority, _, _) in enumerate(handlers):
             if priority > existing_priority:
                 break
             insert_pos = i + 1
         
-        handlers.insert(insert_pos, (handler, priority))
-        logger.debug(f"Subscribed {handler.__name__} to {event_type.value}")
+        handlers.insert(
+            insert_pos,
+            (handler, priority, _call_mode(handler, inline), next(self._order))
+        )
+        self._resolved.clear()
+        logger.debug(f"Subscribed {handler.__name__} to {_topic(event_type)}")
     
-    def unsubscribe(self, event_type: EventType, handler: Callable) -> None:
-        """Unsubscribe from an event type."""
+    def unsubscribe(self, event_type: Union[EventType, str], handler: Callable) -> None:
+        """Unsubscribe from an event type or topic pattern."""
         if event_type in self._subscribers:
-            self._subscribers[event_type] = [
-                (h, p) for h, p in self._subscribers[event_type]
-                if h != handler
+            handlers = [
+                entry for entry in self._subscribers[event_type]
+                if entry[0] != handler
             ]
+            if handlers:
+                self._subscribers[event_type] = handlers
+            else:
+                del self._subscribers[event_type]
+                if isinstance(event_type, str):
+                    self._patterns.remove(event_type)
+            self._resolved.clear()
+    
+    def _handlers_for(self, event_type: EventType) -> List[tuple]:
+        """Handlers for an event type, exact and pattern subscriptions merged."""
+        handlers = self._resolved.get(event_type)
+        if handlers is None:
+            handlers = list(self._subscribers.get(event_type, ()))
+            if self._patterns:
+                for pattern in self._patterns.match(event_type.value):
+                    handlers.extend(self._subscribers[pattern])
+                # Priority first, then subscription order, as for exact types
+                handlers.sort(key=lambda entry: (-entry[1], entry[3]))
+            self._resolved[event_type] = handlers
+        return handlers
     
     async def emit(
         self,
@@ -137,95 +262,277 @@ class EventBus:
         # Add to history
         self._add_to_history(event)
         
-        # Get subscribers for this event type
-        handlers = self._subscribers.get(event_type, [])
+        if not self._handlers_for(event_type):
+            return
         
-        # Also get wildcard subscribers if implemented
-        # handlers.extend(self._subscribers.get(EventType.ALL, []))
+        if self.dispatchers > 0:
+            await self._enqueue(event, args)
+        else:
+            await self._dispatch(event, args)
+    
+    async def _dispatch(self, event: Event, args: tuple) -> None:
+        """Run the handlers subscribed to the event's type."""
+        # Get subscribers for this event type, including matching patterns
+        handlers = self._handlers_for(event.type)
         
         logger.debug(
-            f"Emitting {event_type.value} to {len(handlers)} handlers"
+            f"Emitting {event.type.value} to {len(handlers)} handlers"
         )
         
-        # Execute handlers
-        for handler, _ in handlers:
-            try:
-                # Check if handler is async
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(data, *args)
+        # Execute handlers; inline ones are called right here, without a coroutine
+        if not self.fan_out:
+            for handler, _, mode, _ in handlers:
+                if mode == _INLINE:
+                    try:
+                        handler(event.data, *args)
+                    except Exception as e:
+                        await self._handler_failed(event, handler, e)
                 else:
-                    # Run sync handler in thread pool to avoid blocking
-                    await asyncio.get_event_loop().run_in_executor(
-                        None, handler, data, *args
-                    )
-            except Exception as e:
+                    await self._run_handler(handler, mode, event, args)
+            return
+        
+        # Handlers are kept sorted by priority, so each group is one tier
+        for _, tier in groupby(handlers, key=itemgetter(1)):
+            pending = []
+            for handler, _, mode, _ in tier:
+                if mode == _INLINE:
+                    try:
+                        handler(event.data, *args)
+                    except Exception as e:
+                        await self._handler_failed(event, handler, e)
+                else:
+                    pending.append(self._run_handler(handler, mode, event, args))
+            if pending:
+                await asyncio.gather(*pending)
+    
+    async def _run_handler(self, handler: Callable, mode: str, event: Event, args: tuple) -> None:
+        """Run an async or blocking handler, isolating its errors and enforcing ``handler_timeout``."""
+        try:
+            if mode == _AWAIT:
+                call = handler(event.data, *args)
+            else:
+                call = asyncio.get_running_loop().run_in_executor(
+                    self._blocking_executor(), handler, event.data, *args
+                )
+            
+            if self.handler_timeout is None:
+                await call
+            else:
+                await asyncio.wait_for(call, self.handler_timeout)
+        except Exception as e:
+            await self._handler_failed(event, handler, e)
+    
+    async def _handler_failed(self, event: Event, handler: Callable, error: Exception) -> None:
+        """Log a handler failure and pass it to the error handlers."""
+        if isinstance(error, asyncio.TimeoutError):
+            logger.error(
+                f"Event handler {handler.__name__} timed out after {self.handler_timeout}s"
+            )
+        else:
+            logger.error(
+                f"Error in event handler {handler.__name__}: {error}",
+                exc_info=error
+            )
+        # Call error handlers
+        for error_handler in self._error_handlers:
+            try:
+                await self._call_handler(
+                    error_handler,
+                    event,
+                    handler,
+                    error
+                )
+            except Exception as eh_error:
                 logger.error(
-                    f"Error in event handler {handler.__name__}: {e}",
+                    f"Error in error handler: {eh_error}",
                     exc_info=True
                 )
-                # Call error handlers
-                for error_handler in self._error_handlers:
-                    try:
-                        await self._call_handler(
-                            error_handler,
-                            event,
-                            handler,
-                            e
-                        )
-                    except Exception as eh_error:
-                        logger.error(
-                            f"Error in error handler: {eh_error}",
-                            exc_info=True
-                        )
+    
+    def _blocking_executor(self) -> ThreadPoolExecutor:
+        """The bus's thread pool for blocking handlers, created on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.blocking_workers, thread_name_prefix="event-handler"
+            )
+        return self._executor
+    
+    async def _enqueue(self, event: Event, args: tuple) -> None:
+        """Queue an event for its type's dispatcher, applying the backpressure policy."""
+        if not self._dispatcher_tasks:
+            self._start_dispatchers()
+        
+        # Event types are assigned to dispatchers round-robin on first use
+        shard = self._shard_of.get(event.type)
+        if shard is None:
+            shard = self._shard_of[event.type] = len(self._shard_of) % self.dispatchers
+        queue = self._queues[shard]
+        
+        if self.backpressure == BackpressurePolicy.BLOCK:
+            await queue.put((event, args))
+            return
+        
+        if queue.full():
+            self.dropped += 1
+            if self.backpressure == BackpressurePolicy.DROP_NEWEST:
+                logger.debug(f"Dispatch queue full, dropped {event.type.value} event")
+                return
+            dropped, _ = queue.get_nowait()
+            queue.task_done()
+            logger.debug(f"Dispatch queue full, dropped {dropped.type.value} event")
+        queue.put_nowait((event, args))
+    
+    def _start_dispatchers(self) -> None:
+        self._queues = [asyncio.Queue(self.queue_size) for _ in range(self.dispatchers)]
+        self._dispatcher_tasks = [
+            asyncio.ensure_future(self._run_dispatcher(queue)) for queue in self._queues
+        ]
+    
+    async def _run_dispatcher(self, queue: asyncio.Queue) -> None:
+        """Dispatch queued events one at a time, in order."""
+        while True:
+            event, args = await queue.get()
+            try:
+                await self._dispatch(event, args)
+            except Exception as e:
+                logger.error(f"Event dispatcher failed on {event.type.value}: {e}", exc_info=True)
+            finally:
+                queue.task_done()
+    
+    async def drain(self) -> None:
+        """
+        Wait until every queued event has been handled, then stop the
+        dispatchers and the blocking-handler thread pool.
+        
+        Events emitted afterwards start them again.
+        """
+        tasks, queues = self._dispatcher_tasks, self._queues
+        if tasks:
+            await asyncio.gather(*(queue.join() for queue in queues))
+            
+            # Detach first, so events emitted while the tasks wind down start new ones
+            if self._dispatcher_tasks is tasks:
+                self._dispatcher_tasks, self._queues = [], []
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if self._executor is not None:
+            # Nothing is waiting on it now; timed-out handlers finish on their own
+            self._executor.shutdown(wait=False)
+            self._executor = None
     
     def add_error_handler(self, handler: Callable) -> None:
         """Add a handler for errors in event processing."""
         self._error_handlers.append(handler)
     
     def _add_to_history(self, event: Event) -> None:
-        """Add event to history with size limit."""
-        self._event_history.append(event)
+        """Add event to history, evicting the oldest event once full."""
+        if not self._history_limit:
+            return
+        history = self._event_history
+        if len(history) == self._history_limit:
+            # Events leave every ring in arrival order, so the oldest is leftmost
+            oldest = history[0]
+            self._evict(self._history_by_type, oldest.type)
+            if oldest.correlation_id is not None:
+                self._evict(self._history_by_correlation, oldest.correlation_id)
         
-        # Trim history if needed
-        if len(self._event_history) > self._history_limit:
-            self._event_history = self._event_history[-self._history_limit:]
+        history.append(event)
+        ring = self._history_by_type.get(event.type)
+        if ring is None:
+            ring = self._history_by_type[event.type] = deque()
+        ring.append(event)
+        if event.correlation_id is not None:
+            ring = self._history_by_correlation.get(event.correlation_id)
+            if ring is None:
+                ring = self._history_by_correlation[event.correlation_id] = deque()
+            ring.append(event)
+    
+    @staticmethod
+    def _evict(rings: Dict[Any, Deque[Event]], key: Any) -> None:
+        ring = rings[key]
+        ring.popleft()
+        if not ring:
+            del rings[key]
     
     def get_history(
         self,
         event_type: Optional[EventType] = None,
-        limit: int = 100
+        limit: Optional[int] = 100,
+        correlation_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
     ) -> List[Event]:
-        """Get event history, optionally filtered by type."""
-        history = self._event_history
+        """
+        Get the most recent events, oldest first, optionally filtered.
         
-        if event_type:
-            history = [e for e in history if e.type == event_type]
+        Args:
+            event_type: Only events of this type
+            limit: Most events to return (None for all that match)
+            correlation_id: Only events with this correlation ID
+            since: Only events emitted at or after this time (UTC, like utcnow)
+            until: Only events emitted at or before this time
+        """
+        if correlation_id is not None:
+            history = self._history_by_correlation.get(correlation_id, ())
+        elif event_type is not None:
+            history = self._history_by_type.get(event_type, ())
+        else:
+            history = self._event_history
+        
+        # Walk back from the newest event, stopping once past the window
+        found = []
+        for event in reversed(history):
+            if limit is not None and len(found) >= limit:
+                break
+            if until is not None and event.timestamp > until:
+                continue
+            if since is not None and event.timestamp < since:
+                break
+            if correlation_id is not None and event_type is not None and event.type != event_type:
+                continue
+            found.append(event)
         
-        return history[-limit:]
+        found.reverse()
+        return found
     
     async def _call_handler(self, handler: Callable, *args) -> Any:
         """Call handler with proper async/sync handling."""
-        if asyncio.iscoroutinefunction(handler):
+        mode = _call_mode(handler)
+        if mode == _AWAIT:
             return await handler(*args)
+        elif mode == _INLINE:
+            return handler(*args)
         else:
-            return await asyncio.get_event_loop().run_in_executor(
-                None, handler, *args
+            return await asyncio.get_running_loop().run_in_executor(
+                self._blocking_executor(), handler, *args
             )
     
     def clear(self) -> None:
         """Clear all subscribers and history."""
         self._subscribers.clear()
+        self._patterns = TopicTrie()
+        self._resolved.clear()
         self._event_history.clear()
+        self._history_by_type.clear()
+        self._history_by_correlation.clear()
         self._error_handlers.clear()
     
     def get_subscriber_count(self, event_type: Optional[EventType] = None) -> int:
-        """Get count of subscribers for an event type or all types."""
+        """
+        Get count of subscribers for an event type (including matching
+        patterns) or of all subscriptions.
+        """
         if event_type:
-            return len(self._subscribers.get(event_type, []))
+            return len(self._handlers_for(event_type))
         else:
             return sum(len(handlers) for handlers in self._subscribers.values())
 
 
+def _topic(event_type: Union[EventType, str]) -> str:
+    return event_type if isinstance(event_type, str) else event_type.value
+
+
 # Global event bus instance (can be overridden)
 _global_event_bus = EventBus()
 
@@ -0,0 +1,245 @@
+"""
+Group commit for task repositories.
+
+Wraps any TaskRepository so that saves arriving close together are
+coalesced into a single ``save_many`` call - one transaction for SQLite,
+one file write for the JSON stores - instead of one commit each.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+from uuid import UUID
+
+from ..domain.entities import Task, TaskEvent, AgentType
+from .query import TaskFilter, TaskOrder
+from .repository import TaskRepository, VersionConflictError
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingSave:
+    """A task waiting in the current batch and the callers waiting on it."""
+    task: Task
+    expected_version: Optional[int]
+    waiters: List[asyncio.Future] = field(default_factory=list)
+
+
+class GroupCommitRepository(TaskRepository):
+    """
+    Repository decorator that batches concurrent saves.
+    
+    A save joins the current batch and waits. The batch is flushed through
+    the wrapped repository's ``save_many`` once ``window`` seconds have passed
+    since its first save or it reaches ``max_batch`` tasks, whichever comes
+    first. Each caller's ``save`` returns only after its batch has been
+    written (or raises the error the write failed with), so durability
+    guarantees match the wrapped repository.
+    
+    Conditional saves (``expected_version``) are checked against the
+    wrapped repository and earlier saves in the same batch just before the
+    batch is written; a conflicting save fails on its own without holding
+    back the rest. The check is atomic only with respect to writes made
+    through this wrapper.
+    
+    Reads go straight to the wrapped repository and see only flushed data.
+    Other mutations flush pending saves first so operations stay ordered.
+    """
+    
+    def __init__(
+        self,
+        repository: TaskRepository,
+        window: float = 0.002,
+        max_batch: int = 256
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        
+        self.repository = repository
+        self.window = window
+        self.max_batch = max_batch
+        
+        self._pending: Dict[int, _PendingSave] = {}  # Keyed by object identity
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_lock = asyncio.Lock()
+        self._flushes: Set[asyncio.Task] = set()
+    
+    async def save(self, task: Task, expected_version: Optional[int] = None) -> None:
+        """Add the task to the current batch and wait for it to be written."""
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        
+        # Saving the same object twice in a window writes it once; distinct
+        # copies of one task are all written, in order, so none of their
+        # new events are dropped
+        pending = self._pending.get(id(task))
+        if pending is None:
+            pending = self._pending[id(task)] = _PendingSave(task, expected_version)
+        pending.waiters.append(waiter)
+        
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush)
+        
+        await waiter
+    
+    def _take_batch(self) -> tuple:
+        """Detach the pending batch so new saves start a fresh one."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, {}
+        return list(batch.values())
+    
+    def _start_flush(self) -> None:
+        """Flush the current batch in the background."""
+        flush = asyncio.ensure_future(self._write_batch(self._take_batch()))
+        self._flushes.add(flush)
+        flush.add_done_callback(self._flushes.discard)
+    
+    @staticmethod
+    def _resolve(waiters: List[asyncio.Future], error: Optional[BaseException] = None) -> None:
+        """Wake savers with a result or an error."""
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if error is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(error)
+    
+    async def _check_versions(self, batch: List[_PendingSave]) -> tuple:
+        """Split a batch into (accepted, conflicts) by checking expected versions."""
+        checked = {p.task.id for p in batch if p.expected_version is not None}
+        if not checked:
+            return batch, []
+        
+        stored = await self.repository.get_many(checked)
+        versions = {task_id: task.version for task_id, task in stored.items()}
+        
+        accepted, conflicts = [], []
+        for pending in batch:
+            task = pending.task
+            current = versions.get(task.id, 0)
+            if pending.expected_version is not None and current != pending.expected_version:
+                conflicts.append(
+                    (pending, VersionConflictError(task.id, pending.expected_version, current))
+                )
+                continue
+            
+            # Later saves of this task in the batch are checked against this one
+            versions[task.id] = max(current, task.version) + 1
+            accepted.append(pending)
+        return accepted, conflicts
+    
+    async def _write_batch(self, batch: List[_PendingSave]) -> None:
+        """Write one batch and wake its savers; batches are written in order."""
+        async with self._flush_lock:
+            if not batch:
+                return
+            
+            conflicts = []
+            try:
+                batch, conflicts = await self._check_versions(batch)
+                if batch:
+                    await self.repository.save_many([p.task for p in batch])
+            except Exception as e:
+                logger.error(f"Group commit of {len(batch)} tasks failed: {e}")
+                for pending in batch:
+                    self._resolve(pending.waiters, e)
+            else:
+                for pending in batch:
+                    self._resolve(pending.waiters)
+            
+            # Only after the write, so a retrying caller re-reads the winning version
+            for pending, error in conflicts:
+                self._resolve(pending.waiters, error)
+    
+    async def flush(self) -> None:
+        """Write every pending save now, after any batches already in flight."""
+        await self._write_batch(self._take_batch())
+    
+    async def get(self, task_id: UUID) -> Optional[Task]:
+        """Get a task from the wrapped repository."""
+        return await self.repository.get(task_id)
+    
+    async def list(self) -> List[Task]:
+        """List tasks from the wrapped repository."""
+        return await self.repository.list()
+    
+    async def query(
+        self,
+        filter_spec: Optional[TaskFilter] = None,
+        order: TaskOrder = TaskOrder.PRIORITY,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Task]:
+        """Query the wrapped repository."""
+        return await self.repository.query(filter_spec, order, limit, offset, fields)
+    
+    async def get_events(
+        self,
+        task_id: UUID,
+        after: Optional[UUID] = None,
+        limit: int = 100
+    ) -> List[TaskEvent]:
+        """Page events from the wrapped repository."""
+        return await self.repository.get_events(task_id, after, limit)
+    
+    async def get_many(self, task_ids: Iterable[UUID]) -> Dict[UUID, Task]:
+        """Get several tasks from the wrapped repository."""
+        return await self.repository.get_many(task_ids)
+    
+    async def claim_next(
+        self,
+        assignee: AgentType,
+        labels: Optional[List[str]] = None,
+        actor: str = "system",
+        lease: Optional[timedelta] = None
+    ) -> Optional[Task]:
+        """Flush pending saves, then claim through the wrapped repository."""
+        await self.flush()
+        return await self.repository.claim_next(assignee, labels, actor, lease)
+    
+    async def expired_leases(self, now: datetime, limit: int = 100) -> List[Task]:
+        """Find expired leases in the wrapped repository."""
+        return await self.repository.expired_leases(now, limit)
+    
+    async def save_many(self, tasks: Iterable[Task]) -> None:
+        """Flush pending saves, then save the batch directly."""
+        await self.flush()
+        await self.repository.save_many(tasks)
+    
+    async def patch_many(self, tasks: Iterable[Task]) -> List[UUID]:
+        """Flush pending saves, then patch the batch directly."""
+        await self.flush()
+        return await self.repository.patch_many(tasks)
+    
+    async def delete(self, task_id: UUID) -> bool:
+        """Flush pending saves, then delete."""
+        await self.flush()
+        return await self.repository.delete(task_id)
+    
+    async def delete_many(self, task_ids: Iterable[UUID]) -> int:
+        """Flush pending saves, then delete several tasks."""
+        await self.flush()
+        return await self.repository.delete_many(task_ids)
+    
+    async def clear(self) -> None:
+        """Flush pending saves, then clear the wrapped repository."""
+        await self.flush()
+        await self.repository.clear()
+    
+    async def close(self) -> None:
+        """Flush pending saves and close the wrapped repository."""
+        await self.flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.repository.close()
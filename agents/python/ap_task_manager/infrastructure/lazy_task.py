@@ -0,0 +1,164 @@
+"""
+Lazily hydrated tasks.
+
+A LazyTask keeps the raw storage row it was read from and decodes each
+field the first time it is read, so callers that only look at a few fields
+of many tasks (listings, the CLI) never pay for parsing the rest. It is a
+Task subclass and stays a drop-in everywhere a Task is expected.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+from uuid import UUID
+
+from ..domain.entities import Task, TaskMetrics
+from .codecs import Codec
+from .sqlite_schema import STATUS_BY_CODE, PRIORITY_BY_CODE, AGENT_BY_CODE, from_epoch_us
+
+
+# Public attributes stored in a differently named slot (see Task)
+_SLOT_OF = {
+    "labels": "_labels",
+    "metadata": "_metadata",
+    "depends_on": "_depends_on",
+    "metrics": "_metrics",
+    "events": "_events",
+}
+
+
+class TaskRowDecoder:
+    """
+    Decodes task fields from SQLite rows (see ``sqlite_schema``).
+    
+    ``columns`` names the row's columns in order; each task field is read
+    from the column of the same name. Fields whose column is missing (a
+    projected query) are not loaded. Tasks carry events only if
+    ``with_events`` - they are stored apart from the row.
+    """
+    
+    def __init__(self, columns: Sequence[str], codec: Codec, with_events: bool = True):
+        self.columns = tuple(columns)
+        self.with_events = with_events
+        
+        loads = codec.loads
+        converters: Dict[str, Tuple[str, Callable[[Any], Any]]] = {
+            "id": ("id", UUID),
+            "title": ("title", _keep),
+            "description": ("description", lambda value: value or ""),
+            "status": ("status", STATUS_BY_CODE.__getitem__),
+            "priority": ("priority", PRIORITY_BY_CODE.__getitem__),
+            "story_id": ("story_id", _optional(UUID)),
+            "epic_id": ("epic_id", _optional(UUID)),
+            "assignee": ("assignee", _optional(AGENT_BY_CODE.__getitem__)),
+            # Empty JSON columns are recognized without decoding and left lazy
+            "_labels": ("labels", lambda value: loads(value) if value and value != "[]" else None),
+            "_metadata": ("metadata", lambda value: loads(value) if value and value != "{}" else None),
+            "_depends_on": ("depends_on", lambda value: (
+                [UUID(task_id) for task_id in loads(value)] if value and value != "[]" else None
+            )),
+            "created_at": ("created_at", from_epoch_us),
+            "updated_at": ("updated_at", from_epoch_us),
+            "started_at": ("started_at", from_epoch_us),
+            "completed_at": ("completed_at", from_epoch_us),
+            "_metrics": ("metrics", lambda value: (
+                TaskMetrics(**loads(value)) if value and value != "{}" else None
+            )),
+            "lease_owner": ("lease_owner", _keep),
+            "lease_expires_at": ("lease_expires_at", from_epoch_us),
+            "version": ("version", _keep),
+        }
+        
+        position = {name: i for i, name in enumerate(self.columns)}
+        self._fields = {
+            slot: (position[column], convert)
+            for slot, (column, convert) in converters.items()
+            if column in position
+        }
+    
+    def loads_field(self, slot: str) -> bool:
+        """Check if rows for this decoder carry the field stored in ``slot``."""
+        return slot in self._fields
+    
+    def decode(self, row: tuple, slot: str) -> Any:
+        """Decode the field stored in ``slot`` from a row."""
+        index, convert = self._fields[slot]
+        return convert(row[index])
+
+
+class LazyTask(Task):
+    """
+    Task over a raw row whose fields are decoded on first access.
+    
+    Decoded (or assigned) fields are stored in the task's slots as usual,
+    so each field is decoded at most once. Reading a field the row does not
+    carry raises AttributeError; such partial tasks must not be saved.
+    """
+    
+    __slots__ = ("_row", "_decoder")
+    
+    def __init__(self, row: tuple, decoder: TaskRowDecoder):
+        # Task.__init__ is skipped: field slots stay empty until first read
+        self._row = row
+        self._decoder = decoder
+        self._saved_event_count = 0
+        self._dirty = None
+        if decoder.with_events:
+            self._events = None
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only reached when normal lookup fails, i.e. for a field slot not set yet
+        if name in ("_row", "_decoder"):
+            raise AttributeError(name)
+        
+        slot = _SLOT_OF.get(name, name)
+        if not self._decoder.loads_field(slot):
+            if name in Task._FIELDS or slot in Task.__slots__:
+                raise AttributeError(f"Task field {name!r} was not loaded by this query")
+            raise AttributeError(f"'LazyTask' object has no attribute {name!r}")
+        
+        setattr(self, slot, self._decoder.decode(self._row, slot))
+        return getattr(self, name)
+    
+    def __reduce__(self) -> tuple:
+        # Pickles and copies are plain Tasks holding every field the row carries
+        state = {}
+        for slot in Task.__slots__:
+            try:
+                state[slot] = getattr(self, slot)
+            except AttributeError:
+                continue  # Not loaded by a projected query
+        return _restore_task, (state,)
+
+
+def projection_columns(fields: Optional[Iterable[str]], all_columns: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Columns to fetch for the requested task fields, ``id`` always included.
+    
+    None selects every column. Raises ValueError for unknown fields.
+    """
+    if fields is None:
+        return tuple(all_columns)
+    
+    wanted = {"id"}
+    for name in fields:
+        if name not in Task._FIELDS:
+            raise ValueError(f"Unknown task field: {name}")
+        if name != "events":  # Stored apart from the row
+            wanted.add(name)
+    return tuple(column for column in all_columns if column in wanted)
+
+
+def _restore_task(state: Dict[str, Any]) -> Task:
+    """Rebuild a plain Task from the slots of a LazyTask (see LazyTask.__reduce__)."""
+    task = Task.__new__(Task)
+    for slot, value in state.items():
+        setattr(task, slot, value)
+    return task
+
+
+def _keep(value: Any) -> Any:
+    return value
+
+
+def _optional(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap a converter to pass NULL (or empty) columns through as None."""
+    return lambda value: convert(value) if value else None
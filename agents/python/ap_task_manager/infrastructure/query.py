@@ -0,0 +1,102 @@
+"""
+Query specification shared by the repository backends.
+
+A query is a ``TaskFilter`` (what to match), a ``TaskOrder`` (how to sort)
+and an optional limit/offset window. Backends translate it into their native
+form - SQL for SQLite, direct predicate evaluation for the in-memory and JSON
+stores - so callers never need to load every task to answer a query.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from ..domain.entities import Task, TaskStatus, Priority, AgentType
+
+
+@dataclass
+class TaskFilter:
+    """Conjunction of optional task predicates. Unset fields match everything."""
+    status: Optional[TaskStatus] = None
+    assignee: Optional[AgentType] = None
+    priority: Optional[Priority] = None
+    story_id: Optional[UUID] = None
+    epic_id: Optional[UUID] = None
+    labels: Optional[List[str]] = None  # Matches tasks carrying any of these labels
+    created_after: Optional[datetime] = None
+
+    @property
+    def is_empty(self) -> bool:
+        """True when the filter matches every task."""
+        return not (
+            self.status or self.assignee or self.priority or self.story_id
+            or self.epic_id or self.labels or self.created_after
+        )
+
+    def matches(self, task: Task) -> bool:
+        """Check a task against every set predicate."""
+        if self.status and task.status != self.status:
+            return False
+        if self.assignee and task.assignee != self.assignee:
+            return False
+        if self.priority and task.priority != self.priority:
+            return False
+        if self.story_id and task.story_id != self.story_id:
+            return False
+        if self.epic_id and task.epic_id != self.epic_id:
+            return False
+        if self.labels and not any(label in (task._labels or ()) for label in self.labels):
+            return False
+        if self.created_after and task.created_at < self.created_after:
+            return False
+        return True
+
+    def matches_dict(self, data: Dict[str, Any]) -> bool:
+        """
+        Check a serialized task (``Task.to_dict`` form) against the filter.
+
+        Lets file-backed stores skip deserializing tasks that cannot match.
+        """
+        if self.status and data.get("status") != self.status.value:
+            return False
+        if self.assignee and data.get("assignee") != self.assignee.value:
+            return False
+        if self.priority and data.get("priority") != self.priority.value:
+            return False
+        if self.story_id and data.get("story_id") != str(self.story_id):
+            return False
+        if self.epic_id and data.get("epic_id") != str(self.epic_id):
+            return False
+        if self.labels:
+            task_labels = data.get("labels") or []
+            if not any(label in task_labels for label in self.labels):
+                return False
+        if self.created_after:
+            created_at = data.get("created_at")
+            if not created_at or datetime.fromisoformat(created_at) < self.created_after:
+                return False
+        return True
+
+
+class TaskOrder(Enum):
+    """Supported result orderings."""
+    PRIORITY = "priority"  # Highest priority first, then oldest first
+    CREATED_AT = "created_at"  # Oldest first
+
+    @property
+    def sort_key(self) -> Callable[[Task], Any]:
+        """Key function producing this ordering with an ascending sort."""
+        if self == TaskOrder.PRIORITY:
+            return lambda t: (-t.priority.weight, t.created_at)
+        return lambda t: t.created_at
+
+
+def apply_window(tasks: List[Task], limit: Optional[int], offset: int) -> List[Task]:
+    """Apply offset/limit to an already ordered result list."""
+    if offset:
+        tasks = tasks[offset:]
+    if limit is not None:
+        tasks = tasks[:limit]
+    return tasks
@@ -4,25 +4,53 @@ Repository pattern implementation for task persistence.
 Provides abstraction for data storage with multiple backend options.
 """
 
-import json
+import os
 import sqlite3
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Iterable, Sequence, Set, Union
 from uuid import UUID
 import asyncio
-import aiosqlite
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
 
-from ..domain.entities import Task, TaskStatus, Priority, AgentType
+from ..domain.entities import Task, TaskEvent, TaskStatus, AgentType, SATISFIED_STATUSES
+from .codecs import Codec, create_codec
+from .lazy_task import LazyTask, TaskRowDecoder, projection_columns
+from .query import TaskFilter, TaskOrder, apply_window
+from .sqlite_pool import SQLiteConnectionPool, SQLitePragmas
+from .sqlite_schema import (
+    TASK_COLUMNS, EVENT_COLUMNS, STATUS_CODES, PRIORITY_CODES, AGENT_CODES,
+    ensure_schema, to_epoch_us, from_epoch_us
+)
+from .task_index import TaskIndex
+
+
+class VersionConflictError(Exception):
+    """Raised when a conditional save finds the task at a different stored version."""
+    
+    def __init__(self, task_id: UUID, expected: int, actual: int):
+        super().__init__(f"Task {task_id} is at version {actual}, expected {expected}")
+        self.task_id = task_id
+        self.expected = expected
+        self.actual = actual
 
 
 class TaskRepository(ABC):
-    """Abstract base class for task persistence."""
+    """
+    Abstract base class for task persistence.
+    
+    Every save bumps the task's ``version``. Passing ``expected_version``
+    makes the save a compare-and-swap: it only succeeds if the stored task
+    is still at that version (0 meaning "does not exist yet") and raises
+    VersionConflictError otherwise, so concurrent read-modify-write cycles
+    on the same task detect each other instead of losing updates.
+    """
     
     @abstractmethod
-    async def save(self, task: Task) -> None:
-        """Save or update a task."""
+    async def save(self, task: Task, expected_version: Optional[int] = None) -> None:
+        """Save or update a task, optionally only if it is at ``expected_version``."""
         pass
     
     @abstractmethod
@@ -30,6 +58,41 @@ class TaskRepository(ABC):
         """Get a task by ID."""
         pass
     
+    async def patch(
+        self,
+        task: Task,
+        fields: Optional[Iterable[str]] = None,
+        expected_version: Optional[int] = None
+    ) -> None:
+        """
+        Persist changes to some fields of a task, plus its new events.
+        
+        ``fields`` defaults to ``task.dirty_fields``. Backends that can
+        should write only those fields; a task that is not stored yet is
+        saved whole. Versioning works as for ``save``. The default saves
+        the whole task.
+        """
+        _patch_fields(task, fields)
+        await self.save(task, expected_version)
+        task.mark_clean()
+    
+    async def patch_many(self, tasks: Iterable[Task]) -> List[UUID]:
+        """
+        Patch several tasks, each only if still at the version it was read at.
+        
+        Each task's ``dirty_fields`` are written as by ``patch`` with
+        ``expected_version=task.version``. Tasks that conflict are skipped
+        and their IDs returned; the rest are written. Backends should
+        override this to write them in one transaction.
+        """
+        conflicts = []
+        for task in tasks:
+            try:
+                await self.patch(task, expected_version=task.version)
+            except VersionConflictError:
+                conflicts.append(task.id)
+        return conflicts
+    
     @abstractmethod
     async def list(self) -> List[Task]:
         """List all tasks."""
@@ -44,98 +107,402 @@ class TaskRepository(ABC):
     async def clear(self) -> None:
         """Clear all tasks."""
         pass
+    
+    async def query(
+        self,
+        filter_spec: Optional[TaskFilter] = None,
+        order: TaskOrder = TaskOrder.PRIORITY,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Task]:
+        """
+        Return tasks matching ``filter_spec`` in ``order``, windowed by limit/offset.
+        
+        ``fields`` names the task fields the caller will read. Backends that
+        support projection load only those (plus ``id``); reading any other
+        field of such a partial task raises AttributeError, and it must not
+        be saved. Others ignore it and return whole tasks.
+        
+        Backends should override this to filter and sort in storage; the
+        default loads every task and evaluates the query in Python.
+        """
+        filter_spec = filter_spec or TaskFilter()
+        matched = [task for task in await self.list() if filter_spec.matches(task)]
+        matched.sort(key=order.sort_key)
+        return apply_window(matched, limit, offset)
+    
+    async def get_events(
+        self,
+        task_id: UUID,
+        after: Optional[UUID] = None,
+        limit: int = 100
+    ) -> List[TaskEvent]:
+        """
+        Page through a task's event history, oldest first.
+        
+        Args:
+            task_id: Task whose history to read
+            after: ID of the last event of the previous page, if any
+            limit: Maximum number of events to return
+        """
+        task = await self.get(task_id)
+        if not task:
+            return []
+        
+        events = task.events
+        if after is not None:
+            positions = [i for i, e in enumerate(events) if e.id == after]
+            events = events[positions[0] + 1:] if positions else []
+        return events[:limit]
+    
+    async def claim_next(
+        self,
+        assignee: AgentType,
+        labels: Optional[List[str]] = None,
+        actor: str = "system",
+        lease: Optional[timedelta] = None
+    ) -> Optional[Task]:
+        """
+        Atomically move the next pending task for ``assignee`` to IN_PROGRESS.
+        
+        Picks the highest-priority, oldest PENDING task assigned to
+        ``assignee`` (carrying any of ``labels``, if given) whose
+        ``depends_on`` prerequisites are all COMPLETED or ARCHIVED, and
+        returns it after the transition is saved, or None if there is
+        nothing to claim. A prerequisite missing from the repository counts
+        as unmet. Concurrent claimers never receive the same task. With
+        ``lease``, the claimed task is leased to ``actor`` for that long.
+        
+        The default picks a candidate and saves it with a version check,
+        trying again if another writer got there first.
+        """
+        filter_spec = TaskFilter(status=TaskStatus.PENDING, assignee=assignee, labels=labels)
+        while True:
+            task = await self._next_ready(filter_spec)
+            if task is None:
+                return None
+            
+            expected_version = task.version
+            if not task.transition_to(TaskStatus.IN_PROGRESS, actor):
+                continue  # Claimed through a shared object since the query
+            if lease:
+                task.acquire_lease(actor, lease)
+            
+            try:
+                await self.save(task, expected_version=expected_version)
+                return task
+            except VersionConflictError:
+                continue
+    
+    async def _next_ready(self, filter_spec: TaskFilter) -> Optional[Task]:
+        """First task matching ``filter_spec`` in priority order whose prerequisites are met."""
+        offset, window = 0, 1
+        while True:
+            candidates = await self.query(filter_spec, TaskOrder.PRIORITY, limit=window, offset=offset)
+            prerequisites = {p for task in candidates for p in task._depends_on or ()}
+            found = await self.get_many(prerequisites) if prerequisites else {}
+            for task in candidates:
+                if _prerequisites_met(task, found):
+                    return task
+            if len(candidates) < window:
+                return None
+            # Blocked tasks at the front of the queue: widen the window
+            offset += window
+            window *= 2
+    
+    async def expired_leases(self, now: datetime, limit: int = 100) -> List[Task]:
+        """
+        Tasks whose lease ran out at or before ``now``, earliest expiry first.
+        
+        Backends should answer this from an expiry index; the default scans
+        the IN_PROGRESS tasks.
+        """
+        expired = [
+            task for task in await self.query(TaskFilter(status=TaskStatus.IN_PROGRESS))
+            if task.lease_expired(now)
+        ]
+        expired.sort(key=lambda task: task.lease_expires_at)
+        return expired[:limit]
+    
+    async def save_many(self, tasks: Iterable[Task]) -> None:
+        """
+        Save or update several tasks at once.
+        
+        Backends should override this with a native bulk write; the default
+        falls back to one ``save`` per task.
+        """
+        for task in tasks:
+            await self.save(task)
+    
+    async def get_many(self, task_ids: Iterable[UUID]) -> Dict[UUID, Task]:
+        """Get several tasks by ID. Missing IDs are omitted from the result."""
+        found = {}
+        for task_id in task_ids:
+            task = await self.get(task_id)
+            if task:
+                found[task_id] = task
+        return found
+    
+    async def delete_many(self, task_ids: Iterable[UUID]) -> int:
+        """Delete several tasks by ID and return how many were deleted."""
+        deleted = 0
+        for task_id in task_ids:
+            if await self.delete(task_id):
+                deleted += 1
+        return deleted
+    
+    async def close(self) -> None:
+        """Release any resources held by the repository."""
+        pass
+    
+    async def __aenter__(self) -> 'TaskRepository':
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
 
 
 class InMemoryRepository(TaskRepository):
-    """In-memory task storage for testing and development."""
+    """
+    In-memory task storage for testing, development and as a hot tier.
+    
+    Tasks are covered by secondary indexes (see TaskIndex) maintained on
+    every save and delete, so filtered, limited queries cost roughly the
+    size of their result rather than the number of stored tasks.
+    """
     
     def __init__(self):
+        # No lock: operations never await, so each runs atomically on the loop
         self._tasks: Dict[UUID, Task] = {}
-        self._lock = asyncio.Lock()
+        self._index = TaskIndex()
+    
+    def _store(self, task: Task, expected_version: Optional[int] = None) -> None:
+        """Store and index a task, bumping its version."""
+        current = self._tasks.get(task.id)
+        task.version = _next_version(task, expected_version, current.version if current else None)
+        self._tasks[task.id] = task
+        self._index.add(task)
+        task.mark_clean()
     
-    async def save(self, task: Task) -> None:
+    async def save(self, task: Task, expected_version: Optional[int] = None) -> None:
         """Save task in memory."""
-        async with self._lock:
-            self._tasks[task.id] = task
+        self._store(task, expected_version)
     
     async def get(self, task_id: UUID) -> Optional[Task]:
         """Get task from memory."""
-        async with self._lock:
-            return self._tasks.get(task_id)
+        return self._tasks.get(task_id)
     
     async def list(self) -> List[Task]:
         """List all tasks from memory."""
-        async with self._lock:
-            return list(self._tasks.values())
+        return list(self._tasks.values())
     
     async def delete(self, task_id: UUID) -> bool:
         """Delete task from memory."""
-        async with self._lock:
-            if task_id in self._tasks:
-                del self._tasks[task_id]
-                return True
-            return False
+        if task_id in self._tasks:
+            del self._tasks[task_id]
+            self._index.remove(task_id)
+            return True
+        return False
+    
+    async def query(
+        self,
+        filter_spec: Optional[TaskFilter] = None,
+        order: TaskOrder = TaskOrder.PRIORITY,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Task]:
+        """Query tasks through the secondary indexes."""
+        task_ids = self._index.select(filter_spec or TaskFilter(), order, limit, offset)
+        return [self._tasks[task_id] for task_id in task_ids]
+    
+    async def claim_next(
+        self,
+        assignee: AgentType,
+        labels: Optional[List[str]] = None,
+        actor: str = "system",
+        lease: Optional[timedelta] = None
+    ) -> Optional[Task]:
+        """Claim the first ready task of the priority index; atomic as nothing awaits."""
+        filter_spec = TaskFilter(status=TaskStatus.PENDING, assignee=assignee, labels=labels)
+        offset, window = 0, 1
+        while True:
+            task_ids = self._index.select(filter_spec, TaskOrder.PRIORITY, window, offset)
+            for task_id in task_ids:
+                task = self._tasks[task_id]
+                if not _prerequisites_met(task, self._tasks):
+                    continue
+                task.transition_to(TaskStatus.IN_PROGRESS, actor)
+                if lease:
+                    task.acquire_lease(actor, lease)
+                self._store(task)
+                return task
+            if len(task_ids) < window:
+                return None
+            offset += window
+            window *= 2
+    
+    async def expired_leases(self, now: datetime, limit: int = 100) -> List[Task]:
+        """Expired leases from the index's expiry order."""
+        return [self._tasks[task_id] for task_id in self._index.expired(now, limit)]
+    
+    async def save_many(self, tasks: Iterable[Task]) -> None:
+        """Save several tasks in memory."""
+        for task in tasks:
+            self._store(task)
+    
+    async def get_many(self, task_ids: Iterable[UUID]) -> Dict[UUID, Task]:
+        """Get several tasks from memory."""
+        return {
+            task_id: self._tasks[task_id]
+            for task_id in task_ids
+            if task_id in self._tasks
+        }
+    
+    async def delete_many(self, task_ids: Iterable[UUID]) -> int:
+        """Delete several tasks from memory."""
+        deleted = 0
+        for task_id in task_ids:
+            if self._tasks.pop(task_id, None) is not None:
+                self._index.remove(task_id)
+                deleted += 1
+        return deleted
     
     async def clear(self) -> None:
         """Clear all tasks from memory."""
-        async with self._lock:
-            self._tasks.clear()
+        self._tasks.clear()
+        self._index.clear()
 
 
 class JSONFileRepository(TaskRepository):
-    """JSON file-based task storage."""
+    """
+    JSON file-based task storage.
+    
+    Parsed records are cached in an id-indexed map and reused for as long as
+    the file's (mtime, size, inode) signature is unchanged, so repeated reads
+    in one process skip the file; a change by another process triggers a
+    re-parse on the next call. The cache holds serialized records, never the
+    caller's Task objects: every read builds fresh Tasks and every write
+    stores a detached copy, so unsaved changes cannot leak into the file.
+    
+    File I/O and (de)serialization run on a dedicated single-thread executor
+    so large files never stall the event loop, and writes go through a
+    temp file, fsync and atomic rename so a crash never leaves a torn file.
+    
+    Version checks see the file as of the start of the save; writers in
+    other processes are not excluded while it is rewritten.
+    
+    ``codec`` picks the file encoding (see ``codecs``): "json" by default,
+    "orjson" for the same format faster, or "msgpack" for a binary file.
+    """
     
-    def __init__(self, file_path: Path):
+    def __init__(
+        self,
+        file_path: Path,
+        executor: Optional[Executor] = None,
+        fsync: bool = True,
+        codec: Union[str, Codec] = "json"
+    ):
         self.file_path = file_path
+        self.fsync = fsync
+        self.codec = create_codec(codec)
         self._lock = asyncio.Lock()
+        self._index: Optional[Dict[UUID, Dict[str, Any]]] = None
+        self._index_signature: Optional[tuple] = None
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ap-json-io"
+        )
         self._ensure_file()
     
     def _ensure_file(self) -> None:
         """Ensure the JSON file exists."""
         if not self.file_path.exists():
             self.file_path.parent.mkdir(parents=True, exist_ok=True)
-            self.file_path.write_text("[]")
+            self.file_path.write_bytes(self.codec.dumps([]))
+    
+    async def _run_io(self, func, *args) -> Any:
+        """Run blocking file work on the repository's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+    
+    def _file_signature(self) -> Optional[tuple]:
+        """(mtime, size, inode) of the JSON file, or None if it is missing."""
+        try:
+            st = self.file_path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    def _parse_file(self) -> tuple:
+        """Read and parse the file; returns (signature, index). Runs off-loop."""
+        # Stat before reading: a write racing the read leaves a stale
+        # signature behind, which just forces another parse next time
+        signature = self._file_signature()
+        return signature, {
+            UUID(data["id"]): data for data in self._load_raw() if "id" in data
+        }
+    
+    async def _load_index(self) -> Dict[UUID, Dict[str, Any]]:
+        """Return the id -> serialized record index, re-parsing only if the file changed."""
+        if self._index is None or self._file_signature() != self._index_signature:
+            self._index_signature, self._index = await self._run_io(self._parse_file)
+        return self._index
     
     async def _read_tasks(self) -> List[Task]:
         """Read tasks from JSON file."""
+        return [_task_from_record(data) for data in (await self._load_index()).values()]
+    
+    def _load_raw(self) -> List[Dict[str, Any]]:
+        """Read serialized task dictionaries from JSON file (blocking)."""
         try:
-            content = self.file_path.read_text()
-            data = json.loads(content) if content else []
-            return [Task.from_dict(task_data) for task_data in data]
-        except (json.JSONDecodeError, IOError):
+            content = self.file_path.read_bytes()
+            return self.codec.loads(content) if content else []
+        except (ValueError, IOError):
             return []
     
-    async def _write_tasks(self, tasks: List[Task]) -> None:
-        """Write tasks to JSON file."""
-        data = [task.to_dict() for task in tasks]
-        self.file_path.write_text(json.dumps(data, indent=2))
+    async def _read_raw(self) -> List[Dict[str, Any]]:
+        """Read serialized task dictionaries from JSON file."""
+        return await self._run_io(self._load_raw)
+    
+    def _record(self, task: Task) -> Dict[str, Any]:
+        """Serialized copy of a task that shares no containers with it."""
+        # Always the plain form: reads and filters expect strings, whatever the codec
+        return _copy_json(task.to_dict())
     
-    async def save(self, task: Task) -> None:
+    def _dump_records(self, records: List[Dict[str, Any]]) -> tuple:
+        """Encode and atomically write records; returns the new signature. Runs off-loop."""
+        return _atomic_write(self.file_path, self.codec.dumps(records, indent=True), self.fsync)
+    
+    async def _write_index(self, index: Dict[UUID, Dict[str, Any]]) -> None:
+        """Write the index to the JSON file and keep it as the cached state."""
+        # Cached records are replaced, never mutated, so the executor can
+        # encode this list while the loop keeps running
+        self._index_signature = await self._run_io(self._dump_records, list(index.values()))
+        self._index = index
+    
+    async def close(self) -> None:
+        """Shut down the I/O executor if the repository created it."""
+        async with self._lock:
+            if self._owns_executor:
+                self._executor.shutdown(wait=True)
+    
+    async def save(self, task: Task, expected_version: Optional[int] = None) -> None:
         """Save task to JSON file."""
         async with self._lock:
-            tasks = await self._read_tasks()
-            
-            # Update existing or add new
-            updated = False
-            for i, existing in enumerate(tasks):
-                if existing.id == task.id:
-                    tasks[i] = task
-                    updated = True
-                    break
-            
-            if not updated:
-                tasks.append(task)
-            
-            await self._write_tasks(tasks)
+            index = dict(await self._load_index())
+            current = index.get(task.id)
+            task.version = _next_version(task, expected_version, current.get("version", 0) if current else None)
+            index[task.id] = self._record(task)
+            await self._write_index(index)
+        task.mark_clean()
     
     async def get(self, task_id: UUID) -> Optional[Task]:
         """Get task from JSON file."""
         async with self._lock:
-            tasks = await self._read_tasks()
-            for task in tasks:
-                if task.id == task_id:
-                    return task
-            return None
+            data = (await self._load_index()).get(task_id)
+            return _task_from_record(data) if data else None
     
     async def list(self) -> List[Task]:
         """List all tasks from JSON file."""
@@ -145,185 +512,1248 @@ class JSONFileRepository(TaskRepository):
     async def delete(self, task_id: UUID) -> bool:
         """Delete task from JSON file."""
         async with self._lock:
-            tasks = await self._read_tasks()
-            original_count = len(tasks)
-            tasks = [t for t in tasks if t.id != task_id]
+            index = dict(await self._load_index())
+            if index.pop(task_id, None) is None:
+                return False
             
-            if len(tasks) < original_count:
-                await self._write_tasks(tasks)
-                return True
-            return False
+            await self._write_index(index)
+            return True
+    
+    async def query(
+        self,
+        filter_spec: Optional[TaskFilter] = None,
+        order: TaskOrder = TaskOrder.PRIORITY,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Task]:
+        """Query the cached records, deserializing only the ones that match."""
+        filter_spec = filter_spec or TaskFilter()
+        async with self._lock:
+            matched = [
+                _task_from_record(data)
+                for data in (await self._load_index()).values()
+                if filter_spec.matches_dict(data)
+            ]
+        matched.sort(key=order.sort_key)
+        return apply_window(matched, limit, offset)
+    
+    async def save_many(self, tasks: Iterable[Task]) -> None:
+        """Save several tasks with at most one read and one write of the JSON file."""
+        tasks = list(tasks)
+        async with self._lock:
+            index = dict(await self._load_index())
+            for task in tasks:
+                current = index.get(task.id)
+                task.version = _next_version(task, None, current.get("version", 0) if current else None)
+                index[task.id] = self._record(task)
+            await self._write_index(index)
+        for task in tasks:
+            task.mark_clean()
+    
+    async def patch_many(self, tasks: Iterable[Task]) -> List[UUID]:
+        """Patch several tasks with at most one read and one write of the JSON file."""
+        tasks = list(tasks)
+        for task in tasks:
+            _patch_fields(task, None)
+        
+        conflicts, written = [], []
+        async with self._lock:
+            index = dict(await self._load_index())
+            for task in tasks:
+                current = index.get(task.id)
+                try:
+                    version = _next_version(task, task.version, current.get("version", 0) if current else None)
+                except VersionConflictError:
+                    conflicts.append(task.id)
+                    continue
+                task.version = version
+                index[task.id] = self._record(task)
+                written.append(task)
+            if written:
+                await self._write_index(index)
+        
+        for task in written:
+            task.mark_clean()
+        return conflicts
+    
+    async def get_many(self, task_ids: Iterable[UUID]) -> Dict[UUID, Task]:
+        """Get several tasks with at most one read of the JSON file."""
+        async with self._lock:
+            index = await self._load_index()
+            return {
+                task_id: _task_from_record(index[task_id])
+                for task_id in task_ids
+                if task_id in index
+            }
+    
+    async def delete_many(self, task_ids: Iterable[UUID]) -> int:
+        """Delete several tasks with at most one read and one write."""
+        async with self._lock:
+            index = dict(await self._load_index())
+            deleted = 0
+            for task_id in task_ids:
+                if index.pop(task_id, None) is not None:
+                    deleted += 1
+            
+            if deleted:
+                await self._write_index(index)
+            return deleted
     
     async def clear(self) -> None:
         """Clear all tasks from JSON file."""
         async with self._lock:
-            await self._write_tasks([])
+            await self._write_index({})
+
+
+class JournaledJSONRepository(JSONFileRepository):
+    """
+    JSON file storage with an append-only mutation journal.
+    
+    Each save/patch/delete appends one JSON line to ``<file>.journal`` instead
+    of rewriting the whole file, so writes are O(1); a patch line carries only
+    the changed fields and new events. The main file is a snapshot
+    in the same format JSONFileRepository uses; state is rebuilt on open by
+    replaying the journal over it. Once the journal grows past
+    ``compact_bytes`` or holds more than ``compact_ratio`` records per live
+    task, it is folded back into the snapshot in the background.
+    
+    Other processes sharing the files are picked up by tailing the journal,
+    and compaction renames the journal aside before rewriting the snapshot so
+    concurrent appends are never lost.
+    
+    The journal is line-oriented, so ``codec`` must be a text codec.
+    """
+    
+    def __init__(
+        self,
+        file_path: Path,
+        compact_bytes: int = 4 * 1024 * 1024,
+        compact_ratio: float = 4.0,
+        fsync: bool = False,
+        executor: Optional[Executor] = None,
+        codec: Union[str, Codec] = "json"
+    ):
+        codec = create_codec(codec)
+        if not codec.text:
+            raise ValueError(f"The journal needs a text codec, not {codec.name}")
+        
+        super().__init__(file_path, executor=executor, fsync=fsync, codec=codec)
+        self.journal_path = file_path.with_name(file_path.name + ".journal")
+        self._compacting_path = file_path.with_name(file_path.name + ".journal.compacting")
+        self.compact_bytes = compact_bytes
+        self.compact_ratio = compact_ratio
+        self.fsync = fsync
+        
+        # Live state, kept in serialized form so reads hand out fresh Tasks
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._snapshot_signature: Optional[tuple] = None
+        self._journal_inode: Optional[int] = None
+        self._journal_offset = 0
+        self._journal_records = 0
+        self._torn_tail = False
+        self._loaded = False
+        self._compaction: Optional[asyncio.Task] = None
+    
+    @staticmethod
+    def _signature(path: Path) -> Optional[tuple]:
+        """Identity of a file's current contents, or None if it is missing."""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Apply one journal record to the live state."""
+        op = record.get("op")
+        if op == "save":
+            self._records[record["task"]["id"]] = record["task"]
+        elif op == "patch":
+            data = self._records.get(record["id"])
+            if data is not None:
+                data = self._records[record["id"]] = {**data, **record["fields"]}
+                data["version"] = record["version"]
+                if record["events"]:
+                    # Same cap as Task.to_dict
+                    data["events"] = ((data.get("events") or []) + record["events"])[-10:]
+        elif op == "delete":
+            self._records.pop(record["id"], None)
+        elif op == "clear":
+            self._records.clear()
+    
+    def _replay(self, path: Path, offset: int = 0) -> int:
+        """
+        Apply complete journal lines from ``offset`` onwards.
+        
+        Returns the offset just past the last complete line, so a line that
+        another process is still writing is picked up on the next refresh.
+        """
+        try:
+            with open(path, "rb") as fh:
+                fh.seek(offset)
+                chunk = fh.read()
+        except FileNotFoundError:
+            return offset
+        
+        end = chunk.rfind(b"\n") + 1
+        self._torn_tail = end < len(chunk)
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(self.codec.loads(line))
+            except (ValueError, KeyError):
+                continue  # Skip torn or foreign lines rather than fail the load
+            self._journal_records += 1
+        
+        return offset + end
+    
+    def _reload_sync(self) -> None:
+        """Rebuild state from the snapshot plus any journals. Runs off-loop."""
+        self._snapshot_signature = self._signature(self.file_path)
+        self._records = {
+            data["id"]: data for data in self._load_raw() if "id" in data
+        }
+        self._journal_records = 0
+        
+        # A compaction interrupted before its snapshot landed leaves this behind
+        self._replay(self._compacting_path)
+        
+        journal = self._signature(self.journal_path)
+        self._journal_inode = journal[0] if journal else None
+        self._journal_offset = self._replay(self.journal_path)
+        self._loaded = True
+    
+    async def _reload(self) -> None:
+        """Rebuild state from the snapshot plus any journals."""
+        await self._run_io(self._reload_sync)
+    
+    async def _refresh(self) -> None:
+        """Bring state up to date with changes made by any process."""
+        if not self._loaded or self._signature(self.file_path) != self._snapshot_signature:
+            await self._reload()
+            return
+        
+        journal = self._signature(self.journal_path)
+        if journal is None:
+            if self._journal_offset:
+                await self._reload()  # Journal compacted away by another process
+            return
+        
+        inode, _, size = journal
+        if self._journal_inode not in (None, inode) or size < self._journal_offset:
+            await self._reload()
+        elif size > self._journal_offset:
+            self._journal_inode = inode
+            self._journal_offset = await self._run_io(
+                self._replay, self.journal_path, self._journal_offset
+            )
+    
+    async def _read_raw(self) -> List[Dict[str, Any]]:
+        """Serialized tasks from the live state."""
+        await self._refresh()
+        return list(self._records.values())
+    
+    async def _read_tasks(self) -> List[Task]:
+        """Fresh tasks from the live state (the snapshot index cache is unused)."""
+        return [_task_from_record(data) for data in await self._read_raw()]
+    
+    async def query(
+        self,
+        filter_spec: Optional[TaskFilter] = None,
+        order: TaskOrder = TaskOrder.PRIORITY,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Task]:
+        """Query tasks, deserializing only the records that match the filter."""
+        filter_spec = filter_spec or TaskFilter()
+        async with self._lock:
+            matched = [
+                _task_from_record(data)
+                for data in await self._read_raw()
+                if filter_spec.matches_dict(data)
+            ]
+        matched.sort(key=order.sort_key)
+        return apply_window(matched, limit, offset)
+    
+    async def _append(self, records: List[Dict[str, Any]]) -> None:
+        """Append mutation records to the journal and apply them."""
+        payload = b"".join(self.codec.dumps(record) + b"\n" for record in records)
+        if self._torn_tail:
+            # Terminate a line left half-written by a crash so ours parses
+            payload = b"\n" + payload
+            self._torn_tail = False
+        
+        end, inode = await self._run_io(self._write_journal, payload)
+        
+        for record in records:
+            # Records are built from the caller's tasks; keep none of their containers
+            self._apply(_copy_json(record))
+        self._journal_records += len(records)
+        
+        # Only skip our own lines on the next refresh if nobody else wrote in between
+        if end - len(payload) == self._journal_offset and self._journal_inode in (None, inode):
+            self._journal_offset = end
+            self._journal_inode = inode
+        
+        self._maybe_compact(end)
+    
+    def _write_journal(self, payload: bytes) -> tuple:
+        """Append raw bytes to the journal; returns (end offset, inode). Runs off-loop."""
+        with open(self.journal_path, "ab") as fh:
+            fh.write(payload)
+            fh.flush()
+            if self.fsync:
+                os.fsync(fh.fileno())
+            return fh.tell(), os.fstat(fh.fileno()).st_ino
+    
+    def _compact_sync(self) -> None:
+        """Move the journal aside, write a fresh snapshot and drop the old journal."""
+        # New appends (from any process) go to a fresh journal from here on
+        try:
+            os.replace(self.journal_path, self._compacting_path)
+        except FileNotFoundError:
+            pass
+        self._replay(self._compacting_path, self._journal_offset)
+        
+        _atomic_write(self.file_path, self.codec.dumps(list(self._records.values()), indent=True))
+        
+        try:
+            self._compacting_path.unlink()
+        except FileNotFoundError:
+            pass
+        
+        self._snapshot_signature = self._signature(self.file_path)
+        self._journal_inode = None
+        self._journal_offset = 0
+        self._journal_records = 0
+    
+    def _maybe_compact(self, journal_size: int) -> None:
+        """Schedule a background compaction once a threshold is crossed."""
+        if self._compaction and not self._compaction.done():
+            return
+        
+        too_big = journal_size >= self.compact_bytes
+        too_many = self._journal_records > self.compact_ratio * max(len(self._records), 16)
+        if too_big or too_many:
+            self._compaction = asyncio.ensure_future(self.compact())
+    
+    async def compact(self) -> None:
+        """Fold the journal into a fresh snapshot."""
+        async with self._lock:
+            await self._refresh()
+            if not self._journal_records:
+                return
+            
+            await self._run_io(self._compact_sync)
+            
+            # Pick up anything appended to the new journal while we were busy
+            await self._refresh()
+    
+    async def close(self) -> None:
+        """Wait for any in-flight compaction, then release the executor."""
+        if self._compaction:
+            await self._compaction
+            self._compaction = None
+        await super().close()
+    
+    def _stored_version(self, task: Task) -> Optional[int]:
+        """Version of the task in the live state, or None if it does not exist."""
+        data = self._records.get(str(task.id))
+        return data.get("version", 0) if data else None
+    
+    async def save(self, task: Task, expected_version: Optional[int] = None) -> None:
+        """Append a save record for the task."""
+        async with self._lock:
+            await self._refresh()
+            task.version = _next_version(task, expected_version, self._stored_version(task))
+            await self._append([{"op": "save", "task": task.to_dict()}])
+        task.mark_events_saved()
+        task.mark_clean()
+    
+    async def patch(
+        self,
+        task: Task,
+        fields: Optional[Iterable[str]] = None,
+        expected_version: Optional[int] = None
+    ) -> None:
+        """Append a patch record holding only the changed fields and new events."""
+        names = _patch_fields(task, fields)
+        async with self._lock:
+            await self._refresh()
+            stored = self._stored_version(task)
+            task.version = _next_version(task, expected_version, stored)
+            await self._append([self._patch_record(task, names, stored is None)])
+        task.mark_events_saved()
+        task.mark_clean()
+    
+    async def patch_many(self, tasks: Iterable[Task]) -> List[UUID]:
+        """Append patch records for the non-conflicting tasks in one write."""
+        tasks = [(task, _patch_fields(task, None)) for task in tasks]
+        conflicts, written = [], []
+        async with self._lock:
+            await self._refresh()
+            records = []
+            versions: Dict[UUID, Optional[int]] = {}
+            for task, names in tasks:
+                # Later copies of a task in the batch are checked against earlier ones
+                stored = versions[task.id] if task.id in versions else self._stored_version(task)
+                try:
+                    task.version = _next_version(task, task.version, stored)
+                except VersionConflictError:
+                    conflicts.append(task.id)
+                    continue
+                versions[task.id] = task.version
+                records.append(self._patch_record(task, names, stored is None))
+                written.append(task)
+            if records:
+                await self._append(records)
+        
+        for task in written:
+            task.mark_events_saved()
+            task.mark_clean()
+        return conflicts
+    
+    @staticmethod
+    def _patch_record(task: Task, names: Set[str], new: bool) -> Dict[str, Any]:
+        """Journal record for a patch; tasks not stored yet get a full save record."""
+        data = task.to_dict()
+        if new:
+            return {"op": "save", "task": data}
+        return {
+            "op": "patch",
+            "id": data["id"],
+            "version": task.version,
+            "fields": {name: data[name] for name in names if name != "events"},
+            "events": [event.to_apm_format() for event in task.unsaved_events()]
+        }
+    
+    async def get(self, task_id: UUID) -> Optional[Task]:
+        """Get task from the live state."""
+        async with self._lock:
+            await self._refresh()
+            data = self._records.get(str(task_id))
+            return _task_from_record(data) if data else None
+    
+    async def delete(self, task_id: UUID) -> bool:
+        """Append a delete record if the task exists."""
+        async with self._lock:
+            await self._refresh()
+            if str(task_id) not in self._records:
+                return False
+            await self._append([{"op": "delete", "id": str(task_id)}])
+            return True
+    
+    async def save_many(self, tasks: Iterable[Task]) -> None:
+        """Append save records for several tasks in one write."""
+        tasks = list(tasks)
+        if not tasks:
+            return
+        async with self._lock:
+            await self._refresh()
+            records = []
+            for task in tasks:
+                task.version = _next_version(task, None, self._stored_version(task))
+                records.append({"op": "save", "task": task.to_dict()})
+            await self._append(records)
+        for task in tasks:
+            task.mark_events_saved()
+            task.mark_clean()
+    
+    async def get_many(self, task_ids: Iterable[UUID]) -> Dict[UUID, Task]:
+        """Get several tasks from the live state."""
+        async with self._lock:
+            await self._refresh()
+            found = {}
+            for task_id in task_ids:
+                data = self._records.get(str(task_id))
+                if data:
+                    found[task_id] = _task_from_record(data)
+            return found
+    
+    async def delete_many(self, task_ids: Iterable[UUID]) -> int:
+        """Append delete records for the tasks that exist."""
+        async with self._lock:
+            await self._refresh()
+            records = [
+                {"op": "delete", "id": key}
+                for key in dict.fromkeys(str(task_id) for task_id in task_ids)
+                if key in self._records
+            ]
+            if records:
+                await self._append(records)
+            return len(records)
+    
+    async def clear(self) -> None:
+        """Append a clear record."""
+        async with self._lock:
+            await self._refresh()
+            await self._append([{"op": "clear"}])
 
 
 class SQLiteRepository(TaskRepository):
-    """SQLite-based task storage for production use."""
+    """
+    SQLite-based task storage for production use.
+    
+    Connections are pooled and kept open for the lifetime of the repository;
+    call ``close()`` (or use ``async with``) to release them.
+    
+    ``codec`` encodes the JSON columns (labels, metadata, metrics, ...);
+    SQLite queries them with its JSON functions, so it must be a text codec.
+    The table layout and its migrations live in ``sqlite_schema``.
+    """
+    
+    # Stay well under SQLite's bound-parameter limit for IN (...) lookups
+    MAX_BATCH_PARAMS = 500
+    
+    # UPDATE ... RETURNING needs SQLite 3.35; older libraries re-read instead
+    SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+    
+    # Columns tasks are decoded from and written to, in table order
+    _TASK_COLUMNS = TASK_COLUMNS
+    _TASK_SELECT = ", ".join(_TASK_COLUMNS)
+    
+    _INSERT_SQL = (
+        f"INSERT OR REPLACE INTO tasks ({_TASK_SELECT}) "
+        f"VALUES ({', '.join('?' * len(_TASK_COLUMNS))})"
+    )
+    
+    _EVENT_COLUMNS = ", ".join(EVENT_COLUMNS)
     
-    def __init__(self, db_path: Path):
+    _INSERT_EVENT_SQL = (
+        f"INSERT OR IGNORE INTO task_events ({_EVENT_COLUMNS}) "
+        f"VALUES ({', '.join('?' * len(EVENT_COLUMNS))})"
+    )
+    
+    _ORDER_SQL = {
+        TaskOrder.PRIORITY: "priority DESC, created_at",
+        TaskOrder.CREATED_AT: "created_at",
+    }
+    
+    def __init__(
+        self,
+        db_path: Path,
+        pool_size: int = 4,
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size: int = -16000,
+        mmap_size: int = 268435456,
+        codec: Union[str, Codec] = "json"
+    ):
         self.db_path = db_path
+        self.codec = create_codec(codec)
+        if not self.codec.text:
+            raise ValueError(f"SQLite JSON columns need a text codec, not {self.codec.name}")
+        self._decoder = TaskRowDecoder(self._TASK_COLUMNS, self.codec)
+        self._projections: Dict[tuple, TaskRowDecoder] = {}
+        
+        # Column value for each patchable field, as in _task_to_row
+        dumps = self.codec.dumps_text
+        self._field_encoders: Dict[str, Callable[[Task], Any]] = {
+            "title": lambda task: task.title,
+            "description": lambda task: task.description,
+            "status": lambda task: STATUS_CODES[task.status],
+            "priority": lambda task: PRIORITY_CODES[task.priority],
+            "story_id": lambda task: str(task.story_id) if task.story_id else None,
+            "epic_id": lambda task: str(task.epic_id) if task.epic_id else None,
+            "assignee": lambda task: AGENT_CODES[task.assignee] if task.assignee else None,
+            "labels": lambda task: dumps(task._labels) if task._labels else "[]",
+            "metadata": lambda task: dumps(task._metadata) if task._metadata else "{}",
+            "depends_on": lambda task: (
+                dumps([str(task_id) for task_id in task._depends_on]) if task._depends_on else "[]"
+            ),
+            "created_at": lambda task: to_epoch_us(task.created_at),
+            "updated_at": lambda task: to_epoch_us(task.updated_at),
+            "started_at": lambda task: to_epoch_us(task.started_at),
+            "completed_at": lambda task: to_epoch_us(task.completed_at),
+            "metrics": lambda task: dumps(task._metrics.to_dict()) if task._metrics else "{}",
+            "lease_owner": lambda task: task.lease_owner,
+            "lease_expires_at": lambda task: to_epoch_us(task.lease_expires_at),
+        }
+        self._pool = SQLiteConnectionPool(
+            db_path,
+            size=pool_size,
+            pragmas=SQLitePragmas(
+                journal_mode=journal_mode,
+                synchronous=synchronous,
+                cache_size=cache_size,
+                mmap_size=mmap_size
+            )
+        )
         self._initialized = False
+        self._init_lock = asyncio.Lock()
     
     async def _ensure_initialized(self) -> None:
         """Ensure database is initialized."""
         if self._initialized:
             return
         
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        async with aiosqlite.connect(str(self.db_path)) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id TEXT PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    status TEXT NOT NULL,
-                    priority TEXT NOT NULL,
-                    story_id TEXT,
-                    epic_id TEXT,
-                    assignee TEXT,
-                    labels TEXT,
-                    metadata TEXT,
-                    created_at TEXT,
-                    updated_at TEXT,
-                    started_at TEXT,
-                    completed_at TEXT,
-                    metrics TEXT,
-                    events TEXT
-                )
-            """)
+        async with self._init_lock:
+            if self._initialized:
+                return
             
-            # Create indexes
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_status ON tasks(status)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_assignee ON tasks(assignee)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_story_id ON tasks(story_id)")
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
             
-            await db.commit()
-        
-        self._initialized = True
+            # A single PRAGMA read unless the schema needs creating or upgrading
+            async with self._pool.writer() as db:
+                await ensure_schema(db)
+            
+            self._initialized = True
     
-    def _task_to_row(self, task: Task) -> tuple:
-        """Convert task to database row."""
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        await self._pool.close()
+    
+    def _task_to_row(self, task: Task, version: int) -> tuple:
+        """Convert task to database row, stamped with the version being written."""
         return (
             str(task.id),
             task.title,
             task.description,
-            task.status.value,
-            task.priority.value,
+            STATUS_CODES[task.status],
+            PRIORITY_CODES[task.priority],
             str(task.story_id) if task.story_id else None,
             str(task.epic_id) if task.epic_id else None,
-            task.assignee.value if task.assignee else None,
-            json.dumps(task.labels),
-            json.dumps(task.metadata),
-            task.created_at.isoformat() if task.created_at else None,
-            task.updated_at.isoformat() if task.updated_at else None,
-            task.started_at.isoformat() if task.started_at else None,
-            task.completed_at.isoformat() if task.completed_at else None,
-            json.dumps(task.metrics.to_dict()),
-            json.dumps([e.to_apm_format() for e in task.events[-100:]])  # Last 100 events
+            AGENT_CODES[task.assignee] if task.assignee else None,
+            self.codec.dumps_text(task._labels) if task._labels else "[]",
+            self.codec.dumps_text(task._metadata) if task._metadata else "{}",
+            to_epoch_us(task.created_at),
+            to_epoch_us(task.updated_at),
+            to_epoch_us(task.started_at),
+            to_epoch_us(task.completed_at),
+            self.codec.dumps_text(task._metrics.to_dict()) if task._metrics else "{}",
+            version,
+            task.lease_owner,
+            to_epoch_us(task.lease_expires_at),
+            self.codec.dumps_text([str(task_id) for task_id in task._depends_on])
+            if task._depends_on else "[]"
         )
     
+    def _event_to_row(self, event: TaskEvent) -> tuple:
+        """Convert task event to database row."""
+        return (
+            str(event.id),
+            str(event.task_id),
+            event.event_type,
+            to_epoch_us(event.timestamp),
+            event.actor,
+            self.codec.dumps_text(event.details) if event.details else "{}",
+            str(event.correlation_id) if event.correlation_id else None
+        )
+    
+    def _row_to_event(self, row: tuple) -> TaskEvent:
+        """Convert database row to task event."""
+        return TaskEvent(
+            id=UUID(row[0]),
+            task_id=UUID(row[1]),
+            event_type=row[2],
+            timestamp=from_epoch_us(row[3]),
+            actor=row[4] or "",
+            details=self.codec.loads(row[5]) if row[5] and row[5] != "{}" else {},
+            correlation_id=UUID(row[6]) if row[6] else None
+        )
+    
+    async def _append_events(self, db, tasks: List[Task]) -> None:
+        """Insert only the events each task gained since it was loaded or saved."""
+        rows = [
+            self._event_to_row(event)
+            for task in tasks
+            for event in task.unsaved_events()
+        ]
+        if rows:
+            await db.executemany(self._INSERT_EVENT_SQL, rows)
+    
+    async def _attach_events(self, db, tasks: List[Task]) -> List[Task]:
+        """Restore each task's full event history from task_events."""
+        by_id = {str(task.id): task for task in tasks}
+        
+        for chunk in _chunks(list(by_id), self.MAX_BATCH_PARAMS):
+            placeholders = ", ".join("?" * len(chunk))
+            async with db.execute(
+                f"SELECT {self._EVENT_COLUMNS} FROM task_events "
+                f"WHERE task_id IN ({placeholders}) "
+                "ORDER BY task_id, timestamp, rowid",
+                chunk
+            ) as cursor:
+                for row in await cursor.fetchall():
+                    by_id[row[1]].events.append(self._row_to_event(row))
+        
+        for task in tasks:
+            task.mark_events_saved()
+        return tasks
+    
     def _row_to_task(self, row: tuple) -> Task:
-        """Convert database row to task."""
-        task = Task()
-        
-        task.id = UUID(row[0])
-        task.title = row[1]
-        task.description = row[2] or ""
-        task.status = TaskStatus(row[3])
-        task.priority = Priority(row[4])
-        
-        if row[5]:
-            task.story_id = UUID(row[5])
-        if row[6]:
-            task.epic_id = UUID(row[6])
-        if row[7]:
-            task.assignee = AgentType(row[7])
-        
-        task.labels = json.loads(row[8])
-        task.metadata = json.loads(row[9])
-        
-        # Parse timestamps
-        if row[10]:
-            task.created_at = datetime.fromisoformat(row[10])
-        if row[11]:
-            task.updated_at = datetime.fromisoformat(row[11])
-        if row[12]:
-            task.started_at = datetime.fromisoformat(row[12])
-        if row[13]:
-            task.completed_at = datetime.fromisoformat(row[13])
-        
-        # Parse metrics
-        metrics_data = json.loads(row[14])
-        for key, value in metrics_data.items():
-            setattr(task.metrics, key, value)
-        
-        # Note: Events are not fully restored from DB (would need separate table)
+        """
+        Wrap a full row (``_TASK_COLUMNS``) as a task decoded on demand.
         
-        return task
+        Events are restored separately from task_events (see _attach_events).
+        """
+        return LazyTask(row, self._decoder)
+    
+    def _projection(self, fields: Iterable[str]) -> TaskRowDecoder:
+        """Decoder (and so column list) for a projected query, cached per field set."""
+        key = tuple(sorted(set(fields)))
+        decoder = self._projections.get(key)
+        if decoder is None:
+            decoder = self._projections[key] = TaskRowDecoder(
+                projection_columns(key, self._TASK_COLUMNS),
+                self.codec,
+                with_events="events" in key
+            )
+        return decoder
     
-    async def save(self, task: Task) -> None:
+    async def _stored_versions(self, db, tasks: List[Task]) -> Dict[str, int]:
+        """Current stored version of each task that exists."""
+        versions = {}
+        ids = [str(task.id) for task in tasks]
+        for chunk in _chunks(ids, self.MAX_BATCH_PARAMS):
+            placeholders = ", ".join("?" * len(chunk))
+            async with db.execute(
+                f"SELECT id, version FROM tasks WHERE id IN ({placeholders})",
+                chunk
+            ) as cursor:
+                versions.update(await cursor.fetchall())
+        return versions
+    
+    async def _store_tasks(
+        self,
+        tasks: List[Task],
+        expected_version: Optional[int] = None
+    ) -> None:
+        """
+        Check versions and write tasks plus their new events in one transaction.
+        
+        BEGIN IMMEDIATE takes the write lock before versions are read, so the
+        check and the write are atomic across processes too.
+        """
+        async with self._pool.writer() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            stored = await self._stored_versions(db, tasks)
+            versions = [
+                _next_version(task, expected_version, stored.get(str(task.id)))
+                for task in tasks
+            ]
+            await db.executemany(
+                self._INSERT_SQL,
+                [self._task_to_row(task, v) for task, v in zip(tasks, versions)]
+            )
+            await self._append_events(db, tasks)
+            await db.commit()
+        
+        for task, version in zip(tasks, versions):
+            task.version = version
+            task.mark_events_saved()
+            task.mark_clean()
+    
+    async def save(self, task: Task, expected_version: Optional[int] = None) -> None:
         """Save task to SQLite."""
         await self._ensure_initialized()
+        await self._store_tasks([task], expected_version)
+    
+    async def patch(
+        self,
+        task: Task,
+        fields: Optional[Iterable[str]] = None,
+        expected_version: Optional[int] = None
+    ) -> None:
+        """
+        Update only the changed columns with ``UPDATE ... SET`` and append new events.
+        
+        Unlike a full save (``INSERT OR REPLACE``, which deletes and
+        reinserts the row and every index entry), only indexes covering the
+        changed columns are touched. The new version comes back through
+        ``RETURNING``, or a re-read in the same transaction before SQLite 3.35.
+        """
+        await self._ensure_initialized()
+        
+        columns = sorted(name for name in _patch_fields(task, fields) if name != "events")
+        assignments = "".join(f"{column} = ?, " for column in columns)
+        sql = f"UPDATE tasks SET {assignments}version = MAX(version, ?) + 1 WHERE id = ?"
+        params = [self._field_encoders[column](task) for column in columns]
+        params += [task.version, str(task.id)]
+        if expected_version is not None:
+            sql += " AND version = ?"
+            params.append(expected_version)
+        
+        async with self._pool.writer() as db:
+            if self.SUPPORTS_RETURNING:
+                async with db.execute(sql + " RETURNING version", params) as cursor:
+                    row = await cursor.fetchone()
+            else:
+                async with db.execute(sql, params) as cursor:
+                    updated = cursor.rowcount
+                row = None
+                if updated:
+                    # The UPDATE holds the write lock, so this reads our version
+                    async with db.execute(
+                        "SELECT version FROM tasks WHERE id = ?", (str(task.id),)
+                    ) as cursor:
+                        row = await cursor.fetchone()
+            
+            if row is not None:
+                version = row[0]
+            else:
+                # Not updated: either missing or at another version
+                stored = await self._stored_versions(db, [task])
+                version = _next_version(task, expected_version, stored.get(str(task.id)))
+                await db.execute(self._INSERT_SQL, self._task_to_row(task, version))
+            
+            await self._append_events(db, [task])
+            await db.commit()
+        
+        task.version = version
+        task.mark_events_saved()
+        task.mark_clean()
+    
+    async def patch_many(self, tasks: Iterable[Task]) -> List[UUID]:
+        """
+        Patch the non-conflicting tasks in one transaction.
+        
+        Versions are checked under BEGIN IMMEDIATE, as in save_many; tasks
+        changing the same columns share one ``executemany`` UPDATE.
+        """
+        await self._ensure_initialized()
         
-        async with aiosqlite.connect(str(self.db_path)) as db:
-            await db.execute("""
-                INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, self._task_to_row(task))
+        tasks = [
+            (task, tuple(sorted(name for name in _patch_fields(task, None) if name != "events")))
+            for task in tasks
+        ]
+        if not tasks:
+            return []
+        
+        conflicts, written, versions = [], [], []
+        updates: Dict[tuple, List[list]] = {}
+        inserts = []
+        async with self._pool.writer() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            stored = await self._stored_versions(db, [task for task, _ in tasks])
+            for task, columns in tasks:
+                key = str(task.id)
+                try:
+                    version = _next_version(task, task.version, stored.get(key))
+                except VersionConflictError:
+                    conflicts.append(task.id)
+                    continue
+                
+                if key in stored:
+                    updates.setdefault(columns, []).append(
+                        [self._field_encoders[column](task) for column in columns] + [version, key]
+                    )
+                else:
+                    inserts.append(self._task_to_row(task, version))
+                stored[key] = version
+                written.append(task)
+                versions.append(version)
+            
+            if inserts:
+                await db.executemany(self._INSERT_SQL, inserts)
+            for columns, params in updates.items():
+                assignments = "".join(f"{column} = ?, " for column in columns)
+                await db.executemany(
+                    f"UPDATE tasks SET {assignments}version = ? WHERE id = ?", params
+                )
+            await self._append_events(db, written)
             await db.commit()
+        
+        for task, version in zip(written, versions):
+            task.version = version
+            task.mark_events_saved()
+            task.mark_clean()
+        return conflicts
     
     async def get(self, task_id: UUID) -> Optional[Task]:
         """Get task from SQLite."""
         await self._ensure_initialized()
         
-        async with aiosqlite.connect(str(self.db_path)) as db:
+        async with self._pool.reader() as db:
             async with db.execute(
-                "SELECT * FROM tasks WHERE id = ?",
+                f"SELECT {self._TASK_SELECT} FROM tasks WHERE id = ?",
                 (str(task_id),)
             ) as cursor:
                 row = await cursor.fetchone()
-                if row:
-                    return self._row_to_task(row)
+            if not row:
                 return None
+            
+            tasks = await self._attach_events(db, [self._row_to_task(row)])
+            return tasks[0]
     
     async def list(self) -> List[Task]:
         """List all tasks from SQLite."""
         await self._ensure_initialized()
         
-        async with aiosqlite.connect(str(self.db_path)) as db:
-            async with db.execute("SELECT * FROM tasks") as cursor:
+        async with self._pool.reader() as db:
+            async with db.execute(f"SELECT {self._TASK_SELECT} FROM tasks") as cursor:
                 rows = await cursor.fetchall()
-                return [self._row_to_task(row) for row in rows]
+            return await self._attach_events(db, [self._row_to_task(row) for row in rows])
     
     async def delete(self, task_id: UUID) -> bool:
         """Delete task from SQLite."""
         await self._ensure_initialized()
         
-        async with aiosqlite.connect(str(self.db_path)) as db:
+        async with self._pool.writer() as db:
             cursor = await db.execute(
                 "DELETE FROM tasks WHERE id = ?",
                 (str(task_id),)
             )
+            await db.execute(
+                "DELETE FROM task_events WHERE task_id = ?",
+                (str(task_id),)
+            )
             await db.commit()
             return cursor.rowcount > 0
     
+    def _compile_filter(self, filter_spec: TaskFilter) -> tuple:
+        """Translate a TaskFilter into a WHERE clause and its parameters."""
+        clauses = []
+        params: List[Any] = []
+        
+        if filter_spec.status:
+            clauses.append("status = ?")
+            params.append(STATUS_CODES[filter_spec.status])
+        if filter_spec.assignee:
+            clauses.append("assignee = ?")
+            params.append(AGENT_CODES[filter_spec.assignee])
+        if filter_spec.priority:
+            clauses.append("priority = ?")
+            params.append(PRIORITY_CODES[filter_spec.priority])
+        if filter_spec.story_id:
+            clauses.append("story_id = ?")
+            params.append(str(filter_spec.story_id))
+        if filter_spec.epic_id:
+            clauses.append("epic_id = ?")
+            params.append(str(filter_spec.epic_id))
+        if filter_spec.labels:
+            placeholders = ", ".join("?" * len(filter_spec.labels))
+            clauses.append(
+                "EXISTS (SELECT 1 FROM json_each(tasks.labels) "
+                f"WHERE json_each.value IN ({placeholders}))"
+            )
+            params.extend(filter_spec.labels)
+        if filter_spec.created_after:
+            clauses.append("created_at >= ?")
+            params.append(to_epoch_us(filter_spec.created_after))
+        
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+    
+    async def query(
+        self,
+        filter_spec: Optional[TaskFilter] = None,
+        order: TaskOrder = TaskOrder.PRIORITY,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Task]:
+        """Query tasks with filtering, ordering, windowing and projection done in SQL."""
+        await self._ensure_initialized()
+        
+        decoder = self._decoder if fields is None else self._projection(fields)
+        where, params = self._compile_filter(filter_spec or TaskFilter())
+        sql = (
+            f"SELECT {', '.join(decoder.columns)} FROM tasks{where} "
+            f"ORDER BY {self._ORDER_SQL[order]}"
+        )
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([-1 if limit is None else limit, offset])
+        
+        async with self._pool.reader() as db:
+            async with db.execute(sql, params) as cursor:
+                rows = await cursor.fetchall()
+            tasks = [LazyTask(row, decoder) for row in rows]
+            if decoder.with_events:
+                await self._attach_events(db, tasks)
+            return tasks
+    
+    async def get_events(
+        self,
+        task_id: UUID,
+        after: Optional[UUID] = None,
+        limit: int = 100
+    ) -> List[TaskEvent]:
+        """Page through a task's events using the (task_id, timestamp) index."""
+        await self._ensure_initialized()
+        
+        sql = f"SELECT {self._EVENT_COLUMNS} FROM task_events WHERE task_id = ?"
+        params: List[Any] = [str(task_id)]
+        if after is not None:
+            sql += (
+                " AND (timestamp, rowid) > "
+                "(SELECT timestamp, rowid FROM task_events WHERE id = ?)"
+            )
+            params.append(str(after))
+        sql += " ORDER BY timestamp, rowid LIMIT ?"
+        params.append(limit)
+        
+        async with self._pool.reader() as db:
+            async with db.execute(sql, params) as cursor:
+                return [self._row_to_event(row) for row in await cursor.fetchall()]
+    
+    async def claim_next(
+        self,
+        assignee: AgentType,
+        labels: Optional[List[str]] = None,
+        actor: str = "system",
+        lease: Optional[timedelta] = None
+    ) -> Optional[Task]:
+        """
+        Claim the next ready task with a single ``UPDATE ... RETURNING``.
+        
+        The subquery walks idx_assignee_order and skips tasks with an unmet
+        prerequisite (checked through the primary key), so finding the task
+        costs the same however many are queued; the UPDATE marks it claimed
+        atomically even against other processes. Before SQLite 3.35, which
+        lacks ``RETURNING``, the task is selected, updated and re-read under
+        ``BEGIN IMMEDIATE`` instead.
+        """
+        await self._ensure_initialized()
+        
+        filter_spec = TaskFilter(status=TaskStatus.PENDING, assignee=assignee, labels=labels)
+        where, params = self._compile_filter(filter_spec)
+        # Prerequisites missing from the table count as unmet, as in the base class
+        where += (" AND " if where else " WHERE ") + (
+            "NOT EXISTS (SELECT 1 FROM json_each(tasks.depends_on) AS dep "
+            "LEFT JOIN tasks AS prereq ON prereq.id = dep.value "
+            f"WHERE prereq.status IS NULL OR prereq.status NOT IN ({_SATISFIED_CODES}))"
+        )
+        
+        select_next = (
+            f"SELECT id FROM tasks{where} "
+            f"ORDER BY {self._ORDER_SQL[TaskOrder.PRIORITY]} LIMIT 1"
+        )
+        claimed = STATUS_CODES[TaskStatus.IN_PROGRESS]
+        
+        async with self._pool.writer() as db:
+            if self.SUPPORTS_RETURNING:
+                async with db.execute(
+                    "UPDATE tasks SET status = ?, version = version + 1 "
+                    f"WHERE id = ({select_next}) RETURNING {self._TASK_SELECT}",
+                    [claimed, *params]
+                ) as cursor:
+                    row = await cursor.fetchone()
+            else:
+                row = await self._claim_without_returning(db, select_next, params, claimed)
+            if not row:
+                await db.commit()
+                return None
+            
+            # RETURNING reports the claimed row; replay the transition from
+            # PENDING so timestamps, metrics and the event match transition_to
+            task = self._row_to_task(row)
+            await self._attach_events(db, [task])
+            task.status = TaskStatus.PENDING
+            task.transition_to(TaskStatus.IN_PROGRESS, actor)
+            if lease:
+                task.acquire_lease(actor, lease)
+            
+            await db.execute(self._INSERT_SQL, self._task_to_row(task, task.version))
+            await self._append_events(db, [task])
+            await db.commit()
+        
+        task.mark_events_saved()
+        task.mark_clean()
+        return task
+    
+    async def _claim_without_returning(self, db, select_next: str, params: List[Any], claimed: int):
+        """claim_next's UPDATE as select, update and re-read, for SQLite before 3.35."""
+        # Take the write lock first so no other claimer can pick the same row
+        await db.execute("BEGIN IMMEDIATE")
+        async with db.execute(select_next, params) as cursor:
+            found = await cursor.fetchone()
+        if not found:
+            return None
+        
+        await db.execute(
+            "UPDATE tasks SET status = ?, version = version + 1 WHERE id = ?",
+            (claimed, found[0])
+        )
+        async with db.execute(
+            f"SELECT {self._TASK_SELECT} FROM tasks WHERE id = ?", (found[0],)
+        ) as cursor:
+            return await cursor.fetchone()
+    
+    async def expired_leases(self, now: datetime, limit: int = 100) -> List[Task]:
+        """Expired leases via the partial idx_lease_expiry index."""
+        await self._ensure_initialized()
+        
+        async with self._pool.reader() as db:
+            async with db.execute(
+                f"SELECT {self._TASK_SELECT} FROM tasks "
+                "WHERE lease_expires_at IS NOT NULL AND lease_expires_at <= ? "
+                "ORDER BY lease_expires_at LIMIT ?",
+                (to_epoch_us(now), limit)
+            ) as cursor:
+                rows = await cursor.fetchall()
+            return await self._attach_events(db, [self._row_to_task(row) for row in rows])
+    
+    async def save_many(self, tasks: Iterable[Task]) -> None:
+        """Save several tasks to SQLite in a single transaction."""
+        await self._ensure_initialized()
+        
+        tasks = list(tasks)
+        if tasks:
+            await self._store_tasks(tasks)
+    
+    async def get_many(self, task_ids: Iterable[UUID]) -> Dict[UUID, Task]:
+        """Get several tasks from SQLite using chunked ``IN`` lookups."""
+        await self._ensure_initialized()
+        
+        ids = [str(task_id) for task_id in task_ids]
+        found = {}
+        
+        async with self._pool.reader() as db:
+            for chunk in _chunks(ids, self.MAX_BATCH_PARAMS):
+                placeholders = ", ".join("?" * len(chunk))
+                async with db.execute(
+                    f"SELECT {self._TASK_SELECT} FROM tasks WHERE id IN ({placeholders})",
+                    chunk
+                ) as cursor:
+                    for row in await cursor.fetchall():
+                        task = self._row_to_task(row)
+                        found[task.id] = task
+            
+            await self._attach_events(db, list(found.values()))
+        
+        return found
+    
+    async def delete_many(self, task_ids: Iterable[UUID]) -> int:
+        """Delete several tasks from SQLite in a single transaction."""
+        await self._ensure_initialized()
+        
+        ids = [str(task_id) for task_id in task_ids]
+        deleted = 0
+        
+        async with self._pool.writer() as db:
+            for chunk in _chunks(ids, self.MAX_BATCH_PARAMS):
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = await db.execute(
+                    f"DELETE FROM tasks WHERE id IN ({placeholders})",
+                    chunk
+                )
+                deleted += cursor.rowcount
+                await db.execute(
+                    f"DELETE FROM task_events WHERE task_id IN ({placeholders})",
+                    chunk
+                )
+            await db.commit()
+        
+        return deleted
+    
     async def clear(self) -> None:
         """Clear all tasks from SQLite."""
         await self._ensure_initialized()
         
-        async with aiosqlite.connect(str(self.db_path)) as db:
+        async with self._pool.writer() as db:
             await db.execute("DELETE FROM tasks")
+            await db.execute("DELETE FROM task_events")
             await db.commit()
 
 
+def _atomic_write(path: Path, data: bytes, fsync: bool = True) -> tuple:
+    """
+    Replace ``path`` with ``data`` via a temp file and atomic rename.
+    
+    Returns the (mtime, size, inode) signature of the written file; rename
+    preserves all three, so it matches ``path`` until someone else writes.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        if fsync:
+            os.fsync(fh.fileno())
+        st = os.fstat(fh.fileno())
+    os.replace(tmp_path, path)
+    
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _prerequisites_met(task: Task, tasks: Dict[UUID, Task]) -> bool:
+    """Whether every prerequisite of ``task`` is in ``tasks`` and satisfied."""
+    for prerequisite in task._depends_on or ():
+        found = tasks.get(prerequisite)
+        if found is None or found.status not in SATISFIED_STATUSES:
+            return False
+    return True
+
+
+def _copy_json(value: Any) -> Any:
+    """Deep copy of a JSON-shaped value (dicts, lists and scalars)."""
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy_json(item) for item in value]
+    return value
+
+
+def _task_from_record(data: Dict[str, Any]) -> Task:
+    """
+    Fresh Task from a cached serialized record, sharing no containers with it.
+    
+    Task.from_dict keeps the record's labels list and metadata dict, so
+    changes to the task would otherwise leak into the cache unsaved.
+    """
+    return Task.from_dict({
+        **data,
+        "labels": list(data.get("labels") or ()),
+        "metadata": _copy_json(data.get("metadata") or {})
+    })
+
+
+def _next_version(
+    task: Task,
+    expected_version: Optional[int],
+    stored_version: Optional[int]
+) -> int:
+    """
+    Version to store for ``task``, enforcing ``expected_version`` if given.
+    
+    ``stored_version`` is None when the task does not exist yet. Versions
+    only move forward, even for unconditional saves of a stale copy.
+    """
+    current = stored_version or 0
+    if expected_version is not None and current != expected_version:
+        raise VersionConflictError(task.id, expected_version, current)
+    return max(current, task.version) + 1
+
+
+# Fields a patch may name: everything but the identity and the version it bumps
+_PATCHABLE_FIELDS = frozenset(Task._FIELDS) - {"id", "version"}
+
+# Status codes of satisfied prerequisites, for claim_next's SQL
+_SATISFIED_CODES = ", ".join(str(STATUS_CODES[status]) for status in SATISFIED_STATUSES)
+
+
+def _patch_fields(task: Task, fields: Optional[Iterable[str]]) -> Set[str]:
+    """Field names for ``TaskRepository.patch``; raises ValueError for others."""
+    names = set(task.dirty_fields if fields is None else fields)
+    for name in names - _PATCHABLE_FIELDS:
+        raise ValueError(f"Not a patchable task field: {name}")
+    return names
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    """Split a list into consecutive chunks of at most ``size`` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
 def create_repository(storage_type: str = "memory", **kwargs) -> TaskRepository:
     """Factory function to create repository instances."""
     repositories = {
         "memory": InMemoryRepository,
         "json": JSONFileRepository,
+        "journal": JournaledJSONRepository,
         "sqlite": SQLiteRepository,
     }
     
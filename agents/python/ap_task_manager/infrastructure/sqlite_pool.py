@@ -0,0 +1,136 @@
+"""
+Connection pooling for the SQLite repository.
+
+Keeps long-lived aiosqlite connections open so repository calls do not pay
+for a fresh connection (and its worker thread) on every operation.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+import aiosqlite
+
+
+@dataclass
+class SQLitePragmas:
+    """Connection-level tuning applied to every pooled connection."""
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = -16000  # Negative values are KiB (16 MiB)
+    mmap_size: int = 268435456  # 256 MiB
+    busy_timeout: int = 5000  # Milliseconds to wait on a locked database
+
+    def statements(self) -> List[str]:
+        """PRAGMA statements to run when a connection is opened."""
+        return [
+            f"PRAGMA journal_mode = {self.journal_mode}",
+            f"PRAGMA synchronous = {self.synchronous}",
+            f"PRAGMA cache_size = {int(self.cache_size)}",
+            f"PRAGMA mmap_size = {int(self.mmap_size)}",
+            f"PRAGMA busy_timeout = {int(self.busy_timeout)}",
+        ]
+
+
+class SQLiteConnectionPool:
+    """
+    Pool of long-lived SQLite connections.
+
+    SQLite allows a single writer at a time, so the pool keeps one dedicated
+    writer connection guarded by a lock plus up to ``size`` reader connections.
+    In WAL mode readers work from a consistent snapshot and never block the
+    writer (or each other).
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        size: int = 4,
+        pragmas: Optional[SQLitePragmas] = None
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.db_path = db_path
+        self.size = size
+        self.pragmas = pragmas or SQLitePragmas()
+
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: asyncio.Queue = asyncio.Queue()
+        self._reader_count = 0
+        self._connections: List[aiosqlite.Connection] = []
+        self._closed = False
+
+    async def _connect(self, readonly: bool) -> aiosqlite.Connection:
+        """Open and configure a new connection."""
+        db = await aiosqlite.connect(str(self.db_path))
+        for statement in self.pragmas.statements():
+            await db.execute(statement)
+        if readonly:
+            await db.execute("PRAGMA query_only = ON")
+
+        self._connections.append(db)
+        return db
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Borrow the writer connection.
+
+        Any open transaction is rolled back if the block raises, so the
+        connection is always returned in a clean state.
+        """
+        async with self._write_lock:
+            self._check_open()
+            if self._writer is None:
+                self._writer = await self._connect(readonly=False)
+
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection, opening one lazily if the pool has room."""
+        self._check_open()
+
+        if self._readers.empty() and self._reader_count < self.size:
+            self._reader_count += 1
+            try:
+                db = await self._connect(readonly=True)
+            except BaseException:
+                self._reader_count -= 1
+                raise
+        else:
+            db = await self._readers.get()
+
+        try:
+            yield db
+        finally:
+            # Connections borrowed across close() were already closed there
+            if not self._closed:
+                self._readers.put_nowait(db)
+
+    async def close(self) -> None:
+        """Close every connection owned by the pool."""
+        if self._closed:
+            return
+        self._closed = True
+
+        async with self._write_lock:
+            connections, self._connections = self._connections, []
+            for db in connections:
+                await db.close()
+
+            self._writer = None
+            self._readers = asyncio.Queue()
+            self._reader_count = 0
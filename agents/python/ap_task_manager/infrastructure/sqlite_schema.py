@@ -0,0 +1,281 @@
+"""
+Versioned schema for the SQLite repository.
+
+The schema version lives in ``PRAGMA user_version``, so opening an
+up-to-date database costs a single pragma read. Version 2 stores timestamps
+as integer microseconds since the Unix epoch (UTC) and status, priority and
+assignee as small integer codes; a priority's code is its weight, so
+ordering by priority is a plain indexed ``ORDER BY``.
+
+Databases written before the schema was versioned (``user_version`` 0 with
+a ``tasks`` table: ISO text timestamps, enum value strings) are rebuilt in
+place by ``ensure_schema`` in a single transaction. Readers on other WAL
+connections keep seeing the old tables until it commits.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from ..domain.entities import TaskStatus, Priority, AgentType
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+# Stored codes are part of the file format: never renumber, only append
+STATUS_CODES: Dict[TaskStatus, int] = {
+    TaskStatus.PENDING: 1,
+    TaskStatus.IN_PROGRESS: 2,
+    TaskStatus.COMPLETED: 3,
+    TaskStatus.BLOCKED: 4,
+    TaskStatus.FAILED: 5,
+    TaskStatus.ARCHIVED: 6,
+}
+PRIORITY_CODES: Dict[Priority, int] = {priority: priority.weight for priority in Priority}
+AGENT_CODES: Dict[AgentType, int] = {
+    AgentType.ORCHESTRATOR: 1,
+    AgentType.DEVELOPER: 2,
+    AgentType.ARCHITECT: 3,
+    AgentType.ANALYST: 4,
+    AgentType.QA: 5,
+    AgentType.PM: 6,
+    AgentType.PO: 7,
+    AgentType.SM: 8,
+    AgentType.DESIGN_ARCHITECT: 9,
+}
+
+STATUS_BY_CODE = {code: status for status, code in STATUS_CODES.items()}
+PRIORITY_BY_CODE = {code: priority for priority, code in PRIORITY_CODES.items()}
+AGENT_BY_CODE = {code: agent for agent, code in AGENT_CODES.items()}
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(value: Optional[datetime]) -> Optional[int]:
+    """Microseconds since the epoch; naive datetimes are taken as UTC (utcnow)."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value: Optional[int]) -> Optional[datetime]:
+    """Naive UTC datetime for an epoch-microsecond column, passing NULL through."""
+    if value is None:
+        return None
+    return _EPOCH + timedelta(0, 0, value)  # Positional: much cheaper than keywords
+
+
+TASK_COLUMNS = (
+    "id", "title", "description", "status", "priority", "story_id", "epic_id",
+    "assignee", "labels", "metadata", "created_at", "updated_at", "started_at",
+    "completed_at", "metrics", "version", "lease_owner", "lease_expires_at", "depends_on"
+)
+
+EVENT_COLUMNS = ("id", "task_id", "event_type", "timestamp", "actor", "details", "correlation_id")
+
+_CREATE_TASKS = """
+    CREATE TABLE {name} (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        status INTEGER NOT NULL,
+        priority INTEGER NOT NULL,
+        story_id TEXT,
+        epic_id TEXT,
+        assignee INTEGER,
+        labels TEXT,
+        metadata TEXT,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL,
+        started_at INTEGER,
+        completed_at INTEGER,
+        metrics TEXT,
+        version INTEGER NOT NULL DEFAULT 0,
+        lease_owner TEXT,
+        lease_expires_at INTEGER,
+        depends_on TEXT
+    )
+"""
+
+_CREATE_EVENTS = """
+    CREATE TABLE {name} (
+        id TEXT PRIMARY KEY,
+        task_id TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        actor TEXT,
+        details TEXT,
+        correlation_id TEXT
+    )
+"""
+
+# (status, priority DESC, created_at) prefixes match the repository's default
+# ordering, so filtered, limited queries stop after ``limit`` index entries.
+# idx_assignee_order also carries ``id``, covering claim_next's lookup of the
+# next task without touching table rows
+_INDEXES = (
+    "CREATE INDEX idx_order ON tasks(priority DESC, created_at)",
+    "CREATE INDEX idx_status_order ON tasks(status, priority DESC, created_at)",
+    "CREATE INDEX idx_assignee_order ON tasks(assignee, status, priority DESC, created_at, id)",
+    "CREATE INDEX idx_story_id ON tasks(story_id)",
+    "CREATE INDEX idx_created_at ON tasks(created_at)",
+    # Partial index: only leased tasks, so the reaper never scans the rest
+    "CREATE INDEX idx_lease_expiry ON tasks(lease_expires_at) "
+    "WHERE lease_expires_at IS NOT NULL",
+    "CREATE INDEX idx_events_task_time ON task_events(task_id, timestamp)",
+    "CREATE INDEX idx_events_correlation ON task_events(correlation_id)",
+)
+
+# Rows copied per executemany while migrating
+_MIGRATION_BATCH = 1000
+
+
+async def schema_version(db) -> int:
+    """Schema version recorded in the database header (0 if never set)."""
+    async with db.execute("PRAGMA user_version") as cursor:
+        return (await cursor.fetchone())[0]
+
+
+async def ensure_schema(db) -> None:
+    """
+    Create or upgrade the schema on the writer connection ``db``.
+    
+    Raises RuntimeError for databases written by a newer schema version.
+    """
+    if await schema_version(db) == SCHEMA_VERSION:
+        return
+    
+    # Re-check under the write lock: another process may have just upgraded
+    await db.execute("BEGIN IMMEDIATE")
+    version = await schema_version(db)
+    if version > SCHEMA_VERSION:
+        await db.rollback()
+        raise RuntimeError(
+            f"Database schema version {version} is newer than supported ({SCHEMA_VERSION})"
+        )
+    
+    if version < SCHEMA_VERSION:
+        tables = await _table_names(db)
+        if "tasks" in tables:
+            logger.info(f"Migrating task database to schema version {SCHEMA_VERSION}")
+            await _migrate_unversioned(db, tables)
+        else:
+            await _create_schema(db)
+        await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    await db.commit()
+
+
+async def _table_names(db) -> Set[str]:
+    async with db.execute("SELECT name FROM sqlite_master WHERE type = 'table'") as cursor:
+        return {row[0] for row in await cursor.fetchall()}
+
+
+async def _create_schema(db) -> None:
+    await db.execute(_CREATE_TASKS.format(name="tasks"))
+    await db.execute(_CREATE_EVENTS.format(name="task_events"))
+    for statement in _INDEXES:
+        await db.execute(statement)
+
+
+async def _migrate_unversioned(db, tables: Set[str]) -> None:
+    """
+    Rebuild the unversioned text layout as schema version 2.
+    
+    Columns added over time (version, leases, depends_on, ...) may be
+    missing; events may still sit in the legacy ``tasks.events`` JSON column.
+    """
+    async with db.execute("PRAGMA table_info(tasks)") as cursor:
+        present = {row[1] for row in await cursor.fetchall()}
+    
+    await db.execute(_CREATE_TASKS.format(name="tasks_v2"))
+    await db.execute(_CREATE_EVENTS.format(name="task_events_v2"))
+    
+    selected = ", ".join(column if column in present else "NULL" for column in TASK_COLUMNS)
+    insert_task = (
+        f"INSERT INTO tasks_v2 ({', '.join(TASK_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(TASK_COLUMNS))})"
+    )
+    async with db.execute(f"SELECT {selected} FROM tasks") as cursor:
+        while rows := await cursor.fetchmany(_MIGRATION_BATCH):
+            await db.executemany(insert_task, [_convert_task_row(row) for row in rows])
+    
+    insert_event = (
+        f"INSERT OR IGNORE INTO task_events_v2 ({', '.join(EVENT_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(EVENT_COLUMNS))})"
+    )
+    if "task_events" in tables:
+        async with db.execute(f"SELECT {', '.join(EVENT_COLUMNS)} FROM task_events") as cursor:
+            while rows := await cursor.fetchmany(_MIGRATION_BATCH):
+                await db.executemany(insert_event, [
+                    (*row[:3], _iso_to_us(row[3]), *row[4:]) for row in rows
+                ])
+    if "events" in present:
+        async with db.execute(
+            "SELECT id, events FROM tasks WHERE events IS NOT NULL"
+        ) as cursor:
+            while rows := await cursor.fetchmany(_MIGRATION_BATCH):
+                await db.executemany(insert_event, [
+                    event_row
+                    for task_id, blob in rows
+                    for event_row in _convert_event_blob(task_id, blob)
+                ])
+    
+    # Dropping the old tables drops their indexes too, freeing the names
+    await db.execute("DROP TABLE tasks")
+    await db.execute("DROP TABLE IF EXISTS task_events")
+    await db.execute("ALTER TABLE tasks_v2 RENAME TO tasks")
+    await db.execute("ALTER TABLE task_events_v2 RENAME TO task_events")
+    for statement in _INDEXES:
+        await db.execute(statement)
+
+
+def _convert_task_row(row: tuple) -> tuple:
+    """Convert an unversioned task row (``TASK_COLUMNS`` order) to version 2."""
+    (task_id, title, description, status, priority, story_id, epic_id, assignee,
+     labels, metadata, created_at, updated_at, started_at, completed_at, metrics,
+     version, lease_owner, lease_expires_at, depends_on) = row
+    created_us = _iso_to_us(created_at) or 0
+    return (
+        task_id, title, description,
+        STATUS_CODES[TaskStatus(status)],
+        PRIORITY_CODES[Priority(priority)],
+        story_id, epic_id,
+        AGENT_CODES[AgentType(assignee)] if assignee else None,
+        labels, metadata,
+        created_us,
+        _iso_to_us(updated_at) or created_us,
+        _iso_to_us(started_at),
+        _iso_to_us(completed_at),
+        metrics,
+        version or 0,
+        lease_owner,
+        _iso_to_us(lease_expires_at),
+        depends_on
+    )
+
+
+def _convert_event_blob(task_id: str, blob: str) -> List[tuple]:
+    """Event rows for the legacy ``tasks.events`` JSON column."""
+    rows = []
+    for data in json.loads(blob or "[]"):
+        rows.append((
+            data["event_id"],
+            task_id,
+            data.get("type", ""),
+            _iso_to_us(data["timestamp"]),
+            data.get("actor", ""),
+            json.dumps(data.get("details") or {}),
+            data.get("correlation_id")
+        ))
+    return rows
+
+
+def _iso_to_us(value: Any) -> Optional[int]:
+    return to_epoch_us(datetime.fromisoformat(value)) if value else None
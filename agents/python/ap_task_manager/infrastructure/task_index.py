@@ -0,0 +1,188 @@
+"""
+Secondary indexes for in-process task storage.
+
+Maintains id sets per field value, an inverted index over labels and
+sorted lists per ``TaskOrder`` - one over all tasks and one per status - so
+filtered and limited queries touch only the tasks they return instead of
+scanning and sorting everything. Leased tasks are also kept in expiry order.
+"""
+
+import bisect
+import heapq
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from ..domain.entities import Task
+from .query import TaskFilter, TaskOrder
+
+
+# Equality-indexed fields; each must also be a TaskFilter field
+INDEXED_FIELDS = ("status", "assignee", "priority", "story_id", "epic_id")
+
+
+@dataclass
+class _IndexEntry:
+    """The values a task was indexed under when it was last added."""
+    values: Tuple[Any, ...]  # Aligned with INDEXED_FIELDS
+    labels: Tuple[str, ...]
+    created_at: datetime
+    order_keys: Dict[TaskOrder, tuple]
+    expiry_key: Optional[tuple]  # (lease_expires_at, id) while leased
+    
+    @classmethod
+    def of(cls, task: Task) -> '_IndexEntry':
+        return cls(
+            values=tuple(getattr(task, name) for name in INDEXED_FIELDS),
+            labels=tuple(dict.fromkeys(task._labels or ())),
+            created_at=task.created_at,
+            order_keys={order: (order.sort_key(task), task.id) for order in TaskOrder},
+            expiry_key=(task.lease_expires_at, task.id) if task.lease_expires_at else None
+        )
+
+
+class TaskIndex:
+    """
+    Secondary indexes over a set of tasks, keyed by task ID.
+    
+    Entries record the values a task had when it was added, so the index
+    stays consistent even if the caller goes on mutating the Task object;
+    re-adding the task moves it to its new keys.
+    """
+    
+    def __init__(self):
+        self._fields: Dict[str, Dict[Any, Set[UUID]]] = {name: {} for name in INDEXED_FIELDS}
+        self._labels: Dict[str, Set[UUID]] = {}
+        # Keyed by (order, status); status None covers every task
+        self._ordered: Dict[tuple, List[tuple]] = {}
+        self._expiry: List[tuple] = []
+        self._entries: Dict[UUID, _IndexEntry] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def add(self, task: Task) -> None:
+        """Index a task, replacing any previous entry for its ID."""
+        self.remove(task.id)
+        entry = _IndexEntry.of(task)
+        self._entries[task.id] = entry
+        
+        for name, value in zip(INDEXED_FIELDS, entry.values):
+            if value is not None:
+                self._fields[name].setdefault(value, set()).add(task.id)
+        for label in entry.labels:
+            self._labels.setdefault(label, set()).add(task.id)
+        for order, key in entry.order_keys.items():
+            for status in (None, task.status):
+                bisect.insort(self._ordered.setdefault((order, status), []), key)
+        if entry.expiry_key:
+            bisect.insort(self._expiry, entry.expiry_key)
+    
+    def remove(self, task_id: UUID) -> bool:
+        """Drop a task from every index; returns False if it was not indexed."""
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return False
+        
+        for name, value in zip(INDEXED_FIELDS, entry.values):
+            if value is not None:
+                _discard(self._fields[name], value, task_id)
+        for label in entry.labels:
+            _discard(self._labels, label, task_id)
+        status = entry.values[INDEXED_FIELDS.index("status")]
+        for order, key in entry.order_keys.items():
+            for ordered in (self._ordered[(order, None)], self._ordered[(order, status)]):
+                del ordered[bisect.bisect_left(ordered, key)]
+        if entry.expiry_key:
+            del self._expiry[bisect.bisect_left(self._expiry, entry.expiry_key)]
+        return True
+    
+    def clear(self) -> None:
+        """Drop every entry."""
+        for index in self._fields.values():
+            index.clear()
+        self._labels.clear()
+        self._ordered.clear()
+        self._expiry.clear()
+        self._entries.clear()
+    
+    def _candidate_sets(self, filter_spec: TaskFilter) -> List[Set[UUID]]:
+        """
+        One ID set per indexed predicate, smallest first; empty if none are set.
+        
+        Status is left out: select() walks the per-status ordered list instead.
+        """
+        sets = []
+        for name in INDEXED_FIELDS:
+            value = getattr(filter_spec, name)
+            if value and name != "status":
+                sets.append(self._fields[name].get(value, set()))
+        if filter_spec.labels:
+            sets.append(set().union(*(self._labels.get(l, ()) for l in filter_spec.labels)))
+        
+        sets.sort(key=len)
+        return sets
+    
+    def select(
+        self,
+        filter_spec: TaskFilter,
+        order: TaskOrder = TaskOrder.PRIORITY,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[UUID]:
+        """IDs of the tasks matching ``filter_spec`` in ``order``, windowed."""
+        sets = self._candidate_sets(filter_spec)
+        ordered = self._ordered.get((order, filter_spec.status), [])
+        wanted = None if limit is None else offset + limit
+        if not self._entries or (limit is not None and limit <= 0):
+            return []
+        after = filter_spec.created_after
+        
+        def accept(task_id: UUID) -> bool:
+            return after is None or self._entries[task_id].created_at >= after
+        
+        # Walking the ordered list visits about wanted * n / k entries when k
+        # of its n tasks match; intersecting and sorting costs about the
+        # smallest set. Take the cheaper, estimating k as if the predicates
+        # were independent.
+        n = len(ordered)
+        matching = n
+        for ids in sets:
+            matching *= len(ids) / len(self._entries)
+        if not sets or (wanted is not None and wanted * n < matching * len(sets[0])):
+            result = []
+            for _, task_id in ordered:
+                if all(task_id in ids for ids in sets) and accept(task_id):
+                    result.append(task_id)
+                    if wanted is not None and len(result) >= wanted:
+                        break
+        else:
+            candidates = sets[0].intersection(*sets[1:])
+            if filter_spec.status:
+                candidates = candidates.intersection(
+                    self._fields["status"].get(filter_spec.status, ())
+                )
+            keys = [self._entries[i].order_keys[order] for i in candidates if accept(i)]
+            keys = heapq.nsmallest(wanted, keys) if wanted is not None else sorted(keys)
+            result = [task_id for _, task_id in keys]
+        
+        return result[offset:]
+    
+    def expired(self, now: datetime, limit: int = 100) -> List[UUID]:
+        """IDs of tasks whose lease ran out at or before ``now``, earliest first."""
+        result = []
+        for expires_at, task_id in self._expiry:
+            if expires_at > now or len(result) >= limit:
+                break
+            result.append(task_id)
+        return result
+
+
+def _discard(index: Dict[Any, Set[UUID]], key: Any, task_id: UUID) -> None:
+    """Remove an ID from an index bucket, dropping the bucket once empty."""
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.discard(task_id)
+        if not bucket:
+            del index[key]
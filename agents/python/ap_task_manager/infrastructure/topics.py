@@ -0,0 +1,99 @@
+"""
+Topic patterns for event subscriptions.
+
+Event types are dotted topics (``task.created``). A pattern matches topics
+segment by segment: ``*`` matches exactly one segment and ``#`` matches
+any number of segments, including none - so ``task.*`` matches
+``task.created``, ``*.completed`` matches ``extraction.completed`` and
+``#`` matches everything. Patterns are stored in a trie, so matching a
+topic costs its number of segments, not the number of patterns.
+"""
+
+from typing import Dict, List, Set
+
+
+SEPARATOR = "."
+ONE = "*"
+ANY = "#"
+
+
+def split_pattern(pattern: str) -> List[str]:
+    """Segments of a pattern; raises ValueError for malformed patterns."""
+    segments = pattern.split(SEPARATOR)
+    for segment in segments:
+        if not segment or (segment not in (ONE, ANY) and (ONE in segment or ANY in segment)):
+            raise ValueError(f"Invalid topic pattern: {pattern}")
+    return segments
+
+
+class _Node:
+    __slots__ = ("children", "patterns")
+    
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.patterns: Set[str] = set()  # Patterns ending at this node
+
+
+class TopicTrie:
+    """Set of topic patterns that can be matched against topics."""
+    
+    def __init__(self):
+        self._root = _Node()
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def add(self, pattern: str) -> None:
+        """Add a pattern; adding one already present does nothing."""
+        node = self._root
+        for segment in split_pattern(pattern):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _Node()
+            node = child
+        if pattern not in node.patterns:
+            node.patterns.add(pattern)
+            self._size += 1
+    
+    def remove(self, pattern: str) -> None:
+        """Remove a pattern and prune the nodes only it used."""
+        path = [self._root]
+        segments = split_pattern(pattern)
+        for segment in segments:
+            child = path[-1].children.get(segment)
+            if child is None:
+                return
+            path.append(child)
+        
+        if pattern not in path[-1].patterns:
+            return
+        path[-1].patterns.discard(pattern)
+        self._size -= 1
+        
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.patterns or node.children:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+    
+    def match(self, topic: str) -> Set[str]:
+        """Patterns that match ``topic``."""
+        found: Set[str] = set()
+        self._match(self._root, topic.split(SEPARATOR), 0, found)
+        return found
+    
+    def _match(self, node: _Node, segments: List[str], index: int, found: Set[str]) -> None:
+        if index == len(segments):
+            found.update(node.patterns)
+        else:
+            for key in (segments[index], ONE):
+                child = node.children.get(key)
+                if child is not None:
+                    self._match(child, segments, index + 1, found)
+        
+        # ``#`` may consume any number of the remaining segments, including none
+        child = node.children.get(ANY)
+        if child is not None:
+            for rest in range(index, len(segments) + 1):
+                self._match(child, segments, rest, found)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: claim_next vs. poll-then-transition under many concurrent workers.
+
+Each worker repeatedly takes the next pending task for one agent until the
+queue is empty. "poll" is the previous worker loop - query_tasks for the
+first PENDING task, then transition_status to IN_PROGRESS - where workers
+race for the same head of the queue and the losers retry. "claim" uses
+TaskService.claim_next, which picks and claims in one atomic step.
+
+Usage:
+    python benchmarks/bench_claim.py [--tasks 2000] [--workers 32]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ap_task_manager.core.service import TaskService
+from ap_task_manager.domain.entities import Task, TaskStatus, Priority, AgentType
+from ap_task_manager.infrastructure.repository import create_repository
+
+
+async def poll(service: TaskService, assignee: AgentType):
+    """Old worker step: returns (task or None, attempts made)."""
+    attempts = 0
+    while True:
+        attempts += 1
+        pending = await service.query_tasks(status=TaskStatus.PENDING, assignee=assignee, limit=1)
+        if not pending:
+            return None, attempts
+        task = await service.transition_status(pending[0].id, TaskStatus.IN_PROGRESS, assignee.value)
+        if task:
+            return task, attempts
+
+
+async def claim(service: TaskService, assignee: AgentType):
+    return await service.claim_next(assignee), 1
+
+
+async def run(repository, task_count: int, workers: int, step) -> dict:
+    rng = random.Random(7)
+    tasks = [
+        Task(
+            title=f"Benchmark task {i}",
+            priority=rng.choice(list(Priority)),
+            assignee=AgentType.DEVELOPER,
+        )
+        for i in range(task_count)
+    ]
+    await repository.save_many(tasks)
+    service = TaskService(repository=repository)
+    
+    claimed = Counter()
+    attempts = 0
+    
+    async def worker():
+        nonlocal attempts
+        while True:
+            task, tries = await step(service, AgentType.DEVELOPER)
+            attempts += tries
+            if task is None:
+                return
+            claimed[task.id] += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+    await repository.close()
+    
+    return {
+        "claims/s": sum(claimed.values()) / elapsed,
+        "wasted attempts": attempts - sum(claimed.values()) - workers,
+        "double claims": sum(n - 1 for n in claimed.values()),
+    }
+
+
+async def main(task_count: int, workers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "memory": lambda name: create_repository("memory"),
+            "sqlite": lambda name: create_repository("sqlite", db_path=Path(tmp) / f"{name}.db"),
+        }
+        
+        print(f"{task_count} tasks, {workers} concurrent workers")
+        print(f"{'backend':<10}{'mode':<8}{'claims/s':>12}{'wasted attempts':>18}{'double claims':>16}")
+        for label, make in backends.items():
+            for mode, step in (("poll", poll), ("claim", claim)):
+                result = await run(make(mode), task_count, workers, step)
+                print(
+                    f"{label:<10}{mode:<8}{result['claims/s']:>12.1f}"
+                    f"{result['wasted attempts']:>18}{result['double claims']:>16}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.tasks, args.workers))
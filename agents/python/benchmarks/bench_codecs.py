@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: task serialization round-trips per codec.
+
+Encodes and decodes N tasks the way each storage backend does: as one
+``Task.to_dict`` document (the JSON file and journal stores) and as SQLite
+rows with JSON columns. Codecs that are not installed are skipped; binary
+codecs only apply to documents.
+
+Usage:
+    python benchmarks/bench_codecs.py [--tasks 100000]
+"""
+
+import argparse
+import gc
+import random
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ap_task_manager.domain.entities import Task, TaskStatus, Priority, AgentType
+from ap_task_manager.infrastructure.codecs import create_codec
+from ap_task_manager.infrastructure.repository import SQLiteRepository
+
+
+CODECS = ("json", "orjson", "msgpack")
+
+
+def make_tasks(count: int) -> list:
+    """A mix of bare, labelled, started and finished tasks."""
+    rng = random.Random(7)
+    story_ids = [uuid4() for _ in range(50)]
+    tasks = []
+    for i in range(count):
+        task = Task(
+            title=f"Benchmark task {i}",
+            description="Implement the thing" if i % 2 else "",
+            priority=rng.choice(list(Priority)),
+            assignee=rng.choice(list(AgentType)),
+            story_id=rng.choice(story_ids),
+            labels=["backend", "api"] if i % 3 == 0 else None,
+            metadata={"points": i % 8} if i % 4 == 0 else None,
+            depends_on=[tasks[-1].id] if i % 5 == 0 and tasks else None
+        )
+        if i % 2:
+            task.transition_to(TaskStatus.IN_PROGRESS, "bench")
+        if i % 6 == 1:
+            task.transition_to(TaskStatus.COMPLETED, "bench")
+        tasks.append(task)
+    return tasks
+
+
+def timed(func):
+    """(result, ms); the collector is paused so its full passes do not swamp the numbers."""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = func()
+        return result, (time.perf_counter() - start) * 1000
+    finally:
+        gc.enable()
+
+
+def bench_document(codec, tasks: list) -> tuple:
+    """(encode ms, decode ms, bytes) for the file-store document."""
+    blob, encode_ms = timed(lambda: codec.dumps([task.to_dict() for task in tasks]))
+    _, decode_ms = timed(lambda: [Task.from_dict(data) for data in codec.loads(blob)])
+    return encode_ms, decode_ms, len(blob)
+
+
+def bench_rows(codec, tasks: list, db_path: Path) -> tuple:
+    """(encode ms, decode ms) for SQLite rows."""
+    repository = SQLiteRepository(db_path, codec=codec)
+    rows, encode_ms = timed(lambda: [repository._task_to_row(task, task.version) for task in tasks])
+    _, decode_ms = timed(lambda: [repository._row_to_task(row) for row in rows])
+    return encode_ms, decode_ms
+
+
+def main(task_count: int) -> None:
+    tasks = make_tasks(task_count)
+    
+    print(f"{task_count} tasks")
+    print(
+        f"{'codec':<10}{'doc encode ms':>15}{'doc decode ms':>15}{'doc MB':>9}"
+        f"{'row encode ms':>15}{'row decode ms':>15}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in CODECS:
+            try:
+                codec = create_codec(name)
+            except ImportError:
+                print(f"{name:<10}not installed")
+                continue
+            
+            encode_ms, decode_ms, size = bench_document(codec, tasks)
+            line = f"{name:<10}{encode_ms:>15.0f}{decode_ms:>15.0f}{size / 1e6:>9.1f}"
+            if codec.text:
+                encode_ms, decode_ms = bench_rows(codec, tasks, Path(tmp) / f"{name}.db")
+                line += f"{encode_ms:>15.0f}{decode_ms:>15.0f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    args = parser.parse_args()
+    
+    main(args.tasks)
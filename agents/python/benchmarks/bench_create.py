@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: creating tasks one at a time vs. with TaskService.create_tasks.
+
+Creates N tasks per backend through the service, once with a ``create_task``
+call per task (a save, an event and a metric each) and once with a single
+``create_tasks`` call (one repository write, one BATCH_CREATED event and one
+metric per priority/assignee pair). A subscriber and an in-process APM
+provider are attached, as in a monitored deployment.
+
+Usage:
+    python benchmarks/bench_create.py [--tasks 2000] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ap_task_manager.core.service import TaskService, TaskSpec
+from ap_task_manager.domain.entities import Priority, AgentType
+from ap_task_manager.infrastructure.apm import create_apm_provider
+from ap_task_manager.infrastructure.events import EventType
+from ap_task_manager.infrastructure.repository import create_repository
+
+
+def make_specs(count: int) -> list:
+    priorities = list(Priority)
+    agents = list(AgentType)
+    return [
+        TaskSpec(
+            title=f"Benchmark task {i}",
+            description="Implement the endpoint and its validation.",
+            priority=priorities[i % len(priorities)],
+            assignee=agents[i % len(agents)],
+            labels=["backend", f"sprint-{i % 10}"]
+        )
+        for i in range(count)
+    ]
+
+
+def make_repository(backend: str, path: Path):
+    if backend == "memory":
+        return create_repository("memory")
+    if backend == "sqlite":
+        return create_repository("sqlite", db_path=path.with_suffix(".db"))
+    return create_repository("journal", file_path=path.with_suffix(".json"))
+
+
+async def one_by_one(service: TaskService, specs: list) -> None:
+    for spec in specs:
+        await service.create_task(
+            title=spec.title,
+            description=spec.description,
+            priority=spec.priority,
+            assignee=spec.assignee,
+            labels=spec.labels
+        )
+
+
+async def batched(service: TaskService, specs: list) -> None:
+    await service.create_tasks(specs)
+
+
+async def run(backend: str, mode, task_count: int, path: Path) -> float:
+    """Create ``task_count`` tasks in a fresh store; returns elapsed ms."""
+    repository = make_repository(backend, path)
+    service = TaskService(
+        repository=repository,
+        apm_provider=create_apm_provider("console", verbose=False)
+    )
+    
+    seen = []
+    async def on_created(task):
+        seen.append(task)
+    async def on_batch(tasks):
+        seen.extend(tasks)
+    service.event_bus.subscribe(EventType.TASK_CREATED, on_created)
+    service.event_bus.subscribe(EventType.BATCH_CREATED, on_batch)
+    
+    specs = make_specs(task_count)
+    start = time.perf_counter()
+    await mode(service, specs)
+    elapsed = (time.perf_counter() - start) * 1000
+    
+    assert len(seen) == task_count
+    await repository.close()
+    return elapsed
+
+
+async def main(task_count: int, repeat: int) -> None:
+    print(f"{task_count} tasks, best of {repeat}")
+    print(f"{'backend':<10}{'one-by-one ms':>15}{'batched ms':>12}{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("memory", "sqlite", "journal"):
+            results = {}
+            for label, mode in (("single", one_by_one), ("batch", batched)):
+                timings = []
+                for attempt in range(repeat):
+                    path = Path(tmp) / f"{backend}-{label}-{attempt}"
+                    timings.append(await run(backend, mode, task_count, path))
+                results[label] = min(timings)
+            speedup = results["single"] / results["batch"]
+            print(f"{backend:<10}{results['single']:>15.1f}{results['batch']:>12.1f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.tasks, args.repeat))
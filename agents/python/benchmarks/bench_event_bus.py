@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: EventBus emit throughput with sync handlers.
+
+Emits N events to 0, 1 and 10 trivial sync handlers (counters, like the
+demo's ``on_task_created``) and reports emits per second when the handlers
+run on the bus's thread pool ("blocking", one thread hop per handler per
+event) and when they are marked inline-safe ("inline", called directly on
+the event loop).
+
+Usage:
+    python benchmarks/bench_event_bus.py [--events 20000] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ap_task_manager.infrastructure.events import EventBus, EventType
+
+
+async def measure(handler_count: int, inline: bool, event_count: int) -> float:
+    """Emits per second for one configuration."""
+    bus = EventBus()
+    counts = [0] * handler_count
+    for i in range(handler_count):
+        def handler(data, i=i):
+            counts[i] += 1
+        bus.subscribe(EventType.TASK_CREATED, handler, inline=inline)
+    
+    start = time.perf_counter()
+    for n in range(event_count):
+        await bus.emit(EventType.TASK_CREATED, n)
+    elapsed = time.perf_counter() - start
+    
+    assert all(count == event_count for count in counts)
+    await bus.drain()
+    return event_count / elapsed
+
+
+async def main(event_count: int, repeat: int) -> None:
+    print(f"{event_count} events, best of {repeat}")
+    print(f"{'handlers':<10}{'blocking emits/s':>18}{'inline emits/s':>16}{'speedup':>10}")
+    for handler_count in (0, 1, 10):
+        rates = {}
+        for inline in (False, True):
+            rates[inline] = max([
+                await measure(handler_count, inline, event_count) for _ in range(repeat)
+            ])
+        speedup = rates[True] / rates[False]
+        print(f"{handler_count:<10}{rates[False]:>18,.0f}{rates[True]:>16,.0f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.events, args.repeat))
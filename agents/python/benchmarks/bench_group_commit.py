@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sustained write throughput with and without group commit.
+
+Many coroutines concurrently drive tasks through TaskService.transition_status
+(the multi-agent load pattern), each awaiting its own save. Without group
+commit every save is its own SQLite transaction or JSON file rewrite; with
+GroupCommitRepository saves arriving together share one.
+
+Usage:
+    python benchmarks/bench_group_commit.py [--tasks 500] [--workers 64]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ap_task_manager.core.service import TaskService
+from ap_task_manager.domain.entities import Task, TaskStatus
+from ap_task_manager.infrastructure.group_commit import GroupCommitRepository
+from ap_task_manager.infrastructure.repository import create_repository
+
+
+async def run(repository, task_count: int, workers: int) -> float:
+    """Transitions per second for ``workers`` concurrent writers."""
+    service = TaskService(repository=repository)
+    tasks = [Task(title=f"Benchmark task {i}") for i in range(task_count)]
+    await repository.save_many(tasks)
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    for task in tasks:
+        queue.put_nowait(task.id)
+    
+    async def worker():
+        while not queue.empty():
+            task_id = queue.get_nowait()
+            await service.transition_status(task_id, TaskStatus.IN_PROGRESS, "bench")
+            await service.transition_status(task_id, TaskStatus.COMPLETED, "bench")
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+    
+    await repository.close()
+    return task_count * 2 / elapsed
+
+
+async def main(task_count: int, workers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "sqlite (synchronous=FULL)": lambda name: create_repository(
+                "sqlite", db_path=Path(tmp) / f"{name}.db", synchronous="FULL"
+            ),
+            "json": lambda name: create_repository(
+                "json", file_path=Path(tmp) / f"{name}.json"
+            ),
+        }
+        
+        print(f"{task_count * 2} transitions, {workers} concurrent writers")
+        print(f"{'backend':<28}{'direct tx/s':>14}{'group tx/s':>14}{'speedup':>10}")
+        for label, make in backends.items():
+            direct = await run(make("direct"), task_count, workers)
+            grouped = await run(GroupCommitRepository(make("grouped")), task_count, workers)
+            print(f"{label:<28}{direct:>14.1f}{grouped:>14.1f}{grouped / direct:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=64)
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.tasks, args.workers))
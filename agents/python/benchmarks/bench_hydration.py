@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: listing tasks from SQLite with eager, lazy and projected hydration.
+
+Lists every task and reads status, title and assignee - what the CLI's
+``query --format simple`` prints. "eager" also reads every other field, as
+decoding whole rows up front did; "lazy" reads only the three fields of
+full rows; "projected" asks the repository for just those columns.
+
+Usage:
+    python benchmarks/bench_hydration.py [--tasks 50000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ap_task_manager.domain.entities import Task, TaskStatus, Priority, AgentType
+from ap_task_manager.infrastructure.repository import SQLiteRepository
+
+
+PRINTED = ("status", "title", "assignee")
+
+
+async def eager(repository: SQLiteRepository) -> None:
+    for task in await repository.query():
+        for name in Task._FIELDS:
+            getattr(task, name)
+
+
+async def lazy(repository: SQLiteRepository) -> None:
+    for task in await repository.query():
+        for name in PRINTED:
+            getattr(task, name)
+
+
+async def projected(repository: SQLiteRepository) -> None:
+    for task in await repository.query(fields=PRINTED):
+        for name in PRINTED:
+            getattr(task, name)
+
+
+async def main(task_count: int, repeat: int) -> None:
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = SQLiteRepository(Path(tmp) / "tasks.db")
+        tasks = []
+        for i in range(task_count):
+            task = Task(
+                title=f"Benchmark task {i}",
+                priority=rng.choice(list(Priority)),
+                assignee=rng.choice(list(AgentType)),
+                labels=["backend"] if i % 3 == 0 else None
+            )
+            task.add_event("created", "bench")
+            if i % 2:
+                task.transition_to(TaskStatus.IN_PROGRESS, "bench")
+            tasks.append(task)
+        await repository.save_many(tasks)
+        
+        print(f"{task_count} tasks, best of {repeat}")
+        print(f"{'mode':<12}{'ms':>10}{'median ms':>12}")
+        for label, listing in (("eager", eager), ("lazy", lazy), ("projected", projected)):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                await listing(repository)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{label:<12}{min(timings):>10.1f}{statistics.median(timings):>12.1f}")
+        
+        await repository.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.tasks, args.repeat))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: event-loop lag while JSONFileRepository writes a large file.
+
+A ticker coroutine sleeps for 1 ms in a loop and records how late each
+wake-up is while the repository performs saves against a file holding N
+tasks. "inline" runs the repository's file work directly on the event loop
+(the previous behavior); "executor" uses the repository's dedicated I/O
+thread. Lower lag means other coroutines - EventBus handlers, APM flushes -
+keep running while the file is rewritten.
+
+Usage:
+    python benchmarks/bench_json_loop_lag.py [--tasks 5000] [--saves 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from concurrent.futures import Executor, Future
+from pathlib import Path
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ap_task_manager.domain.entities import Task
+from ap_task_manager.infrastructure.repository import JSONFileRepository
+
+
+class InlineExecutor(Executor):
+    """Executor that runs work synchronously in the caller (on the loop)."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+async def measure(repo: JSONFileRepository, tasks, saves: int) -> dict:
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        interval = 0.001
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append((time.perf_counter() - start - interval) * 1000)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    for i in range(saves):
+        task = tasks[i % len(tasks)]
+        task.title = f"Benchmark task {i} (updated)"
+        await repo.save(task)
+        await repo.get(task.id)
+    elapsed = time.perf_counter() - start
+
+    done.set()
+    await ticker_task
+
+    return {
+        "saves/s": saves / elapsed,
+        "max lag ms": max(lags),
+        "p99 lag ms": statistics.quantiles(lags, n=100)[98] if len(lags) >= 100 else max(lags),
+        "median lag ms": statistics.median(lags),
+    }
+
+
+async def main(task_count: int, saves: int) -> None:
+    tasks = [Task(title=f"Benchmark task {i}") for i in range(task_count)]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, executor in (("inline", InlineExecutor()), ("executor", None)):
+            repo = JSONFileRepository(Path(tmp) / f"{label}.json", executor=executor)
+            await repo.save_many(tasks)
+            results[label] = await measure(repo, tasks, saves)
+            await repo.close()
+
+    print(f"JSONFileRepository: {task_count} tasks, {saves} saves")
+    print(f"{'metric':<16}{'inline':>12}{'executor':>12}")
+    for metric in results["inline"]:
+        print(f"{metric:<16}{results['inline'][metric]:>12.2f}{results['executor'][metric]:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--saves", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.tasks, args.saves))
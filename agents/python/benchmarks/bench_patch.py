@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: persisting status transitions with full saves vs. field patches.
+
+Loads N stored tasks (with labels, metadata and dependencies, as extracted
+stories produce), moves each to IN_PROGRESS and persists it once with
+``save`` (the whole row or record) and once with ``patch`` (only the fields
+``transition_to`` marked dirty). Reports time per task and, for the
+journal, bytes appended per task.
+
+Usage:
+    python benchmarks/bench_patch.py [--tasks 5000]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ap_task_manager.domain.entities import Task, TaskStatus, AgentType
+from ap_task_manager.infrastructure.repository import create_repository
+
+
+def make_tasks(count: int) -> list:
+    tasks = []
+    for i in range(count):
+        tasks.append(Task(
+            title=f"Benchmark task {i}",
+            description="Implement the endpoint and its validation. " * 4,
+            assignee=AgentType.DEVELOPER,
+            labels=["backend", "api", f"sprint-{i % 10}"],
+            metadata={"points": i % 8, "source": "story.md", "acceptance": ["a", "b", "c"]},
+            depends_on=[tasks[-1].id] if tasks else None
+        ))
+    return tasks
+
+
+async def transition_all(repository, tasks: list, mode: str) -> float:
+    """Reload, transition and persist every task; returns ms per task."""
+    loaded = await repository.get_many([task.id for task in tasks])
+    start = time.perf_counter()
+    for task in loaded.values():
+        task.transition_to(TaskStatus.IN_PROGRESS, "bench")
+        if mode == "save":
+            await repository.save(task, expected_version=task.version)
+        else:
+            await repository.patch(task, expected_version=task.version)
+    return (time.perf_counter() - start) * 1000 / len(tasks)
+
+
+async def main(task_count: int) -> None:
+    print(f"{task_count} tasks, one status transition each")
+    print(f"{'backend':<10}{'mode':<8}{'ms/task':>10}{'bytes/task':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("sqlite", "journal"):
+            for mode in ("save", "patch"):
+                path = Path(tmp) / f"{backend}-{mode}"
+                if backend == "sqlite":
+                    repository = create_repository("sqlite", db_path=path.with_suffix(".db"))
+                else:
+                    # Never compact mid-run, so the journal size is the bytes written
+                    repository = create_repository(
+                        "journal", file_path=path.with_suffix(".json"), compact_bytes=1 << 40,
+                        compact_ratio=1 << 20
+                    )
+                
+                tasks = make_tasks(task_count)
+                await repository.save_many(tasks)
+                journal = path.with_suffix(".json.journal")
+                before = journal.stat().st_size if journal.exists() else 0
+                
+                per_task = await transition_all(repository, tasks, mode)
+                
+                written = ""
+                if backend == "journal":
+                    written = f"{(journal.stat().st_size - before) / task_count:>12.0f}"
+                print(f"{backend:<10}{mode:<8}{per_task:>10.3f}{written}")
+                await repository.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=5000)
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.tasks))
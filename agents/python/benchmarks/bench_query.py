@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: repository.query() pushdown vs. list-then-filter.
+
+Populates each backend with N tasks and times a selective, limited query
+(the shape TaskService.query_tasks issues for agent work lists). The
+"list+filter" column is the previous service behavior: load every task,
+filter and sort in Python, then slice.
+
+Usage:
+    python benchmarks/bench_query.py [--sizes 1000 10000 100000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ap_task_manager.domain.entities import Task, TaskStatus, Priority, AgentType
+from ap_task_manager.infrastructure.query import TaskFilter, TaskOrder
+from ap_task_manager.infrastructure.repository import (
+    TaskRepository, InMemoryRepository, SQLiteRepository
+)
+
+
+QUERIES = {
+    "status=blocked limit=10": TaskFilter(status=TaskStatus.BLOCKED),
+    "assignee=qa,status=pending limit=10": TaskFilter(
+        assignee=AgentType.QA, status=TaskStatus.PENDING
+    ),
+}
+
+
+def make_tasks(count: int):
+    rng = random.Random(42)
+    base = datetime(2026, 1, 1)
+    statuses = list(TaskStatus)
+    return [
+        Task(
+            title=f"Benchmark task {i}",
+            status=rng.choice(statuses),
+            priority=rng.choice(list(Priority)),
+            assignee=rng.choice(list(AgentType)),
+            created_at=base + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+async def time_query(run, repeat: int) -> float:
+    """Median latency of ``run()`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def bench_size(count: int, repeat: int, tmp: Path) -> None:
+    tasks = make_tasks(count)
+
+    memory = InMemoryRepository()
+    sqlite = SQLiteRepository(tmp / f"query_{count}.db")
+    for repo in (memory, sqlite):
+        await repo.save_many(tasks)
+
+    for label, filter_spec in QUERIES.items():
+        row = [f"{count:>8}  ", f"{label:<38}"]
+        for repo in (memory, sqlite):
+            pushed = await time_query(
+                lambda: repo.query(filter_spec, TaskOrder.PRIORITY, limit=10), repeat
+            )
+            # The base-class implementation is exactly the old list+filter path
+            legacy = await time_query(
+                lambda: TaskRepository.query(repo, filter_spec, TaskOrder.PRIORITY, limit=10),
+                max(1, repeat // 10)
+            )
+            row.append(f"{legacy:>12.2f}{pushed:>10.2f}")
+        print("".join(row))
+
+    await sqlite.close()
+
+
+async def main(sizes, repeat: int) -> None:
+    print("Median latency in ms (scan = list+filter, query = repository.query)")
+    print(f"{'tasks':>8}  {'query':<38}{'memory scan':>12}{'query':>10}"
+          f"{'sqlite scan':>12}{'query':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in sizes:
+            await bench_size(count, repeat, Path(tmp))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.sizes, args.repeat))
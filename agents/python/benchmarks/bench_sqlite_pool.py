@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pooled SQLite connections vs. a new connection per call.
+
+Runs the same save/get/list workload against SQLiteRepository twice - once
+with the connection pool, once with a pool stand-in that opens a fresh
+aiosqlite connection for every operation (the previous behavior) - and
+reports operations per second for each phase.
+
+Usage:
+    python benchmarks/bench_sqlite_pool.py [--tasks 500] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import aiosqlite
+
+from ap_task_manager.domain.entities import Task, Priority
+from ap_task_manager.infrastructure.repository import SQLiteRepository
+
+
+class PerCallConnectionPool:
+    """Pool stand-in reproducing the old connect-per-call behavior."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+
+    @asynccontextmanager
+    async def _connect(self):
+        async with aiosqlite.connect(str(self.db_path)) as db:
+            yield db
+
+    def writer(self):
+        return self._connect()
+
+    def reader(self):
+        return self._connect()
+
+    async def close(self) -> None:
+        pass
+
+
+async def run_workload(repo: SQLiteRepository, tasks, concurrency: int) -> dict:
+    """Run the workload and return ops/sec per phase."""
+    results = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    start = time.perf_counter()
+    for task in tasks:
+        await repo.save(task)
+    results["save (sequential)"] = len(tasks) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for task in tasks:
+        await repo.get(task.id)
+    results["get (sequential)"] = len(tasks) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(repo.get(task.id)) for task in tasks))
+    results[f"get (concurrency={concurrency})"] = len(tasks) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(bounded(repo.save(task)) for task in tasks[: len(tasks) // 2]),
+        *(bounded(repo.get(task.id)) for task in tasks[len(tasks) // 2:])
+    )
+    results[f"mixed (concurrency={concurrency})"] = len(tasks) / (time.perf_counter() - start)
+
+    rounds = 20
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await repo.list()
+    results["list"] = rounds / (time.perf_counter() - start)
+
+    return results
+
+
+async def main(task_count: int, concurrency: int) -> None:
+    tasks = [
+        Task(title=f"Benchmark task {i}", priority=list(Priority)[i % 4])
+        for i in range(task_count)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        per_call_path = Path(tmp) / "per_call.db"
+        per_call = SQLiteRepository(per_call_path)
+        per_call._pool = PerCallConnectionPool(per_call_path)
+        baseline = await run_workload(per_call, tasks, concurrency)
+        await per_call.close()
+
+        async with SQLiteRepository(Path(tmp) / "pooled.db") as pooled:
+            optimized = await run_workload(pooled, tasks, concurrency)
+
+    print(f"SQLiteRepository: {task_count} tasks")
+    print(f"{'phase':<28}{'per-call ops/s':>16}{'pooled ops/s':>16}{'speedup':>10}")
+    for phase, base_rate in baseline.items():
+        rate = optimized[phase]
+        print(f"{phase:<28}{base_rate:>16.1f}{rate:>16.1f}{rate / base_rate:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.tasks, args.concurrency))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: resident memory per task, slotted entities vs. plain dataclasses.
+
+Builds many tasks and measures the heap they hold with tracemalloc, once
+with Task/TaskEvent/TaskMetrics as they are and once with a copy of their
+earlier plain-dataclass layout (per-instance __dict__, eagerly allocated
+labels, metadata, depends_on, metrics and events). Tasks share one title
+so the figures show the cost of the representation itself.
+
+Usage:
+    python benchmarks/bench_task_memory.py [--tasks 100000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+# Add the package to path for benchmarks
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ap_task_manager.domain.entities import Task, TaskEvent, TaskStatus, Priority, AgentType
+
+
+@dataclass
+class LegacyTaskMetrics:
+    time_to_start: Optional[float] = None
+    time_in_progress: Optional[float] = None
+    total_duration: Optional[float] = None
+    state_changes: int = 0
+    blocks_encountered: int = 0
+    retry_count: int = 0
+    cpu_time: Optional[float] = None
+    memory_usage: Optional[float] = None
+    api_calls: int = 0
+
+
+@dataclass
+class LegacyTaskEvent:
+    id: UUID = field(default_factory=uuid4)
+    task_id: UUID = field(default_factory=uuid4)
+    event_type: str = ""
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    actor: str = ""
+    details: Dict[str, Any] = field(default_factory=dict)
+    correlation_id: Optional[UUID] = None
+
+
+@dataclass
+class LegacyTask:
+    id: UUID = field(default_factory=uuid4)
+    title: str = ""
+    description: str = ""
+    status: TaskStatus = TaskStatus.PENDING
+    priority: Priority = Priority.MEDIUM
+    story_id: Optional[UUID] = None
+    epic_id: Optional[UUID] = None
+    assignee: Optional[AgentType] = None
+    labels: List[str] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[UUID] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    metrics: LegacyTaskMetrics = field(default_factory=LegacyTaskMetrics)
+    events: List[LegacyTaskEvent] = field(default_factory=list)
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    version: int = 0
+    _saved_event_count: int = field(default=0, init=False, repr=False, compare=False)
+
+
+TITLE = "Benchmark task"
+
+# name -> builder(task class, event class); each returns one resident task
+SCENARIOS = {
+    # As loaded from storage: events stay in the store
+    "bare": lambda task_cls, event_cls: task_cls(title=TITLE, assignee=AgentType.DEVELOPER),
+    "labelled": lambda task_cls, event_cls: task_cls(
+        title=TITLE, assignee=AgentType.DEVELOPER, labels=["backend"], metadata={"points": 3}
+    ),
+    # As built by TaskService.create_task: with its creation event
+    "created": lambda task_cls, event_cls: _with_event(
+        task_cls(title=TITLE, assignee=AgentType.DEVELOPER), event_cls
+    ),
+}
+
+
+def _with_event(task, event_cls):
+    task.events.append(event_cls(task_id=task.id, event_type="created", actor="system"))
+    return task
+
+
+def bytes_per_task(build, count: int) -> float:
+    """Heap retained per task by ``count`` tasks from ``build``."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [build() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tasks
+    return (after - before) / count
+
+
+def main(task_count: int) -> None:
+    print(f"{task_count} tasks")
+    print(f"{'scenario':<12}{'dataclass B/task':>18}{'slotted B/task':>16}{'saved':>8}")
+    for name, make in SCENARIOS.items():
+        legacy = bytes_per_task(lambda: make(LegacyTask, LegacyTaskEvent), task_count)
+        slotted = bytes_per_task(lambda: make(Task, TaskEvent), task_count)
+        print(f"{name:<12}{legacy:>18.0f}{slotted:>16.0f}{1 - slotted / legacy:>8.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    args = parser.parse_args()
+    
+    main(args.tasks)
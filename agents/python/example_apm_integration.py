@@ -18,7 +18,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from ap_task_manager import TaskService, Priority, AgentType, TaskStatus
 from ap_task_manager.infrastructure.apm import create_apm_provider
 from ap_task_manager.infrastructure.repository import create_repository
-from ap_task_manager.infrastructure.events import EventType
+from ap_task_manager.infrastructure.events import EventType, inline_handler
 
 
 async def simulate_task_lifecycle():
@@ -32,10 +32,12 @@ async def simulate_task_lifecycle():
     repository = create_repository("memory")  # In-memory for demo
     service = TaskService(repository=repository, apm_provider=apm)
     
-    # Subscribe to events for demo
+    # Subscribe to events for demo; quick, non-blocking handlers run inline
+    @inline_handler
     def on_task_created(task, *args):
         print(f"📢 Event: Task created - {task.title}")
     
+    @inline_handler
     def on_task_completed(task, *args):
         duration = task.metrics.total_duration
         if duration:
@@ -157,44 +159,39 @@ async def demonstrate_batch_operations():
     
     print("\n Creating 20 tasks in batch...")
     
-    # Create many tasks
-    tasks = []
-    for i in range(20):
-        task = await service.create_task(
-            title=f"Batch task {i+1}",
-            priority=Priority.MEDIUM,
-            assignee=AgentType.DEVELOPER
-        )
-        tasks.append(task)
+    # One repository write, one BATCH_CREATED event and one metric per tag set
+    tasks = await service.create_tasks(
+        {
+            "title": f"Batch task {i+1}",
+            "priority": Priority.MEDIUM,
+            "assignee": AgentType.DEVELOPER
+        }
+        for i in range(20)
+    )
     
     print(f"\n✅ Created {len(tasks)} tasks")
     
     print("\n📦 Updating all tasks to IN_PROGRESS in batch...")
     
-    # Batch update simulation
+    # One repository write, one event and one metric per source status
     start_time = datetime.utcnow()
     
-    # In a real implementation, this would be a single batch operation
-    update_tasks = []
-    for task in tasks:
-        updated = await service.transition_status(
-            task.id,
-            TaskStatus.IN_PROGRESS,
-            actor="batch-processor"
-        )
-        update_tasks.append(updated)
+    result = await service.transition_many(
+        [task.id for task in tasks],
+        TaskStatus.IN_PROGRESS,
+        actor="batch-processor"
+    )
     
     duration = (datetime.utcnow() - start_time).total_seconds()
     
-    print(f"\n⚡ Batch update completed in {duration:.2f} seconds")
-    print(f"   Rate: {len(tasks)/duration:.1f} tasks/second")
+    print(f"\n⚡ Batch update completed in {duration:.3f} seconds")
+    print(f"   Transitioned: {len(result.transitioned)}, failed: {len(result.failed)}")
+    print(f"   Rate: {len(tasks)/max(duration, 1e-6):.1f} tasks/second")
     
-    # Show how this would be even faster with true batch operations
-    print("\n💡 With true batch operations in Python:")
-    print("   - Single database transaction")
-    print("   - One APM span for entire batch")
-    print("   - 10-20x performance improvement")
-    print("   - Atomic operations (all or nothing)")
+    print("\n💡 transition_many gives you:")
+    print("   - Single repository write (one transaction on SQLite)")
+    print("   - One APM span and one BATCH_UPDATED event for the batch")
+    print("   - Per-task success/failure reporting")
 
 
 async def demonstrate_plugin_system():
@@ -208,11 +205,11 @@ async def demonstrate_plugin_system():
         def __init__(self):
             self.task_count = 0
             self.total_duration = 0
-            
+        
         async def on_task_created(self, task):
             self.task_count += 1
             print(f"   📊 Plugin: Task count is now {self.task_count}")
-            
+        
         async def on_task_completed(self, task):
             if task.metrics.total_duration:
                 self.total_duration += task.metrics.total_duration
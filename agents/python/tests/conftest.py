@@ -0,0 +1,37 @@
+"""Shared fixtures: repositories for every storage backend."""
+
+from pathlib import Path
+
+import pytest
+
+from ap_task_manager.core.service import TaskService
+from ap_task_manager.infrastructure.repository import TaskRepository, create_repository
+
+
+BACKENDS = ("memory", "json", "journal", "sqlite")
+
+
+def open_repository(backend: str, directory: Path, **kwargs) -> TaskRepository:
+    """A repository of ``backend`` storing its files in ``directory``."""
+    if backend == "sqlite":
+        return create_repository("sqlite", db_path=directory / "tasks.db", **kwargs)
+    if backend in ("json", "journal"):
+        return create_repository(backend, file_path=directory / "tasks.json", **kwargs)
+    return create_repository(backend, **kwargs)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request) -> str:
+    return request.param
+
+
+@pytest.fixture
+async def repository(backend, tmp_path):
+    repository = open_repository(backend, tmp_path)
+    yield repository
+    await repository.close()
+
+
+@pytest.fixture
+def service(repository) -> TaskService:
+    return TaskService(repository)
@@ -0,0 +1,93 @@
+"""Agent work queues: TaskService.claim_next and the repositories' atomic claims."""
+
+import asyncio
+
+from ap_task_manager.core.service import TaskService
+from ap_task_manager.domain.entities import AgentType, Priority, TaskStatus
+from ap_task_manager.infrastructure.repository import SQLiteRepository
+
+
+DEV = AgentType.DEVELOPER
+
+
+async def drain_queue(service: TaskService, workers: int) -> list:
+    """Claim with ``workers`` concurrent workers until the queue is empty."""
+    claimed = []
+    
+    async def worker(name: str) -> None:
+        while True:
+            task = await service.claim_next(DEV, actor=name)
+            if task is None:
+                return
+            claimed.append(task.id)
+            await asyncio.sleep(0)
+    
+    await asyncio.gather(*(worker(f"worker-{i}") for i in range(workers)))
+    return claimed
+
+
+async def test_concurrent_workers_never_claim_the_same_task(service, repository):
+    tasks = [await service.create_task(f"task {i}", assignee=DEV) for i in range(40)]
+    
+    claimed = await drain_queue(service, workers=8)
+    
+    assert sorted(claimed) == sorted(task.id for task in tasks)
+    stored = await repository.list()
+    assert all(task.status == TaskStatus.IN_PROGRESS for task in stored)
+
+
+async def test_claims_follow_priority_then_age(service):
+    low = await service.create_task("low", priority=Priority.LOW, assignee=DEV)
+    first = await service.create_task("first", priority=Priority.HIGH, assignee=DEV)
+    second = await service.create_task("second", priority=Priority.HIGH, assignee=DEV)
+    await service.create_task("someone else's", priority=Priority.CRITICAL, assignee=AgentType.QA)
+    
+    order = [(await service.claim_next(DEV)).id for _ in range(3)]
+    
+    assert order == [first.id, second.id, low.id]
+    assert await service.claim_next(DEV) is None
+
+
+async def test_claims_filter_by_label(service):
+    await service.create_task("frontend", assignee=DEV, labels=["frontend"])
+    backend = await service.create_task("backend", assignee=DEV, labels=["backend"])
+    
+    assert (await service.claim_next(DEV, labels=["backend"])).id == backend.id
+    assert await service.claim_next(DEV, labels=["backend"]) is None
+
+
+async def test_sqlite_claims_without_returning(tmp_path, monkeypatch):
+    monkeypatch.setattr(SQLiteRepository, "SUPPORTS_RETURNING", False)
+    repository = SQLiteRepository(tmp_path / "tasks.db")
+    service = TaskService(repository)
+    tasks = [await service.create_task(f"task {i}", assignee=DEV) for i in range(20)]
+    
+    claimed = await drain_queue(service, workers=8)
+    await repository.close()
+    
+    assert sorted(claimed) == sorted(task.id for task in tasks)
+
+
+async def test_claims_wait_for_prerequisites(service):
+    design = await service.create_task("design", assignee=DEV)
+    build = await service.create_task(
+        "build", assignee=DEV, priority=Priority.CRITICAL, depends_on=[design.id]
+    )
+    
+    assert (await service.claim_next(DEV)).id == design.id
+    assert await service.claim_next(DEV) is None  # design is still in progress
+    
+    await service.transition_status(design.id, TaskStatus.COMPLETED)
+    assert (await service.claim_next(DEV)).id == build.id
+
+
+async def test_blocked_tasks_do_not_hide_ready_ones(service):
+    missing = await service.create_task("elsewhere", assignee=AgentType.QA)
+    for i in range(5):
+        await service.create_task(
+            f"blocked {i}", assignee=DEV, priority=Priority.CRITICAL, depends_on=[missing.id]
+        )
+    ready = await service.create_task("ready", assignee=DEV, priority=Priority.LOW)
+    
+    assert (await service.claim_next(DEV)).id == ready.id
+    assert await service.claim_next(DEV) is None
@@ -0,0 +1,75 @@
+"""Optimistic versioning: compare-and-swap saves and service-level retries."""
+
+import asyncio
+
+import pytest
+
+from ap_task_manager.core.service import TaskService
+from ap_task_manager.domain.entities import Task, TaskStatus
+from ap_task_manager.infrastructure.repository import VersionConflictError
+
+
+async def test_stale_save_conflicts(repository):
+    task = Task(title="shared")
+    await repository.save(task)
+    
+    # Detached copies: the memory backend hands out its stored objects
+    first = Task.from_dict((await repository.get(task.id)).to_dict())
+    second = Task.from_dict((await repository.get(task.id)).to_dict())
+    first.title = "first"
+    await repository.save(first, expected_version=first.version)
+    
+    second.title = "second"
+    with pytest.raises(VersionConflictError):
+        await repository.save(second, expected_version=second.version)
+    assert (await repository.get(task.id)).title == "first"
+
+
+async def test_save_expecting_new_task_conflicts_with_existing(repository):
+    task = Task(title="exists")
+    await repository.save(task)
+    
+    with pytest.raises(VersionConflictError):
+        await repository.save(Task(id=task.id, title="again"), expected_version=0)
+
+
+async def test_concurrent_updates_all_apply(service, repository):
+    task = await service.create_task(title="contended")
+    created_version = task.version
+    
+    await asyncio.gather(*(
+        service.update_task(task.id, {"metadata": {f"writer-{i}": i}})
+        for i in range(10)
+    ))
+    
+    stored = await repository.get(task.id)
+    assert stored.metadata == {f"writer-{i}": i for i in range(10)}
+    assert stored.version == created_version + 10
+
+
+async def test_concurrent_transitions_apply_once(service, repository):
+    task = await service.create_task(title="started once")
+    
+    results = await asyncio.gather(*(
+        service.transition_status(task.id, TaskStatus.IN_PROGRESS, f"agent-{i}")
+        for i in range(5)
+    ))
+    
+    # Every retry re-validates: after the first wins the rest are invalid
+    assert sum(result is not None for result in results) == 1
+    assert (await repository.get(task.id)).status == TaskStatus.IN_PROGRESS
+
+
+async def test_update_raises_once_retries_run_out(repository, monkeypatch):
+    service = TaskService(repository, max_retries=2, retry_backoff=0)
+    task = await service.create_task(title="always contended")
+    attempts = []
+    
+    async def conflicting_patch(task, fields=None, expected_version=None):
+        attempts.append(expected_version)
+        raise VersionConflictError(task.id, expected_version, expected_version + 1)
+    
+    monkeypatch.setattr(repository, "patch", conflicting_patch)
+    with pytest.raises(VersionConflictError):
+        await service.update_task(task.id, {"metadata": {"key": "value"}})
+    assert len(attempts) == 3
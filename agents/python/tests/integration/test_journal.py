@@ -0,0 +1,147 @@
+"""JournaledJSONRepository: replay, compaction, tailing and crash recovery."""
+
+import json
+
+import pytest
+
+from ap_task_manager.domain.entities import Task, TaskStatus
+from ap_task_manager.infrastructure.repository import JournaledJSONRepository
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "tasks.json"
+
+
+async def test_reopen_replays_saves_patches_and_deletes(path):
+    repository = JournaledJSONRepository(path)
+    kept, dropped = Task(title="kept"), Task(title="dropped")
+    await repository.save_many([kept, dropped])
+    kept.title = "renamed"
+    kept.mark_dirty("title")
+    await repository.patch(kept, expected_version=kept.version)
+    await repository.delete(dropped.id)
+    await repository.close()
+    
+    reopened = JournaledJSONRepository(path)
+    tasks = await reopened.list()
+    await reopened.close()
+    
+    assert [(task.id, task.title, task.version) for task in tasks] == [(kept.id, "renamed", 2)]
+
+
+async def test_patch_after_save_does_not_repeat_events(path):
+    repository = JournaledJSONRepository(path)
+    single, batched = Task(title="single"), Task(title="batched")
+    for task in (single, batched):
+        task.transition_to(TaskStatus.IN_PROGRESS, "worker")
+    await repository.save(single)
+    await repository.save_many([batched])
+    for task in (single, batched):
+        task.transition_to(TaskStatus.COMPLETED, "worker")
+        await repository.patch(task)
+    await repository.close()
+    
+    reopened = JournaledJSONRepository(path)
+    await reopened.compact()
+    await reopened.close()
+    
+    snapshot = {data["id"]: data for data in json.loads(path.read_text())}
+    for task in (single, batched):
+        types = [event["type"] for event in snapshot[str(task.id)]["events"]]
+        assert types == [event.event_type for event in task.events]
+        assert len(types) == 2
+
+
+async def test_compaction_folds_journal_into_snapshot(path):
+    repository = JournaledJSONRepository(path, compact_bytes=1 << 30)
+    tasks = [Task(title=f"task {i}") for i in range(20)]
+    await repository.save_many(tasks)
+    for task in tasks[:5]:
+        task.transition_to(TaskStatus.IN_PROGRESS, "worker")
+        await repository.patch(task, expected_version=task.version)
+    
+    await repository.compact()
+    await repository.close()
+    
+    assert not repository.journal_path.exists() or repository.journal_path.stat().st_size == 0
+    snapshot = {data["id"]: data for data in json.loads(path.read_text())}
+    assert len(snapshot) == 20
+    assert snapshot[str(tasks[0].id)]["status"] == TaskStatus.IN_PROGRESS.value
+    
+    reopened = JournaledJSONRepository(path)
+    assert (await reopened.get(tasks[0].id)).status == TaskStatus.IN_PROGRESS
+    assert len(await reopened.list()) == 20
+    await reopened.close()
+
+
+async def test_background_compaction_keeps_every_write(path):
+    repository = JournaledJSONRepository(path, compact_bytes=4096)
+    tasks = [Task(title=f"task {i}") for i in range(200)]
+    for task in tasks:
+        await repository.save(task)
+    await repository.close()
+    
+    reopened = JournaledJSONRepository(path)
+    assert {task.id for task in await reopened.list()} == {task.id for task in tasks}
+    await reopened.close()
+
+
+async def test_other_instance_sees_appends(path):
+    writer = JournaledJSONRepository(path)
+    reader = JournaledJSONRepository(path)
+    first = Task(title="first")
+    await writer.save(first)
+    assert (await reader.get(first.id)).title == "first"
+    
+    # Tailing picks up later appends too, including after a compaction
+    second = Task(title="second")
+    await writer.save(second)
+    await writer.compact()
+    third = Task(title="third")
+    await writer.save(third)
+    
+    assert {task.title for task in await reader.list()} == {"first", "second", "third"}
+    await writer.close()
+    await reader.close()
+
+
+async def test_torn_journal_tail_is_skipped_and_repaired(path):
+    repository = JournaledJSONRepository(path)
+    task = Task(title="intact")
+    await repository.save(task)
+    await repository.close()
+    
+    # A crash mid-append leaves half a line behind
+    with open(repository.journal_path, "ab") as journal:
+        journal.write(b'{"op": "save", "task": {"id": "trunc')
+    
+    recovered = JournaledJSONRepository(path)
+    assert [t.title for t in await recovered.list()] == ["intact"]
+    later = Task(title="after crash")
+    await recovered.save(later)
+    await recovered.close()
+    
+    reopened = JournaledJSONRepository(path)
+    assert {t.title for t in await reopened.list()} == {"intact", "after crash"}
+    await reopened.close()
+
+
+async def test_unsaved_changes_to_read_tasks_are_not_persisted(path):
+    repository = JournaledJSONRepository(path)
+    task = Task(title="original", labels=["a"], metadata={"k": 1})
+    other = Task(title="other")
+    await repository.save_many([task, other])
+    
+    read = await repository.get(task.id)
+    read.title = "leaked"
+    read.labels.append("leaked")
+    read.metadata["leaked"] = True
+    await repository.save(other)
+    await repository.compact()
+    await repository.close()
+    
+    reopened = JournaledJSONRepository(path)
+    stored = await reopened.get(task.id)
+    await reopened.close()
+    assert (stored.title, stored.labels, stored.metadata) == ("original", ["a"], {"k": 1})
@@ -0,0 +1,99 @@
+"""JSONFileRepository's parsed-file cache."""
+
+import pytest
+
+from ap_task_manager.core.service import TaskService
+from ap_task_manager.domain.entities import Task, TaskStatus
+from ap_task_manager.infrastructure.codecs import HAS_ORJSON
+from ap_task_manager.infrastructure.query import TaskFilter
+from ap_task_manager.infrastructure.repository import JSONFileRepository
+
+
+@pytest.fixture
+async def repository(tmp_path):
+    repository = JSONFileRepository(tmp_path / "tasks.json")
+    yield repository
+    await repository.close()
+
+
+async def test_reads_return_fresh_tasks(repository):
+    task = Task(title="original", labels=["a"], metadata={"k": 1})
+    await repository.save(task)
+    
+    read = await repository.get(task.id)
+    read.title = "changed"
+    read.labels.append("b")
+    read.metadata["k"] = 2
+    
+    again = await repository.get(task.id)
+    assert (again.title, again.labels, again.metadata) == ("original", ["a"], {"k": 1})
+    assert again is not read
+
+
+async def test_changes_after_save_stay_local(repository):
+    task = Task(title="saved")
+    await repository.save(task)
+    task.title = "not saved"
+    
+    await repository.save(Task(title="unrelated"))
+    
+    assert (await repository.get(task.id)).title == "saved"
+
+
+async def test_failed_update_leaves_no_trace(repository):
+    service = TaskService(repository)
+    task = await service.create_task(title="original")
+    
+    with pytest.raises(ValueError):
+        await service.update_task(task.id, {"title": "CHANGED", "priority": "bogus"})
+    await service.create_task(title="unrelated")
+    
+    assert "CHANGED" not in repository.file_path.read_text()
+    assert (await repository.get(task.id)).title == "original"
+
+
+async def test_writes_by_another_instance_are_picked_up(tmp_path):
+    path = tmp_path / "tasks.json"
+    writer, reader = JSONFileRepository(path), JSONFileRepository(path)
+    task = Task(title="first")
+    await writer.save(task)
+    assert (await reader.get(task.id)).title == "first"
+    
+    task.title = "second"
+    await writer.save(task)
+    
+    assert (await reader.get(task.id)).title == "second"
+    await writer.close()
+    await reader.close()
+
+
+@pytest.fixture
+async def orjson_repository(tmp_path):
+    if not HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    repository = JSONFileRepository(tmp_path / "tasks.json", codec="orjson")
+    yield repository
+    await repository.close()
+
+
+async def test_orjson_round_trip(orjson_repository):
+    task = Task(title="fast", labels=["a"])
+    await orjson_repository.save(task)
+    
+    read = await orjson_repository.get(task.id)
+    assert (read.id, read.title, read.status, read.labels) == (task.id, "fast", task.status, ["a"])
+    assert read.created_at == task.created_at
+    
+    reopened = JSONFileRepository(orjson_repository.file_path, codec="orjson")
+    assert (await reopened.get(task.id)).title == "fast"
+    await reopened.close()
+
+
+async def test_orjson_query_by_status(orjson_repository):
+    todo, done = Task(title="todo"), Task(title="done")
+    done.transition_to(TaskStatus.IN_PROGRESS, "agent")
+    done.transition_to(TaskStatus.COMPLETED, "agent")
+    await orjson_repository.save_many([todo, done])
+    
+    found = await orjson_repository.query(TaskFilter(status=TaskStatus.COMPLETED))
+    assert [task.id for task in found] == [done.id]
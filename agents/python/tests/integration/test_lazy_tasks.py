@@ -0,0 +1,69 @@
+"""Lazily hydrated SQLite tasks and projected queries."""
+
+import pickle
+
+import pytest
+
+from ap_task_manager.domain.entities import AgentType, Task, TaskStatus
+from ap_task_manager.infrastructure.lazy_task import LazyTask
+from ap_task_manager.infrastructure.query import TaskFilter
+from ap_task_manager.infrastructure.repository import SQLiteRepository
+
+
+@pytest.fixture
+async def repository(tmp_path):
+    repository = SQLiteRepository(tmp_path / "tasks.db")
+    yield repository
+    await repository.close()
+
+
+@pytest.fixture
+async def stored(repository):
+    task = Task(
+        title="stored", description="full", assignee=AgentType.QA,
+        labels=["a", "b"], metadata={"k": [1, 2]}
+    )
+    task.transition_to(TaskStatus.IN_PROGRESS, "worker")
+    await repository.save(task)
+    return task
+
+
+async def test_lazy_task_matches_the_saved_task(repository, stored):
+    loaded = await repository.get(stored.id)
+    
+    assert isinstance(loaded, LazyTask)
+    assert loaded == stored
+    assert [event.event_type for event in loaded.events] == ["status_changed"]
+
+
+async def test_projected_query_loads_only_requested_fields(repository, stored):
+    (task,) = await repository.query(
+        TaskFilter(status=TaskStatus.IN_PROGRESS), fields=["title", "status"]
+    )
+    
+    assert (task.id, task.title, task.status) == (stored.id, "stored", TaskStatus.IN_PROGRESS)
+    with pytest.raises(AttributeError, match="not loaded"):
+        task.description
+
+
+async def test_unknown_projection_field_is_rejected(repository, stored):
+    with pytest.raises(ValueError):
+        await repository.query(fields=["title", "nonsense"])
+
+
+async def test_lazy_task_pickles_as_plain_task(repository, stored):
+    loaded = await repository.get(stored.id)
+    
+    copy = pickle.loads(pickle.dumps(loaded))
+    
+    assert type(copy) is Task
+    assert copy == stored
+
+
+async def test_changes_to_lazy_task_save_normally(repository, stored):
+    loaded = await repository.get(stored.id)
+    loaded.labels.append("c")
+    loaded.mark_dirty("labels")
+    await repository.patch(loaded, expected_version=loaded.version)
+    
+    assert (await repository.get(stored.id)).labels == ["a", "b", "c"]
@@ -0,0 +1,90 @@
+"""Claim leases, heartbeats and the expired-lease reaper."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from ap_task_manager.core.service import TaskService
+from ap_task_manager.domain.entities import AgentType, TaskStatus
+
+
+DEV = AgentType.DEVELOPER
+
+
+@pytest.fixture
+def service(repository) -> TaskService:
+    return TaskService(repository, lease_seconds=60, max_lease_retries=1)
+
+
+def after_lease(seconds: float = 61) -> datetime:
+    return datetime.utcnow() + timedelta(seconds=seconds)
+
+
+async def test_claim_leases_task_to_worker(service):
+    await service.create_task("leased", assignee=DEV)
+    
+    task = await service.claim_next(DEV, actor="dev-1")
+    
+    assert task.lease_owner == "dev-1"
+    assert not task.lease_expired()
+    assert task.lease_expired(after_lease())
+
+
+async def test_reaper_requeues_expired_task(service, repository):
+    await service.create_task("abandoned", assignee=DEV)
+    claimed = await service.claim_next(DEV, actor="dev-1")
+    
+    assert await service.reap_expired_leases() == []
+    reaped = await service.reap_expired_leases(now=after_lease())
+    
+    assert [task.id for task in reaped] == [claimed.id]
+    stored = await repository.get(claimed.id)
+    assert stored.status == TaskStatus.PENDING
+    assert stored.lease_owner is None and stored.lease_expires_at is None
+    assert stored.metrics.retry_count == 1
+    
+    # Back in the queue for the next worker
+    again = await service.claim_next(DEV, actor="dev-2")
+    assert (again.id, again.lease_owner) == (claimed.id, "dev-2")
+
+
+async def test_reaper_fails_task_after_max_retries(service, repository):
+    task = await service.create_task("keeps dying", assignee=DEV)
+    
+    for _ in range(2):
+        await service.claim_next(DEV, actor="dev-1")
+        await service.reap_expired_leases(now=after_lease())
+    
+    stored = await repository.get(task.id)
+    assert stored.status == TaskStatus.FAILED
+    assert stored.metrics.retry_count == 2
+
+
+async def test_heartbeat_keeps_the_lease(service, repository):
+    await service.create_task("alive", assignee=DEV)
+    claimed = await service.claim_next(DEV, actor="dev-1")
+    expires_at = claimed.lease_expires_at
+    
+    renewed = await service.heartbeat(claimed.id, owner="dev-1")
+    
+    assert renewed.lease_expires_at > expires_at
+    assert await service.reap_expired_leases(now=expires_at) == []
+    assert (await repository.get(claimed.id)).status == TaskStatus.IN_PROGRESS
+
+
+async def test_heartbeat_from_another_owner_is_refused(service):
+    await service.create_task("taken", assignee=DEV)
+    claimed = await service.claim_next(DEV, actor="dev-1")
+    
+    assert await service.heartbeat(claimed.id, owner="dev-2") is None
+
+
+async def test_reaper_sweeps_in_batches(service, repository):
+    for i in range(7):
+        await service.create_task(f"task {i}", assignee=DEV)
+        await service.claim_next(DEV, actor="dev-1")
+    
+    reaped = await service.reap_expired_leases(now=after_lease(), batch_size=3)
+    
+    assert len(reaped) == 7
+    assert all(task.status == TaskStatus.PENDING for task in await repository.list())
@@ -0,0 +1,85 @@
+"""Dirty-field tracking and partial writes with TaskRepository.patch."""
+
+import pytest
+
+from ap_task_manager.domain.entities import Task, TaskStatus
+from ap_task_manager.infrastructure.repository import VersionConflictError
+
+
+def detached(task: Task) -> Task:
+    """A copy sharing nothing with ``task`` (the memory backend hands out stored objects)."""
+    return Task.from_dict(task.to_dict())
+
+
+async def test_patch_writes_changes_and_new_events(repository):
+    task = Task(title="draft")
+    await repository.save(task)
+    
+    task.title = "final"
+    task.mark_dirty("title")
+    task.transition_to(TaskStatus.IN_PROGRESS, "worker")
+    assert {"title", "status"} <= task.dirty_fields
+    await repository.patch(task, expected_version=task.version)
+    
+    assert not task.dirty_fields
+    stored = await repository.get(task.id)
+    assert (stored.title, stored.status, stored.version) == ("final", TaskStatus.IN_PROGRESS, 2)
+
+
+async def test_patch_of_unsaved_task_saves_it_whole(repository):
+    task = Task(title="new", labels=["x"])
+    await repository.patch(task)
+    
+    stored = await repository.get(task.id)
+    assert (stored.title, stored.labels, stored.version) == ("new", ["x"], 1)
+
+
+async def test_patch_with_stale_version_conflicts(repository):
+    task = Task(title="original")
+    await repository.save(task)
+    stale = detached(task)
+    
+    task.title = "newer"
+    task.mark_dirty("title")
+    await repository.patch(task, expected_version=task.version)
+    
+    stale.description = "stale"
+    stale.mark_dirty("description")
+    with pytest.raises(VersionConflictError):
+        await repository.patch(stale, expected_version=stale.version)
+
+
+@pytest.mark.parametrize("backend", ["journal", "sqlite"])
+async def test_unconditional_patches_of_different_fields_both_survive(repository):
+    task = Task(title="original", description="original")
+    await repository.save(task)
+    first, second = detached(task), detached(task)
+    
+    first.title = "from first"
+    first.mark_dirty("title")
+    await repository.patch(first)
+    second.description = "from second"
+    second.mark_dirty("description")
+    await repository.patch(second)
+    
+    stored = await repository.get(task.id)
+    assert (stored.title, stored.description) == ("from first", "from second")
+
+
+async def test_patch_many_reports_conflicts_and_writes_the_rest(repository):
+    fresh, contended = Task(title="fresh"), Task(title="contended")
+    await repository.save_many([fresh, contended])
+    stale = detached(contended)
+    
+    contended.title = "moved on"
+    contended.mark_dirty("title")
+    await repository.patch(contended, expected_version=contended.version)
+    
+    fresh = detached(fresh)
+    for task in (fresh, stale):
+        task.transition_to(TaskStatus.IN_PROGRESS, "batch")
+    conflicts = await repository.patch_many([fresh, stale])
+    
+    assert conflicts == [stale.id]
+    assert (await repository.get(fresh.id)).status == TaskStatus.IN_PROGRESS
+    assert (await repository.get(contended.id)).status == TaskStatus.PENDING
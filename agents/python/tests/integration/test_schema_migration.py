@@ -0,0 +1,143 @@
+"""Upgrading SQLite databases written before the schema was versioned."""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from ap_task_manager.domain.entities import AgentType, Priority, TaskStatus
+from ap_task_manager.infrastructure.query import TaskFilter
+from ap_task_manager.infrastructure.repository import SQLiteRepository
+from ap_task_manager.infrastructure.sqlite_schema import SCHEMA_VERSION
+
+
+# The original layout: enum value strings, ISO timestamps, events inline
+BASELINE_SCHEMA = """
+    CREATE TABLE tasks (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        status TEXT NOT NULL,
+        priority TEXT NOT NULL,
+        story_id TEXT,
+        epic_id TEXT,
+        assignee TEXT,
+        labels TEXT,
+        metadata TEXT,
+        created_at TEXT,
+        updated_at TEXT,
+        started_at TEXT,
+        completed_at TEXT,
+        metrics TEXT,
+        events TEXT
+    );
+    CREATE INDEX idx_status ON tasks(status);
+    CREATE INDEX idx_assignee ON tasks(assignee);
+    CREATE INDEX idx_story_id ON tasks(story_id);
+"""
+
+CREATED = datetime(2024, 5, 1, 9, 30, 0, 123456)
+
+
+def baseline_row(title, status, priority, assignee=None, started=None, events=()):
+    task_id = str(uuid4())
+    return (
+        task_id, title, f"{title} description", status, priority, str(uuid4()), None,
+        assignee, json.dumps(["legacy"]), json.dumps({"source": "baseline"}),
+        CREATED.isoformat(), (started or CREATED).isoformat(),
+        started.isoformat() if started else None, None,
+        json.dumps({"state_changes": len(events)}),
+        json.dumps([
+            {
+                "event_id": str(uuid4()),
+                "task_id": task_id,
+                "type": event_type,
+                "timestamp": (CREATED + timedelta(minutes=i)).isoformat(),
+                "actor": "bash",
+                "details": {"step": i},
+                "correlation_id": None
+            }
+            for i, event_type in enumerate(events)
+        ])
+    )
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    path = tmp_path / "tasks.db"
+    rows = [
+        baseline_row("pending", "pending", "high", "developer", events=["created"]),
+        baseline_row(
+            "started", "in_progress", "critical", "qa",
+            started=CREATED + timedelta(hours=1), events=["created", "status_changed"]
+        ),
+        baseline_row("unassigned", "completed", "low"),
+    ]
+    with sqlite3.connect(path) as db:
+        db.executescript(BASELINE_SCHEMA)
+        db.executemany(f"INSERT INTO tasks VALUES ({', '.join('?' * 16)})", rows)
+    db.close()
+    return path, rows
+
+
+async def test_baseline_database_is_migrated(baseline_db):
+    path, rows = baseline_db
+    repository = SQLiteRepository(path)
+    tasks = {str(task.id): task for task in await repository.list()}
+    await repository.close()
+    
+    assert set(tasks) == {row[0] for row in rows}
+    started = tasks[rows[1][0]]
+    assert started.title == "started"
+    assert started.status == TaskStatus.IN_PROGRESS
+    assert started.priority == Priority.CRITICAL
+    assert started.assignee == AgentType.QA
+    assert started.labels == ["legacy"]
+    assert started.metadata == {"source": "baseline"}
+    assert started.created_at == CREATED
+    assert started.started_at == CREATED + timedelta(hours=1)
+    assert started.metrics.state_changes == 2
+    assert started.version == 0
+    assert [event.event_type for event in started.events] == ["created", "status_changed"]
+    assert started.events[1].details == {"step": 1}
+    assert tasks[rows[2][0]].assignee is None
+    
+    with sqlite3.connect(path) as db:
+        assert db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        columns = {row[1] for row in db.execute("PRAGMA table_info(tasks)")}
+    db.close()
+    assert "events" not in columns and {"version", "depends_on"} <= columns
+
+
+async def test_migrated_database_is_queryable_and_writable(baseline_db):
+    path, rows = baseline_db
+    repository = SQLiteRepository(path)
+    
+    pending = await repository.query(TaskFilter(status=TaskStatus.PENDING))
+    assert [task.title for task in pending] == ["pending"]
+    
+    task = pending[0]
+    task.transition_to(TaskStatus.IN_PROGRESS, "worker")
+    await repository.save(task, expected_version=0)
+    await repository.close()
+    
+    reopened = SQLiteRepository(path)
+    stored = await reopened.get(task.id)
+    await reopened.close()
+    assert stored.status == TaskStatus.IN_PROGRESS
+    assert stored.version == 1
+    assert [event.event_type for event in stored.events][-1] == "status_changed"
+
+
+async def test_newer_schema_is_refused(tmp_path):
+    path = tmp_path / "tasks.db"
+    with sqlite3.connect(path) as db:
+        db.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    db.close()
+    
+    repository = SQLiteRepository(path)
+    with pytest.raises(RuntimeError):
+        await repository.list()
+    await repository.close()
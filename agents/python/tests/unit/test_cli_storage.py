@@ -0,0 +1,50 @@
+"""The compat CLI's choice of task store."""
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from ap_task_manager.cli import compat
+from ap_task_manager.domain.entities import Task
+from ap_task_manager.infrastructure.repository import JSONFileRepository, JournaledJSONRepository
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("AP_STORAGE", raising=False)
+    monkeypatch.setattr(compat, "_service", None)
+    return tmp_path
+
+
+def run(*args: str, **env: str):
+    result = CliRunner().invoke(compat.cli, list(args), env=env or None)
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def test_default_store_is_plain_json(home):
+    run("stats")
+    repository = compat._service.repository
+    assert type(repository) is JSONFileRepository
+    assert repository.file_path == home / ".ap" / "tasks.json"
+
+
+def test_journal_is_opt_in(home, monkeypatch):
+    run("--storage", "journal", "stats")
+    assert isinstance(compat._service.repository, JournaledJSONRepository)
+    
+    monkeypatch.setattr(compat, "_service", None)
+    run("stats", AP_STORAGE="journal")
+    assert isinstance(compat._service.repository, JournaledJSONRepository)
+
+
+def test_existing_tasks_json_is_read_by_default(home):
+    path = home / ".ap" / "tasks.json"
+    path.parent.mkdir()
+    path.write_text(json.dumps([Task(title="from an earlier release").to_dict()]))
+    
+    result = run("query", "--format", "json")
+    assert "from an earlier release" in result.output
+    assert not path.with_name("tasks.json.journal").exists()
@@ -0,0 +1,253 @@
+"""EventBus dispatch: queues and backpressure, fan-out, handler modes and history."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ap_task_manager.infrastructure.events import (
+    BackpressurePolicy, EventBus, EventType, inline_handler
+)
+
+
+async def wait_until_handling(handled, count):
+    """Yield to the dispatcher until ``count`` events have reached the handler."""
+    for _ in range(100):
+        if len(handled) >= count:
+            return
+        await asyncio.sleep(0)
+    raise AssertionError(f"only {len(handled)} events reached the handler")
+
+
+@pytest.fixture
+async def gated():
+    """A handler that records each event and then waits for the gate to open."""
+    gate = asyncio.Event()
+    handled = []
+    
+    async def handler(data):
+        handled.append(data)
+        await gate.wait()
+    
+    yield handler, handled, gate
+    gate.set()
+
+
+async def fill_queue(bus, handled):
+    """Emit 1 (being handled), then 2 (queued); the one-slot queue is then full."""
+    await bus.emit(EventType.TASK_CREATED, 1)
+    await wait_until_handling(handled, 1)
+    await bus.emit(EventType.TASK_CREATED, 2)
+
+
+async def test_block_makes_publisher_wait_for_room(gated):
+    handler, handled, gate = gated
+    bus = EventBus(dispatchers=1, queue_size=1, backpressure="block")
+    bus.subscribe(EventType.TASK_CREATED, handler)
+    await fill_queue(bus, handled)
+    
+    publish = asyncio.ensure_future(bus.emit(EventType.TASK_CREATED, 3))
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert not publish.done()
+    
+    gate.set()
+    await asyncio.wait_for(publish, 1)
+    await bus.drain()
+    assert handled == [1, 2, 3]
+    assert bus.dropped == 0
+
+
+@pytest.mark.parametrize("policy, expected", [
+    (BackpressurePolicy.DROP_NEWEST, [1, 2]),
+    (BackpressurePolicy.DROP_OLDEST, [1, 3]),
+])
+async def test_drop_policies_never_block_the_publisher(gated, policy, expected):
+    handler, handled, gate = gated
+    bus = EventBus(dispatchers=1, queue_size=1, backpressure=policy)
+    bus.subscribe(EventType.TASK_CREATED, handler)
+    await fill_queue(bus, handled)
+    
+    await asyncio.wait_for(bus.emit(EventType.TASK_CREATED, 3), 1)
+    
+    gate.set()
+    await bus.drain()
+    assert handled == expected
+    assert bus.dropped == 1
+
+
+async def test_queued_events_of_one_type_keep_their_order():
+    handled = []
+    
+    async def handler(data):
+        await asyncio.sleep(0)
+        handled.append(data)
+    
+    bus = EventBus(dispatchers=3)
+    bus.subscribe(EventType.TASK_UPDATED, handler)
+    for i in range(50):
+        await bus.emit(EventType.TASK_UPDATED, i)
+    await bus.drain()
+    
+    assert handled == list(range(50))
+
+
+async def test_fan_out_runs_a_tier_concurrently_and_tiers_in_order():
+    calls = []
+    started = []
+    
+    async def peer(name):
+        started.append(name)
+        # Neither peer can finish until the other has started
+        while len(started) < 2:
+            await asyncio.sleep(0)
+        calls.append(name)
+    
+    async def first(data):
+        await peer("first")
+    
+    async def second(data):
+        await peer("second")
+    
+    async def later(data):
+        calls.append("later")
+    
+    bus = EventBus(fan_out=True)
+    bus.subscribe(EventType.TASK_CREATED, later, priority=0)
+    bus.subscribe(EventType.TASK_CREATED, first, priority=5)
+    bus.subscribe(EventType.TASK_CREATED, second, priority=5)
+    await asyncio.wait_for(bus.emit(EventType.TASK_CREATED, None), 1)
+    
+    assert sorted(calls[:2]) == ["first", "second"]
+    assert calls[2] == "later"
+
+
+@pytest.mark.parametrize("fan_out", [False, True])
+async def test_timed_out_handler_is_cancelled_and_reported(fan_out):
+    calls, errors = [], []
+    
+    async def stuck(data):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            calls.append("stuck cancelled")
+            raise
+    
+    async def peer(data):
+        calls.append("peer")
+    
+    def on_error(event, handler, error):
+        errors.append((handler.__name__, type(error)))
+    
+    bus = EventBus(fan_out=fan_out, handler_timeout=0.05)
+    bus.add_error_handler(on_error)
+    bus.subscribe(EventType.TASK_CREATED, stuck)
+    bus.subscribe(EventType.TASK_CREATED, peer)
+    
+    start = time.monotonic()
+    await bus.emit(EventType.TASK_CREATED, None)
+    
+    assert time.monotonic() - start < 1
+    assert sorted(calls) == ["peer", "stuck cancelled"]
+    assert errors == [("stuck", asyncio.TimeoutError)]
+    await bus.drain()
+
+
+async def test_inline_handlers_run_on_the_loop_thread_and_others_on_the_pool():
+    threads = {}
+    
+    @inline_handler
+    def marked(data):
+        threads["marked"] = threading.current_thread()
+    
+    def opted_in(data):
+        threads["opted_in"] = threading.current_thread()
+    
+    def blocking(data):
+        threads["blocking"] = threading.current_thread()
+    
+    bus = EventBus()
+    bus.subscribe(EventType.TASK_CREATED, marked)
+    bus.subscribe(EventType.TASK_CREATED, opted_in, inline=True)
+    bus.subscribe(EventType.TASK_CREATED, blocking)
+    await bus.emit(EventType.TASK_CREATED, None)
+    await bus.drain()
+    
+    loop_thread = threading.current_thread()
+    assert threads["marked"] is loop_thread
+    assert threads["opted_in"] is loop_thread
+    assert threads["blocking"] is not loop_thread
+    assert threads["blocking"].name.startswith("event-handler")
+
+
+async def test_failing_inline_handler_does_not_stop_the_others():
+    calls, errors = [], []
+    
+    @inline_handler
+    def broken(data):
+        raise RuntimeError("boom")
+    
+    @inline_handler
+    def working(data):
+        calls.append(data)
+    
+    bus = EventBus()
+    bus.add_error_handler(inline_handler(lambda event, handler, error: errors.append(error)))
+    bus.subscribe(EventType.TASK_CREATED, broken, priority=1)
+    bus.subscribe(EventType.TASK_CREATED, working)
+    await bus.emit(EventType.TASK_CREATED, "task")
+    
+    assert calls == ["task"]
+    assert [str(error) for error in errors] == ["boom"]
+
+
+async def test_pattern_subscriptions_follow_subscribe_and_unsubscribe():
+    seen = []
+    
+    @inline_handler
+    def handler(data):
+        seen.append(data)
+    
+    bus = EventBus()
+    bus.subscribe("task.*", handler)
+    await bus.emit(EventType.TASK_CREATED, "task")
+    await bus.emit(EventType.BATCH_CREATED, "batch")
+    assert seen == ["task"]
+    assert bus.get_subscriber_count(EventType.TASK_COMPLETED) == 1
+    
+    bus.unsubscribe("task.*", handler)
+    await bus.emit(EventType.TASK_CREATED, "again")
+    assert seen == ["task"]
+    assert bus.get_subscriber_count(EventType.TASK_COMPLETED) == 0
+
+
+async def test_history_evicts_oldest_events_from_every_index():
+    bus = EventBus(history_limit=3)
+    for i, event_type in enumerate([
+        EventType.TASK_CREATED, EventType.TASK_UPDATED,
+        EventType.TASK_CREATED, EventType.TASK_UPDATED, EventType.TASK_UPDATED
+    ]):
+        await bus.emit(event_type, i, correlation_id=f"c{i % 2}")
+    
+    assert [event.data for event in bus.get_history(limit=None)] == [2, 3, 4]
+    assert [event.data for event in bus.get_history(EventType.TASK_CREATED)] == [2]
+    assert [event.data for event in bus.get_history(correlation_id="c0")] == [2, 4]
+    assert [event.data for event in bus.get_history(limit=2)] == [3, 4]
+    assert bus.get_history(EventType.TASK_DELETED) == []
+
+
+async def test_history_time_window():
+    bus = EventBus()
+    for i in range(5):
+        await bus.emit(EventType.TASK_UPDATED, i, correlation_id="c")
+        await asyncio.sleep(0.002)  # Distinct timestamps
+    events = bus.get_history()
+    since, until = events[1].timestamp, events[3].timestamp
+    
+    assert [event.data for event in bus.get_history(since=since, until=until)] == [1, 2, 3]
+    assert [event.data for event in bus.get_history(since=since, limit=2)] == [3, 4]
+    assert [
+        event.data
+        for event in bus.get_history(EventType.TASK_UPDATED, correlation_id="c", until=until)
+    ] == [0, 1, 2, 3]
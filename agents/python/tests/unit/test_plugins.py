@@ -0,0 +1,66 @@
+"""Plugin hooks registered through TaskService.register_plugin."""
+
+import pytest
+
+from ap_task_manager.core.service import TaskService
+from ap_task_manager.domain.entities import TaskStatus
+from ap_task_manager.infrastructure.repository import InMemoryRepository
+
+
+class RecordingPlugin:
+    def __init__(self):
+        self.created = []
+        self.status_changes = []
+    
+    async def on_task_created(self, task, *args):
+        self.created.append(task.title)
+    
+    async def on_task_status_changed(self, task, change):
+        self.status_changes.append((task.title, change["from"], change["to"]))
+
+
+class SyncPlugin:
+    def __init__(self):
+        self.status_changes = []
+    
+    def on_task_status_changed(self, task, change):
+        self.status_changes.append((task.title, change["to"]))
+
+
+@pytest.fixture
+def service():
+    return TaskService(InMemoryRepository())
+
+
+async def test_batch_creation_calls_plugin_per_task(service):
+    plugin = RecordingPlugin()
+    service.register_plugin(plugin)
+    
+    await service.create_task("single")
+    await service.create_tasks([{"title": "batch 1"}, {"title": "batch 2"}])
+    await service.event_bus.drain()
+    
+    assert plugin.created == ["single", "batch 1", "batch 2"]
+
+
+async def test_batch_transitions_call_plugin_per_task(service):
+    plugin, sync_plugin = RecordingPlugin(), SyncPlugin()
+    service.register_plugin(plugin)
+    service.register_plugin(sync_plugin)
+    tasks = [await service.create_task(f"task {i}") for i in range(3)]
+    await service.transition_status(tasks[0].id, TaskStatus.IN_PROGRESS)
+    
+    # task 0 cannot be archived while in progress, so only two transition
+    await service.transition_many([task.id for task in tasks], TaskStatus.ARCHIVED)
+    await service.event_bus.drain()
+    
+    assert plugin.status_changes == [
+        ("task 0", TaskStatus.PENDING, TaskStatus.IN_PROGRESS),
+        ("task 1", TaskStatus.PENDING, TaskStatus.ARCHIVED),
+        ("task 2", TaskStatus.PENDING, TaskStatus.ARCHIVED),
+    ]
+    assert sync_plugin.status_changes == [
+        ("task 0", TaskStatus.IN_PROGRESS),
+        ("task 1", TaskStatus.ARCHIVED),
+        ("task 2", TaskStatus.ARCHIVED),
+    ]
@@ -0,0 +1,27 @@
+"""Task construction: positional order and lazily allocated fields."""
+
+from datetime import datetime
+from uuid import uuid4
+
+from ap_task_manager.domain.entities import AgentType, Priority, Task, TaskStatus
+
+
+def test_positional_arguments_keep_their_original_order():
+    task_id, story_id, epic_id = uuid4(), uuid4(), uuid4()
+    created, updated = datetime(2024, 1, 1), datetime(2024, 1, 2)
+    task = Task(
+        task_id, "title", "description", TaskStatus.BLOCKED, Priority.HIGH,
+        story_id, epic_id, AgentType.DEVELOPER, ["a"], {"k": 1}, created, updated
+    )
+    
+    assert (task.id, task.story_id, task.epic_id) == (task_id, story_id, epic_id)
+    assert (task.labels, task.metadata) == (["a"], {"k": 1})
+    assert (task.created_at, task.updated_at) == (created, updated)
+    assert task.depends_on == []
+
+
+def test_depends_on_round_trips_through_to_dict():
+    prerequisite = uuid4()
+    task = Task(title="blocked", depends_on=[prerequisite])
+    
+    assert Task.from_dict(task.to_dict()).depends_on == [prerequisite]
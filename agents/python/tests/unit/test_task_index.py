@@ -0,0 +1,78 @@
+"""InMemoryRepository's secondary indexes, checked against a full scan."""
+
+import random
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from ap_task_manager.domain.entities import AgentType, Priority, Task, TaskStatus
+from ap_task_manager.infrastructure.query import TaskFilter, TaskOrder, apply_window
+from ap_task_manager.infrastructure.repository import InMemoryRepository
+
+
+START = datetime(2024, 1, 1)
+STORIES = [uuid4() for _ in range(3)]
+LABELS = ["backend", "frontend", "docs"]
+
+
+def random_task(rng: random.Random, i: int) -> Task:
+    return Task(
+        title=f"task {i}",
+        priority=rng.choice(list(Priority)),
+        assignee=rng.choice([None, *AgentType]),
+        story_id=rng.choice([None, *STORIES]),
+        labels=rng.sample(LABELS, rng.randint(0, 2)),
+        created_at=START + timedelta(seconds=i)
+    )
+
+
+FILTERS = [
+    TaskFilter(),
+    TaskFilter(status=TaskStatus.PENDING),
+    TaskFilter(status=TaskStatus.IN_PROGRESS, assignee=AgentType.DEVELOPER),
+    TaskFilter(priority=Priority.HIGH, story_id=STORIES[0]),
+    TaskFilter(labels=["docs"]),
+    TaskFilter(labels=["backend", "frontend"], status=TaskStatus.PENDING),
+    TaskFilter(created_after=START + timedelta(seconds=150)),
+]
+
+
+@pytest.fixture
+async def repository():
+    rng = random.Random(42)
+    repository = InMemoryRepository()
+    tasks = [random_task(rng, i) for i in range(300)]
+    await repository.save_many(tasks)
+    
+    # Move tasks around so every index sees updates and removals
+    for task in rng.sample(tasks, 150):
+        task.transition_to(rng.choice([TaskStatus.IN_PROGRESS, TaskStatus.BLOCKED]), "test")
+        if rng.random() < 0.3:
+            task.labels = rng.sample(LABELS, 1)
+            task.priority = rng.choice(list(Priority))
+        await repository.save(task)
+    await repository.delete_many(task.id for task in rng.sample(tasks, 40))
+    return repository
+
+
+@pytest.mark.parametrize("filter_spec", FILTERS)
+@pytest.mark.parametrize("order", list(TaskOrder))
+@pytest.mark.parametrize("window", [(None, 0), (5, 0), (10, 7)])
+async def test_indexed_query_matches_full_scan(repository, filter_spec, order, window):
+    limit, offset = window
+    expected = sorted(
+        (task for task in await repository.list() if filter_spec.matches(task)),
+        key=order.sort_key
+    )
+    
+    result = await repository.query(filter_spec, order, limit, offset)
+    
+    assert [task.id for task in result] == [task.id for task in apply_window(expected, limit, offset)]
+
+
+async def test_cleared_repository_matches_nothing(repository):
+    await repository.clear()
+    
+    assert await repository.query(TaskFilter(status=TaskStatus.PENDING)) == []
+    assert await repository.query() == []
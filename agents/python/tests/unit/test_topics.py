@@ -0,0 +1,70 @@
+"""TopicTrie: wildcard matching, validation and removal."""
+
+import pytest
+
+from ap_task_manager.infrastructure.topics import TopicTrie, split_pattern
+
+
+PATTERNS = ["task.*", "*.completed", "#", "task.#", "batch.created", "#.completed", "*.*.x"]
+
+
+@pytest.mark.parametrize("topic, expected", [
+    ("task.created", {"task.*", "#", "task.#"}),
+    ("task.completed", {"task.*", "*.completed", "#", "task.#", "#.completed"}),
+    ("extraction.completed", {"*.completed", "#", "#.completed"}),
+    ("batch.created", {"#", "batch.created"}),
+    ("task", {"#", "task.#"}),
+    ("a.b.x", {"#", "*.*.x"}),
+    ("a.b.c.completed", {"#", "#.completed"}),
+])
+def test_match(topic, expected):
+    trie = TopicTrie()
+    for pattern in PATTERNS:
+        trie.add(pattern)
+    
+    assert trie.match(topic) == expected
+
+
+def test_star_matches_exactly_one_segment():
+    trie = TopicTrie()
+    trie.add("task.*")
+    
+    assert trie.match("task") == set()
+    assert trie.match("task.status.changed") == set()
+
+
+@pytest.mark.parametrize("pattern", ["", "task.", ".task", "task..created", "task*", "ta#sk.created"])
+def test_malformed_patterns_are_rejected(pattern):
+    with pytest.raises(ValueError):
+        split_pattern(pattern)
+    with pytest.raises(ValueError):
+        TopicTrie().add(pattern)
+
+
+def test_add_is_idempotent_and_remove_prunes():
+    trie = TopicTrie()
+    trie.add("task.*")
+    trie.add("task.*")
+    trie.add("task.created")
+    assert len(trie) == 2
+    
+    trie.remove("task.*")
+    assert len(trie) == 1
+    assert trie.match("task.created") == {"task.created"}
+    assert trie.match("task.updated") == set()
+    
+    trie.remove("task.created")
+    assert len(trie) == 0
+    assert not trie._root.children
+
+
+def test_removing_an_unknown_pattern_does_nothing():
+    trie = TopicTrie()
+    trie.add("task.*")
+    
+    trie.remove("task.#")
+    trie.remove("batch.*")
+    trie.remove("task")
+    
+    assert len(trie) == 1
+    assert trie.match("task.created") == {"task.*"}